@@ -0,0 +1,75 @@
+"""Measure top-k recall and storage of halfvec embeddings against float32.
+
+Vectors are clustered like real embeddings, so near neighbours are close and
+rounding errors can reorder them. ``halfvec`` stores float16 components, the
+same rounding pgvector applies in ``vector::halfvec``. Scan time is left to
+EXPLAIN ANALYZE on a real database: numpy has no BLAS path for float16.
+
+Run from backend/: PYTHONPATH=src python benchmarks/bench_halfvec_recall.py
+"""
+
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+
+def build_corpus(
+    rng: np.random.Generator, *, rows: int, dimension: int, clusters: int
+) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    members = rng.integers(0, clusters, size=rows)
+    corpus = centers[members] + 0.35 * rng.standard_normal(
+        (rows, dimension)
+    ).astype(np.float32)
+    return corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+
+
+def top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    distances = 1.0 - matrix @ query
+    return np.argpartition(distances, k)[:k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    full = build_corpus(
+        rng, rows=args.rows, dimension=args.dimension, clusters=args.clusters
+    )
+    # Round-trip through float16 and score in float32, as pgvector does.
+    half = full.astype(np.float16).astype(np.float32)
+    queries = full[rng.integers(0, args.rows, size=args.queries)] + 0.1 * (
+        rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+    )
+
+    started_at = perf_counter()
+    recalls = []
+    for query in queries:
+        query /= np.linalg.norm(query)
+        expected = set(top_k(full, query, args.k))
+        actual = set(top_k(half, query, args.k))
+        recalls.append(len(expected & actual) / args.k)
+    elapsed = perf_counter() - started_at
+
+    print(f"rows={args.rows} dimension={args.dimension} k={args.k}")
+    # pgvector stores 4 bytes per vector component and 2 per halfvec one.
+    for name, bytes_per_component in (("vector", 4), ("halfvec", 2)):
+        size = args.rows * args.dimension * bytes_per_component
+        print(f"{name:>8}: {size / 2**20:9.1f} MiB")
+    print(
+        f"recall@{args.k}: mean {np.mean(recalls):.4f}  min {np.min(recalls):.4f}  "
+        f"({elapsed:.1f} s for {args.queries} queries)"
+    )
+
+
+if __name__ == "__main__":
+    main()
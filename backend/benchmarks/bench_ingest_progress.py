@@ -0,0 +1,84 @@
+"""Compare per-unit progress publishing with ThrottledProgressReporter.
+
+Run from backend/: PYTHONPATH=src python benchmarks/bench_ingest_progress.py
+"""
+
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+
+from api.api_model import IngestRequest
+from services.ingest_progress import ThrottledProgressReporter
+from services.ingest_service import AST_WEIGHT, COMMIT_LOAD_WEIGHT, PLANNING_WEIGHT, IngestService
+
+
+def build_service() -> IngestService:
+    # Only the in-memory progress bookkeeping is exercised; no database,
+    # worker threads or Git repository are involved.
+    service = IngestService.__new__(IngestService)
+    service._progress_window = (0, 1)
+    service.resolve_repo_path = lambda repo_path: repo_path
+    service._spawn_job_worker = lambda *args: None
+    service._persist_job = lambda *args, **kwargs: None
+    return service
+
+
+def publish(service: IngestService, job_id: str, total_units: int, completed_units: int) -> None:
+    service._set_progress(
+        progress_id=job_id,
+        repo_path="/tmp/bench",
+        phase="extracting_ast",
+        label="Extracting AST summaries",
+        stage_percent=completed_units / total_units,
+        stage_start_percent=PLANNING_WEIGHT + COMMIT_LOAD_WEIGHT,
+        stage_weight=AST_WEIGHT,
+        completed_units=completed_units,
+        total_units=total_units,
+    )
+
+
+def register_job(service: IngestService, repo_path: str) -> str:
+    job = service.start_ingest_job(IngestRequest(repo_path=repo_path), user_id=1)
+    return job.job_id
+
+
+def run_unthrottled(service: IngestService, total_units: int) -> tuple[float, int]:
+    job_id = register_job(service, "/tmp/bench-per-unit")
+    started_at = perf_counter()
+    for completed_units in range(1, total_units + 1):
+        publish(service, job_id, total_units, completed_units)
+    return perf_counter() - started_at, total_units
+
+
+def run_throttled(service: IngestService, total_units: int) -> tuple[float, int]:
+    job_id = register_job(service, "/tmp/bench-throttled")
+    reporter = ThrottledProgressReporter(
+        lambda completed_units: publish(service, job_id, total_units, completed_units),
+        total_units=total_units,
+    )
+    started_at = perf_counter()
+    for _ in range(total_units):
+        reporter.advance()
+    reporter.flush()
+    return perf_counter() - started_at, reporter.published_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--units", type=int, default=200_000)
+    args = parser.parse_args()
+
+    service = build_service()
+    for name, runner in (("per-unit", run_unthrottled), ("throttled", run_throttled)):
+        elapsed, publishes = runner(service, args.units)
+        print(
+            f"{name:>10}: {elapsed * 1000:9.1f} ms  "
+            f"{publishes:>7} publishes  "
+            f"{elapsed / args.units * 1e9:7.0f} ns/unit"
+        )
+    IngestService.reset_runtime_state()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare snapshot lookups on a repository with deeply nested paths.
+
+Strategies: walking the tree one path segment at a time (the previous
+implementation), a single full-path ``tree[path]`` lookup, and reading the
+blob OID carried on the diff delta.
+
+Run from backend/: PYTHONPATH=src python benchmarks/bench_snapshot_lookup.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from time import perf_counter
+
+import pygit2
+
+from core.diff_engine import read_blob_text
+
+
+def build_deep_repo(repo_dir: str, *, files: int, depth: int) -> pygit2.Repository:
+    repo = pygit2.init_repository(repo_dir, bare=True)
+    signature = pygit2.Signature("GitOdyssey", "gitodyssey@example.com")
+
+    def build_tree(level: int, prefix: str) -> pygit2.Oid:
+        builder = repo.TreeBuilder()
+        if level == depth:
+            for index in range(files):
+                blob_id = repo.create_blob(f"# {prefix}{index}\nvalue = {index}\n")
+                builder.insert(
+                    f"module_{index}.py", blob_id, pygit2.GIT_FILEMODE_BLOB
+                )
+        else:
+            builder.insert(
+                f"level_{level}", build_tree(level + 1, prefix), pygit2.GIT_FILEMODE_TREE
+            )
+        return builder.write()
+
+    old_tree = build_tree(0, "old ")
+    new_tree = build_tree(0, "new ")
+    parent = repo.create_commit(None, signature, signature, "old", old_tree, [])
+    repo.create_commit("HEAD", signature, signature, "new", new_tree, [parent])
+    return repo
+
+
+def walk_segments(repo: pygit2.Repository, tree: pygit2.Tree, path: str) -> str | None:
+    try:
+        parts = [part for part in path.split("/") if part]
+        current = tree
+        for index, part in enumerate(parts):
+            entry = current[part]
+            obj = repo[entry.id]
+            if index < len(parts) - 1:
+                if isinstance(obj, pygit2.Tree):
+                    current = obj
+                    continue
+                return None
+            if hasattr(obj, "data"):
+                return obj.data.decode("utf-8", "replace").replace("\x00", "")
+            return None
+    except Exception:
+        return None
+
+
+def full_path(repo: pygit2.Repository, tree: pygit2.Tree, path: str) -> str | None:
+    try:
+        obj = repo[tree[path].id]
+    except KeyError:
+        return None
+    return obj.data.decode("utf-8", "replace").replace("\x00", "")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo_dir:
+        repo = build_deep_repo(repo_dir, files=args.files, depth=args.depth)
+        head = repo.revparse_single("HEAD")
+        deltas = [patch.delta for patch in head.parents[0].tree.diff_to_tree(head.tree)]
+        lookups = len(deltas) * args.rounds
+
+        runners = (
+            (
+                "segment walk",
+                lambda delta: walk_segments(repo, head.tree, delta.new_file.path),
+            ),
+            (
+                "tree[path]",
+                lambda delta: full_path(repo, head.tree, delta.new_file.path),
+            ),
+            ("blob oid", lambda delta: read_blob_text(repo, str(delta.new_file.id))),
+        )
+        for name, lookup in runners:
+            started_at = perf_counter()
+            for _ in range(args.rounds):
+                for delta in deltas:
+                    lookup(delta)
+            elapsed = perf_counter() - started_at
+            print(
+                f"{name:>12}: {elapsed * 1000:9.1f} ms  "
+                f"{elapsed / lookups * 1e6:7.2f} us/lookup"
+            )
+
+
+if __name__ == "__main__":
+    main()
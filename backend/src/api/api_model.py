@@ -14,11 +14,16 @@ class RepoResponse(BaseModel):
     reindex_required: bool = False
 
 
+FilterSearchMode = Literal["ranked", "hybrid"]
+
+
 class FilterRequest(BaseModel):
     query: str = ""
     filters: Dict[str, Any] = Field(default_factory=dict)
     repo_path: str = ""
     max_results: int = 20
+    search_mode: FilterSearchMode = "ranked"
+    cursor: str | None = None
 
 
 FilterMatchType = Literal["commit", "file_change", "hunk"]
@@ -57,6 +62,7 @@ class FilterResponse(BaseModel):
     total_relevant_results: int = 0
     has_more_relevant: bool = False
     max_results: int = 20
+    next_cursor: str | None = None
 
 
 class ChatbotRequest(BaseModel):
@@ -87,6 +93,7 @@ class IngestRequest(BaseModel):
     context_lines: int = 10
     force: bool = False
     progress_id: str | None = None
+    priority: Literal["interactive", "background"] = "interactive"
 
 
 IngestProgressPhase = Literal[
@@ -97,6 +104,8 @@ IngestProgressPhase = Literal[
     "writing_db",
     "completed",
     "failed",
+    "cancelled",
+    "paused",
 ]
 
 
@@ -120,7 +129,14 @@ class IngestProgressResponse(BaseModel):
     updated_at: datetime
 
 
-IngestJobStatus = Literal["queued", "running", "completed", "failed", "cancelled"]
+IngestJobStatus = Literal[
+    "queued",
+    "running",
+    "completed",
+    "failed",
+    "cancelled",
+    "paused",
+]
 
 
 class IngestJobResponse(BaseModel):
@@ -133,6 +149,7 @@ class IngestJobResponse(BaseModel):
     started_at: datetime
     updated_at: datetime
     completed_at: datetime | None = None
+    checkpoint: Dict[str, Any] | None = None
 
 
 class CommitsResponse(BaseModel):
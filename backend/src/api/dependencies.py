@@ -8,8 +8,10 @@ from sqlalchemy.orm import Session
 
 import infrastructure.db as db
 from core.ai import AIEngine
+from core.context_packer import TokenCounter
 from core.embedder import EmbeddingEngine
 from core.retriever import Retriever
+from core.vector_index import DEFAULT_VECTOR_INDEXES
 from core.writer import Writer
 from data.adapter import DatabaseAdapter
 from data.data_model import User
@@ -192,6 +194,7 @@ def get_embedding_engine() -> EmbeddingEngine | None:
             ast_schema_version=AST_SCHEMA_VERSION,
             ast_enabled_languages=AST_ENABLED_LANGUAGES,
         ),
+        vector_storage=binding.vector_storage,
     )
 
 
@@ -206,8 +209,18 @@ def get_retriever(
     session: Session = Depends(get_session),
     embedder: EmbeddingEngine | None = Depends(get_embedding_engine),
     db_adapter: DatabaseAdapter = Depends(get_db_adapter),
+    settings: Settings = Depends(get_settings),
 ) -> Retriever:
-    return Retriever(session, embedder, db_adapter)
+    return Retriever(
+        session,
+        embedder,
+        db_adapter,
+        vector_indexes=(
+            DEFAULT_VECTOR_INDEXES if settings.semantic_vector_index_enabled else None
+        ),
+        chat_context_top_k=settings.chat_context_top_k,
+        chat_context_token_budget=settings.chat_context_token_budget,
+    )
 
 
 def get_summarize_service(
@@ -223,7 +236,12 @@ def get_ingest_service(
     embedder: EmbeddingEngine | None = Depends(get_embedding_engine),
     settings: Settings = Depends(get_settings),
 ) -> IngestService:
-    return IngestService(session, embedder, flush_size=settings.ingest_flush_size)
+    return IngestService(
+        session,
+        embedder,
+        flush_size=settings.ingest_flush_size,
+        checkpoint_window_size=settings.ingest_checkpoint_window_size,
+    )
 
 
 def get_repo_service(
@@ -237,7 +255,13 @@ def get_chat_service(
     ai_engine: AIEngine = Depends(get_ai_engine),
     retriever: Retriever = Depends(get_retriever),
 ) -> ChatService:
-    return ChatService(ai_engine, retriever)
+    binding = get_ai_runtime_config().capabilities.text_generation
+    return ChatService(
+        ai_engine,
+        retriever,
+        context_token_budget=binding.context_token_budget,
+        token_counter=TokenCounter(binding.model_id),
+    )
 
 
 def get_filter_service(
@@ -254,7 +278,13 @@ def get_review_generation_service(
     compare_service: ReviewCompareService = Depends(get_review_compare_service),
     ai_engine: AIEngine = Depends(get_ai_engine),
 ) -> ReviewGenerationService:
-    return ReviewGenerationService(compare_service=compare_service, ai_engine=ai_engine)
+    binding = get_ai_runtime_config().capabilities.text_generation
+    return ReviewGenerationService(
+        compare_service=compare_service,
+        ai_engine=ai_engine,
+        context_token_budget=binding.context_token_budget,
+        token_counter=TokenCounter(binding.model_id),
+    )
 
 
 def get_review_session_persistence_service(
@@ -1,21 +1,62 @@
+import asyncio
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from api.api_model import (
     IngestJobResponse,
     IngestProgressResponse,
     IngestRequest,
     RepoResponse,
 )
-from services.ingest_service import IngestService
+from services.ingest_service import (
+    STOPPED_JOB_STATUSES,
+    IngestJobSnapshot,
+    IngestService,
+)
 from services.repo_service import RepoService
 from api.dependencies import (
     get_current_user,
     get_ingest_service,
     get_repo_service,
+    get_settings,
 )
 from data.data_model import User
+from infrastructure.settings import Settings
 
 router = APIRouter()
 
+JOB_EVENT_KEEPALIVE_SECONDS = 15.0
+
+
+def _format_job_event(job: IngestJobSnapshot) -> str:
+    payload = IngestJobResponse.model_validate(job.as_payload()).model_dump_json()
+    return f"event: job\ndata: {payload}\n\n"
+
+
+async def _stream_job_events(
+    job_id: str,
+    interval_seconds: float,
+) -> AsyncIterator[str]:
+    with IngestService.subscribe_job(job_id) as subscription:
+        # Re-read after subscribing so a transition between the route's lookup
+        # and the subscription is not lost.
+        job = IngestService.get_job(job_id)
+        if job is None:
+            return
+        yield _format_job_event(job)
+
+        while job.status not in STOPPED_JOB_STATUSES:
+            try:
+                job = await subscription.next(timeout=JOB_EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _format_job_event(job)
+            if job.status not in STOPPED_JOB_STATUSES and interval_seconds > 0:
+                # Updates published while sleeping collapse into the latest one.
+                await asyncio.sleep(interval_seconds)
+
 
 @router.post("/jobs", response_model=IngestJobResponse)
 async def create_ingest_job(
@@ -61,6 +102,61 @@ async def get_ingest_job(
     return IngestJobResponse.model_validate(job.as_payload())
 
 
+@router.get("/jobs/{job_id}/events")
+async def stream_ingest_job_events(
+    job_id: str,
+    settings: Settings = Depends(get_settings),
+):
+    # Deliberately avoids get_ingest_service so a long-lived stream does not
+    # hold a database session open.
+    if IngestService.get_job(job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingest job not found",
+        )
+    return StreamingResponse(
+        _stream_job_events(job_id, settings.ingest_progress_stream_interval_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=IngestJobResponse)
+async def cancel_ingest_job(
+    job_id: str,
+    ingest_service: IngestService = Depends(get_ingest_service),
+):
+    try:
+        job = ingest_service.cancel_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return IngestJobResponse.model_validate(job.as_payload())
+
+
+@router.post("/jobs/{job_id}/pause", response_model=IngestJobResponse)
+async def pause_ingest_job(
+    job_id: str,
+    ingest_service: IngestService = Depends(get_ingest_service),
+):
+    try:
+        job = ingest_service.pause_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return IngestJobResponse.model_validate(job.as_payload())
+
+
+@router.post("/jobs/{job_id}/resume", response_model=IngestJobResponse)
+async def resume_ingest_job(
+    job_id: str,
+    ingest_service: IngestService = Depends(get_ingest_service),
+):
+    try:
+        job = ingest_service.resume_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return IngestJobResponse.model_validate(job.as_payload())
+
+
 @router.post("", response_model=RepoResponse)
 async def ingest(
     request: IngestRequest,
@@ -91,6 +187,11 @@ async def ingest(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Repository sync was cancelled",
             )
+        if completed_job.status == "paused":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Repository sync was paused",
+            )
 
         normalized_repo_path = completed_job.result_repo_path or job.repo_path
         result = repo_service.get_repo(normalized_repo_path)
@@ -13,7 +13,13 @@ from infrastructure.errors import (
 from infrastructure.migrations import run_migrations
 from infrastructure.schema import ensure_pgvector_extension, init_schema
 from contextlib import asynccontextmanager
-from api.dependencies import get_settings
+from api.dependencies import get_ai_runtime_config, get_embedding_engine, get_settings
+from core.ast_extractor import configure_ast_process_pool, shutdown_ast_process_pool
+from core.context_packer import preload_encoding
+from core.vector_index import DEFAULT_VECTOR_INDEXES
+from core.vector_segments import VectorSegmentStore
+from services.ingest_service import IngestService
+from services.repo_watch_service import RepoRefsWatcher
 from utils.logger import logger
 
 
@@ -24,7 +30,49 @@ async def lifespan(app: FastAPI):
     ensure_pgvector_extension()
     init_schema()
     run_migrations(settings)
+    IngestService.configure_scheduler(settings.ingest_max_workers)
+    configure_ast_process_pool(settings.ingest_ast_workers)
+    if settings.vector_segment_dir:
+        DEFAULT_VECTOR_INDEXES.configure_segments(
+            VectorSegmentStore(
+                settings.vector_segment_dir, dtype=settings.vector_segment_dtype
+            )
+        )
+    try:
+        preload_encoding(get_ai_runtime_config().capabilities.text_generation.model_id)
+    except Exception:
+        logger.exception("Failed to preload the token encoding")
+    try:
+        with db.SessionLocal() as session:
+            IngestService(
+                session, get_embedding_engine()
+            ).convert_configured_vector_storage()
+    except Exception:
+        logger.exception("Failed to convert embeddings to the configured storage")
+    try:
+        with db.SessionLocal() as session:
+            IngestService(
+                session,
+                get_embedding_engine(),
+                flush_size=settings.ingest_flush_size,
+                checkpoint_window_size=settings.ingest_checkpoint_window_size,
+            ).resume_interrupted_jobs()
+    except Exception:
+        logger.exception("Failed to resume interrupted ingest jobs")
+    repo_watcher = None
+    if settings.repo_watcher_enabled:
+        repo_watcher = RepoRefsWatcher(
+            embedder_factory=get_embedding_engine,
+            flush_size=settings.ingest_flush_size,
+            checkpoint_window_size=settings.ingest_checkpoint_window_size,
+            poll_interval_seconds=settings.repo_watcher_poll_seconds,
+            debounce_seconds=settings.repo_watcher_debounce_seconds,
+        )
+        repo_watcher.start()
     yield
+    if repo_watcher is not None:
+        repo_watcher.stop()
+    shutdown_ast_process_pool()
     close_db()
 
 
@@ -0,0 +1,57 @@
+import argparse
+
+from sqlalchemy import select
+
+import infrastructure.db as db
+from core.vector_segments import VectorSegmentStore
+from data.file_exclusions import build_file_exclusion_filter
+from data.schema import SQLCommit, SQLRepo
+from infrastructure.db import close_db, init_db
+from infrastructure.settings import Settings
+from utils.logger import logger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Backfill missing vector segments, merge them and drop rows of "
+            "unreachable commits."
+        )
+    )
+    parser.add_argument("--repo", help="Only compact this repository path.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    if not settings.vector_segment_dir:
+        raise SystemExit("VECTOR_SEGMENT_DIR is not configured.")
+    store = VectorSegmentStore(
+        settings.vector_segment_dir, dtype=settings.vector_segment_dtype
+    )
+    init_db(settings.database_url, settings.database_sslmode)
+
+    try:
+        with db.SessionLocal() as session:
+            statement = select(SQLRepo.path, SQLRepo.embedding_profile_id)
+            if args.repo:
+                statement = statement.where(SQLRepo.path == args.repo)
+            for repo_path, embedding_profile_id in session.execute(statement).all():
+                if not store.has_manifest(repo_path, embedding_profile_id):
+                    store.backfill(
+                        session,
+                        repo_path,
+                        embedding_profile_id,
+                        file_filter=build_file_exclusion_filter(),
+                    )
+                live_commit_shas = session.execute(
+                    select(SQLCommit.sha).where(SQLCommit.repo_path == repo_path)
+                ).scalars()
+                counts = store.compact(
+                    repo_path, embedding_profile_id, live_commit_shas
+                )
+                logger.info("Compacted vector segments for %s: %s", repo_path, counts)
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    main()
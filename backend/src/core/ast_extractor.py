@@ -1,10 +1,15 @@
 import ast
+import hashlib
+import multiprocessing
 import re
 import tree_sitter_typescript
-from collections import Counter
-from dataclasses import dataclass, field
-from typing import Any
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator
 
+from core.symbol_index import SymbolIntervalIndex
 from data.schema import FileChangeStatus
 from infrastructure.ai_runtime import AST_ENABLED_LANGUAGES, AST_SCHEMA_VERSION
 from utils.logger import logger
@@ -26,6 +31,8 @@ _TS_IMPORT_EXPORT_PATTERN = re.compile(
 _STRING_LITERAL_PATTERN = re.compile(r"(['\"])(?:(?=(\\?))\2.)*?\1")
 _NUMBER_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
 _WHITESPACE_PATTERN = re.compile(r"\s+")
+AST_SYMBOL_CACHE_SIZE = 512
+_PARALLEL_CHUNK_SIZE = 16
 
 
 @dataclass
@@ -53,6 +60,14 @@ class ASTExtractionResult:
     hunk_summaries: dict[int, str]
 
 
+@dataclass(frozen=True)
+class _SymbolFeatures:
+    call_names: frozenset[str] = frozenset()
+    import_names: frozenset[str] = frozenset()
+    export_names: frozenset[str] = frozenset()
+    type_names: frozenset[str] = frozenset()
+
+
 @dataclass
 class _PythonSymbol:
     path: str
@@ -61,6 +76,8 @@ class _PythonSymbol:
     end_line: int
     node: ast.AST
     enclosing_symbol: str | None = None
+    # Filled on first use so every hunk in the symbol shares one traversal.
+    features: _SymbolFeatures | None = field(default=None, repr=False)
 
 
 @dataclass
@@ -71,6 +88,219 @@ class _TSSymbol:
     end_line: int
     node: Any
     enclosing_symbol: str | None = None
+    features: _SymbolFeatures | None = field(default=None, repr=False)
+
+
+@dataclass
+class _ParsedSymbols:
+    index: SymbolIntervalIndex[Any]
+    source: bytes | None = None
+    # Keeps the tree-sitter tree alive for as long as its nodes are cached.
+    tree: Any = None
+
+
+@dataclass
+class _SnapshotText:
+    content: str
+
+
+@dataclass
+class _HunkSpan:
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+    content: str | None
+
+
+@dataclass
+class _ExtractionTask:
+    """Picklable subset of a file change sent to AST worker processes."""
+
+    language: str
+    old_path: str | None
+    new_path: str | None
+    status: Any
+    snapshot: _SnapshotText | None
+    hunks: list[_HunkSpan]
+    blob_hash: str
+
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_workers = 0
+# Extractors that dispatched to the pool and have not released it yet.
+_process_pool_users = 0
+_process_pool_lock = Lock()
+_worker_extractor: "ASTSummaryExtractor | None" = None
+
+
+def _start_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    # Spawned workers avoid forking a process that already runs threads.
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def configure_ast_process_pool(max_workers: int) -> None:
+    """Use ``max_workers`` processes for batch extraction; 1 or less disables it."""
+    global _process_pool, _process_pool_workers, _process_pool_users
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        _process_pool_users = 0
+        _process_pool_workers = max_workers if max_workers > 1 else 0
+        if _process_pool_workers:
+            _process_pool = _start_process_pool(_process_pool_workers)
+
+
+def shutdown_ast_process_pool() -> None:
+    configure_ast_process_pool(0)
+
+
+def _retain_process_pool() -> None:
+    global _process_pool_users
+    with _process_pool_lock:
+        _process_pool_users += 1
+
+
+def _release_process_pool() -> None:
+    """Drop one pool user; the last one out replaces the workers.
+
+    Replacing them frees the parse state they hold. While another extractor
+    still uses the pool its workers and their blob caches are kept. Work
+    that was already submitted still finishes on the old workers.
+    """
+    global _process_pool, _process_pool_users
+    with _process_pool_lock:
+        _process_pool_users = max(0, _process_pool_users - 1)
+        if _process_pool is None or _process_pool_users:
+            return
+        _process_pool.shutdown(wait=False)
+        _process_pool = _start_process_pool(_process_pool_workers)
+
+
+def _get_process_pool() -> ProcessPoolExecutor | None:
+    with _process_pool_lock:
+        return _process_pool
+
+
+def _map_on_process_pool(
+    tasks: list[_ExtractionTask],
+) -> "Iterator[tuple[ASTExtractionResult | None, _ParsedSymbols | None]] | None":
+    with _process_pool_lock:
+        if _process_pool is None:
+            return None
+        # map submits every task before returning, so a pool replaced while
+        # the results are consumed cannot strand any of them.
+        return _process_pool.map(
+            _extract_in_worker, tasks, chunksize=_PARALLEL_CHUNK_SIZE
+        )
+
+
+def _extract_in_worker(
+    task: _ExtractionTask,
+) -> "tuple[ASTExtractionResult | None, _ParsedSymbols | None]":
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = ASTSummaryExtractor()
+    return _worker_extractor._extract_task(task)
+
+
+def compute_blob_hash(text: str) -> str:
+    """Git-style blob hash of ``text``; equals the blob OID for UTF-8 files."""
+    data = text.encode("utf-8", "surrogateescape")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _common_prefix_length(left: bytes, right: bytes) -> int:
+    # Binary search over slice equality keeps the byte comparison in C.
+    left_view, right_view = memoryview(left), memoryview(right)
+    low, high = 0, min(len(left), len(right))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if left_view[:middle] == right_view[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix_length(left: bytes, right: bytes, limit: int) -> int:
+    left_view, right_view = memoryview(left), memoryview(right)
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if left_view[len(left) - middle :] == right_view[len(right) - middle :]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _byte_point(source: bytes, byte_offset: int) -> tuple[int, int]:
+    row = source.count(b"\n", 0, byte_offset)
+    return row, byte_offset - (source.rfind(b"\n", 0, byte_offset) + 1)
+
+
+def _edit_tree_for_source(tree: Any, old_source: bytes, new_source: bytes) -> Any:
+    """Return a copy of ``tree`` edited to describe ``new_source``.
+
+    The edit spans the first through last differing byte, which covers every
+    hunk between the two sources without trusting hunk line numbers.
+    """
+    prefix = _common_prefix_length(old_source, new_source)
+    suffix = _common_suffix_length(
+        old_source,
+        new_source,
+        min(len(old_source), len(new_source)) - prefix,
+    )
+    old_end_byte = len(old_source) - suffix
+    new_end_byte = len(new_source) - suffix
+    edited_tree = tree.copy()
+    edited_tree.edit(
+        start_byte=prefix,
+        old_end_byte=old_end_byte,
+        new_end_byte=new_end_byte,
+        start_point=_byte_point(old_source, prefix),
+        old_end_point=_byte_point(old_source, old_end_byte),
+        new_end_point=_byte_point(new_source, new_end_byte),
+    )
+    return edited_tree
+
+
+def _file_change_path(file_change: Any) -> str | None:
+    return getattr(file_change, "new_path", None) or getattr(
+        file_change, "old_path", None
+    )
+
+
+def _snapshot_text(file_change: Any) -> str:
+    snapshot = getattr(file_change, "snapshot", None)
+    return getattr(snapshot, "content", "") if snapshot is not None else ""
+
+
+def _build_extraction_task(file_change: Any, language: str) -> _ExtractionTask:
+    snapshot_text = _snapshot_text(file_change)
+    return _ExtractionTask(
+        language=language,
+        old_path=getattr(file_change, "old_path", None),
+        new_path=getattr(file_change, "new_path", None),
+        status=getattr(file_change, "status", FileChangeStatus.MODIFIED),
+        snapshot=_SnapshotText(snapshot_text) if snapshot_text else None,
+        hunks=[
+            _HunkSpan(
+                old_start=getattr(hunk, "old_start", 1),
+                old_lines=getattr(hunk, "old_lines", 0),
+                new_start=getattr(hunk, "new_start", 1),
+                new_lines=getattr(hunk, "new_lines", 0),
+                content=getattr(hunk, "content", None),
+            )
+            for hunk in getattr(file_change, "hunks", [])
+        ],
+        blob_hash=compute_blob_hash(snapshot_text),
+    )
 
 
 def normalize_ast_summary_text(value: str) -> str:
@@ -266,25 +496,132 @@ def _render_file_summary(
 
 
 class ASTSummaryExtractor:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        symbol_cache_size: int = AST_SYMBOL_CACHE_SIZE,
+        *,
+        incremental_parse: bool = True,
+    ) -> None:
         self.ast_schema_version = AST_SCHEMA_VERSION
         self.supported_languages = AST_ENABLED_LANGUAGES
+        self.symbol_cache_size = max(0, symbol_cache_size)
+        self.incremental_parse = incremental_parse
         self._ts_parser_cache: dict[str, Any] = {}
+        # Last tree-sitter tree per (language, path); the next snapshot of the
+        # same path is reparsed incrementally against it.
+        self._ts_trees_by_path: OrderedDict[tuple[str, str], tuple[bytes, Any]] = (
+            OrderedDict()
+        )
+        # Parsed symbol tables keyed by (schema version, language, blob hash),
+        # so a blob shared by many commits or branches is parsed once.
+        self._symbol_cache: OrderedDict[tuple[str, str, str], _ParsedSymbols] = (
+            OrderedDict()
+        )
+        self._used_process_pool = False
 
     def populate_repo(self, repo: Any) -> None:
         for commit in getattr(repo, "commits", {}).values():
             for file_change in getattr(commit, "file_changes", []):
                 self.populate_file_change(file_change)
 
+    def release_parse_state(self) -> None:
+        """Drop the trees kept for incremental parsing, e.g. after an ingest window."""
+        self._ts_trees_by_path.clear()
+
+    def release_worker_parse_state(self) -> None:
+        """Free what the AST workers kept for this extractor, e.g. after an ingest."""
+        if self._used_process_pool:
+            self._used_process_pool = False
+            _release_process_pool()
+
     def populate_file_change(self, file_change: Any) -> None:
-        file_path = getattr(file_change, "new_path", None) or getattr(
-            file_change, "old_path", None
-        )
-        language = _path_language(file_path)
+        language = _path_language(_file_change_path(file_change))
         if language is None:
             return
 
-        result = self.extract_file_change(file_change, language=language)
+        self._apply_result(
+            file_change, self.extract_file_change(file_change, language=language)
+        )
+
+    def populate_file_changes(
+        self,
+        file_changes: Iterable[Any],
+        *,
+        on_file_change: Callable[[Any], None] | None = None,
+    ) -> None:
+        """Populate many file changes, on the AST process pool when configured.
+
+        ``on_file_change`` runs once per file change after it is populated and
+        may raise to abort the batch.
+        """
+        if _get_process_pool() is None:
+            for file_change in file_changes:
+                self.populate_file_change(file_change)
+                if on_file_change is not None:
+                    on_file_change(file_change)
+            return
+
+        pending: list[tuple[Any, _ExtractionTask]] = []
+        for file_change in file_changes:
+            language = _path_language(_file_change_path(file_change))
+            if language is None:
+                if on_file_change is not None:
+                    on_file_change(file_change)
+                continue
+            task = _build_extraction_task(file_change, language)
+            if self._symbol_key(language, task.blob_hash) in self._symbol_cache:
+                # Already parsed here; matching hunks is cheaper than a round trip.
+                self.populate_file_change(file_change)
+                if on_file_change is not None:
+                    on_file_change(file_change)
+                continue
+            pending.append((file_change, task))
+
+        # Identical blobs land in the same chunk, so each worker's symbol
+        # cache sees them back to back.
+        pending.sort(key=lambda item: item[1].blob_hash)
+        results = _map_on_process_pool([task for _, task in pending]) if pending else None
+        if results is None:
+            for file_change, _ in pending:
+                self.populate_file_change(file_change)
+                if on_file_change is not None:
+                    on_file_change(file_change)
+            return
+
+        if not self._used_process_pool:
+            self._used_process_pool = True
+            _retain_process_pool()
+        for (file_change, task), (result, parsed) in zip(pending, results):
+            if parsed is not None:
+                self._cache_parsed_symbols(
+                    self._symbol_key(task.language, task.blob_hash), parsed
+                )
+            self._apply_result(file_change, result)
+            if on_file_change is not None:
+                on_file_change(file_change)
+
+    def _extract_task(
+        self, task: _ExtractionTask
+    ) -> tuple[ASTExtractionResult | None, _ParsedSymbols | None]:
+        """Extract ``task`` in a worker, returning symbols it parsed for the parent.
+
+        The symbols are sent without their syntax nodes. Only the symbols the
+        hunks matched carry features; the parent reparses the blob if a later
+        hunk lands on one without them.
+        """
+        key = self._symbol_key(task.language, task.blob_hash)
+        already_parsed = key in self._symbol_cache
+        result = self.extract_file_change(task, language=task.language)
+        parsed = None if already_parsed else self._symbol_cache.get(key)
+        if parsed is None:
+            return result, None
+
+        symbols = [replace(symbol, node=None) for symbol in parsed.index.symbols]
+        return result, _ParsedSymbols(index=SymbolIntervalIndex(symbols))
+
+    def _apply_result(
+        self, file_change: Any, result: ASTExtractionResult | None
+    ) -> None:
         if result is None:
             return
 
@@ -298,15 +635,12 @@ class ASTSummaryExtractor:
         *,
         language: str | None = None,
     ) -> ASTExtractionResult | None:
-        file_path = getattr(file_change, "new_path", None) or getattr(
-            file_change, "old_path", None
-        )
+        file_path = _file_change_path(file_change)
         language = language or _path_language(file_path)
         if language is None or file_path is None:
             return None
 
-        snapshot = getattr(file_change, "snapshot", None)
-        snapshot_text = getattr(snapshot, "content", "") if snapshot is not None else ""
+        snapshot_text = _snapshot_text(file_change)
 
         if snapshot_text.strip():
             if language == "python":
@@ -340,25 +674,119 @@ class ASTSummaryExtractor:
             hunk_summaries=hunk_summaries,
         )
 
-    def _extract_python_matches(
+    def _symbol_key(self, language: str, blob_hash: str) -> tuple[str, str, str]:
+        return (self.ast_schema_version, language, blob_hash)
+
+    def _cache_parsed_symbols(
+        self, key: tuple[str, str, str], parsed: _ParsedSymbols
+    ) -> None:
+        if self.symbol_cache_size:
+            self._symbol_cache[key] = parsed
+            self._symbol_cache.move_to_end(key)
+            if len(self._symbol_cache) > self.symbol_cache_size:
+                self._symbol_cache.popitem(last=False)
+
+    def _get_parsed_symbols(
+        self, language: str, file_path: str, snapshot_text: str
+    ) -> _ParsedSymbols:
+        key = self._symbol_key(language, compute_blob_hash(snapshot_text))
+        cached = self._symbol_cache.get(key)
+        if cached is not None:
+            self._symbol_cache.move_to_end(key)
+            return cached
+
+        if language == "python":
+            parsed = self._parse_python_symbols(file_path, snapshot_text)
+        else:
+            parsed = self._parse_ts_symbols(file_path, snapshot_text, language)
+        self._cache_parsed_symbols(key, parsed)
+        return parsed
+
+    def _resolve_symbol(
         self,
-        file_change: Any,
+        parsed: _ParsedSymbols,
+        language: str,
         file_path: str,
         snapshot_text: str,
-    ) -> list[ASTMatch]:
+        start_line: int,
+        end_line: int,
+    ) -> tuple[Any | None, _ParsedSymbols]:
+        symbol = parsed.index.resolve(start_line, end_line)
+        if symbol is not None and symbol.node is None and symbol.features is None:
+            # A worker shipped this table without the symbol's features.
+            self._symbol_cache.pop(
+                self._symbol_key(language, compute_blob_hash(snapshot_text)), None
+            )
+            parsed = self._get_parsed_symbols(language, file_path, snapshot_text)
+            symbol = parsed.index.resolve(start_line, end_line)
+        return symbol, parsed
+
+    def _parse_python_symbols(
+        self, file_path: str, snapshot_text: str
+    ) -> _ParsedSymbols:
         try:
             module = ast.parse(snapshot_text)
         except SyntaxError as exc:
             logger.debug("Python AST parse failed for %s: %s", file_path, exc)
+            return _ParsedSymbols(index=SymbolIntervalIndex([]))
+        return _ParsedSymbols(
+            index=SymbolIntervalIndex(self._collect_python_symbols(module))
+        )
+
+    def _parse_ts_symbols(
+        self, file_path: str, snapshot_text: str, language: str
+    ) -> _ParsedSymbols:
+        parser = self._get_ts_parser(language)
+        if parser is None:
+            return _ParsedSymbols(index=SymbolIntervalIndex([]))
+
+        source = snapshot_text.encode("utf-8")
+        tree_key = (language, file_path)
+        previous = (
+            self._ts_trees_by_path.get(tree_key) if self.incremental_parse else None
+        )
+        try:
+            if previous is not None:
+                previous_source, previous_tree = previous
+                tree = parser.parse(
+                    source,
+                    _edit_tree_for_source(previous_tree, previous_source, source),
+                )
+            else:
+                tree = parser.parse(source)
+        except Exception as exc:
+            logger.debug("Tree-sitter parse failed for %s: %s", file_path, exc)
+            return _ParsedSymbols(index=SymbolIntervalIndex([]))
+
+        if self.incremental_parse:
+            self._ts_trees_by_path[tree_key] = (source, tree)
+            self._ts_trees_by_path.move_to_end(tree_key)
+            if len(self._ts_trees_by_path) > max(1, self.symbol_cache_size):
+                self._ts_trees_by_path.popitem(last=False)
+        return _ParsedSymbols(
+            index=SymbolIntervalIndex(self._collect_ts_symbols(tree.root_node, source)),
+            source=source,
+            tree=tree,
+        )
+
+    def _extract_python_matches(
+        self,
+        file_change: Any,
+        file_path: str,
+        snapshot_text: str,
+    ) -> list[ASTMatch]:
+        parsed = self._get_parsed_symbols("python", file_path, snapshot_text)
+        if not parsed.index:
             return []
 
-        symbols = self._collect_python_symbols(module)
         status = getattr(file_change, "status", FileChangeStatus.MODIFIED)
         matches: list[ASTMatch] = []
 
         for hunk_index, hunk in enumerate(getattr(file_change, "hunks", [])):
             start_line, end_line = _extract_changed_line_span(hunk, status)
-            symbol = self._resolve_python_symbol(symbols, start_line, end_line)
+            symbol, parsed = self._resolve_symbol(
+                parsed, "python", file_path, snapshot_text, start_line, end_line
+            )
             if symbol is None:
                 continue
             added_lines, removed_lines, _ = _split_diff_sections(
@@ -373,6 +801,7 @@ class ASTSummaryExtractor:
                 descriptors.append(f"added call {call_name}")
             for call_name in sorted(removed_calls - added_calls):
                 descriptors.append(f"removed call {call_name}")
+            features = self._get_python_symbol_features(symbol)
             matches.append(
                 ASTMatch(
                     language="python",
@@ -383,13 +812,11 @@ class ASTSummaryExtractor:
                     enclosing_symbol=symbol.enclosing_symbol,
                     changed_lines=(start_line, end_line),
                     change_descriptors=list(dict.fromkeys(descriptors)),
-                    call_names=self._extract_python_call_names(symbol.node)
-                    | added_calls
-                    | removed_calls,
-                    import_names=self._extract_python_import_names(symbol.node)
-                    | _extract_diff_imports(added_lines + removed_lines),
+                    call_names=added_calls | removed_calls | features.call_names,
+                    import_names=_extract_diff_imports(added_lines + removed_lines)
+                    | features.import_names,
                     export_names=set(),
-                    type_names=self._extract_python_type_names(symbol.node),
+                    type_names=set(features.type_names),
                     motifs=motifs,
                 )
             )
@@ -459,20 +886,14 @@ class ASTSummaryExtractor:
             )
         return symbols
 
-    def _resolve_python_symbol(
-        self, symbols: list[_PythonSymbol], start_line: int, end_line: int
-    ) -> _PythonSymbol | None:
-        overlapping = [
-            symbol
-            for symbol in symbols
-            if not (symbol.end_line < start_line or symbol.start_line > end_line)
-        ]
-        if not overlapping:
-            return None
-        return min(
-            overlapping,
-            key=lambda symbol: (symbol.end_line - symbol.start_line, symbol.path),
-        )
+    def _get_python_symbol_features(self, symbol: _PythonSymbol) -> _SymbolFeatures:
+        if symbol.features is None:
+            symbol.features = _SymbolFeatures(
+                call_names=frozenset(self._extract_python_call_names(symbol.node)),
+                import_names=frozenset(self._extract_python_import_names(symbol.node)),
+                type_names=frozenset(self._extract_python_type_names(symbol.node)),
+            )
+        return symbol.features
 
     def _extract_python_call_names(self, node: ast.AST) -> set[str]:
         names: set[str] = set()
@@ -515,24 +936,18 @@ class ASTSummaryExtractor:
         snapshot_text: str,
         language: str,
     ) -> list[ASTMatch]:
-        parser = self._get_ts_parser(language)
-        if parser is None:
-            return []
-
-        source = snapshot_text.encode("utf-8")
-        try:
-            tree = parser.parse(source)
-        except Exception as exc:
-            logger.debug("Tree-sitter parse failed for %s: %s", file_path, exc)
+        parsed = self._get_parsed_symbols(language, file_path, snapshot_text)
+        if not parsed.index:
             return []
 
-        symbols = self._collect_ts_symbols(tree.root_node, source)
         status = getattr(file_change, "status", FileChangeStatus.MODIFIED)
         matches: list[ASTMatch] = []
 
         for hunk_index, hunk in enumerate(getattr(file_change, "hunks", [])):
             start_line, end_line = _extract_changed_line_span(hunk, status)
-            symbol = self._resolve_ts_symbol(symbols, start_line, end_line)
+            symbol, parsed = self._resolve_symbol(
+                parsed, language, file_path, snapshot_text, start_line, end_line
+            )
             if symbol is None:
                 continue
             added_lines, removed_lines, _ = _split_diff_sections(
@@ -547,9 +962,7 @@ class ASTSummaryExtractor:
                 descriptors.append(f"added call {call_name}")
             for call_name in sorted(removed_calls - added_calls):
                 descriptors.append(f"removed call {call_name}")
-            call_names, import_names, export_names, type_names = (
-                self._extract_ts_features(symbol.node, source)
-            )
+            features = self._get_ts_symbol_features(symbol, parsed.source)
             matches.append(
                 ASTMatch(
                     language=language,
@@ -560,11 +973,11 @@ class ASTSummaryExtractor:
                     enclosing_symbol=symbol.enclosing_symbol,
                     changed_lines=(start_line, end_line),
                     change_descriptors=list(dict.fromkeys(descriptors)),
-                    call_names=call_names | added_calls | removed_calls,
-                    import_names=import_names
-                    | _extract_diff_imports(added_lines + removed_lines),
-                    export_names=export_names,
-                    type_names=type_names,
+                    call_names=added_calls | removed_calls | features.call_names,
+                    import_names=_extract_diff_imports(added_lines + removed_lines)
+                    | features.import_names,
+                    export_names=set(features.export_names),
+                    type_names=set(features.type_names),
                     motifs=motifs,
                 )
             )
@@ -662,20 +1075,20 @@ class ASTSummaryExtractor:
             enclosing_symbol=enclosing_symbol,
         )
 
-    def _resolve_ts_symbol(
-        self, symbols: list[_TSSymbol], start_line: int, end_line: int
-    ) -> _TSSymbol | None:
-        overlapping = [
-            symbol
-            for symbol in symbols
-            if not (symbol.end_line < start_line or symbol.start_line > end_line)
-        ]
-        if not overlapping:
-            return None
-        return min(
-            overlapping,
-            key=lambda symbol: (symbol.end_line - symbol.start_line, symbol.path),
-        )
+    def _get_ts_symbol_features(
+        self, symbol: _TSSymbol, source: bytes
+    ) -> _SymbolFeatures:
+        if symbol.features is None:
+            call_names, import_names, export_names, type_names = (
+                self._extract_ts_features(symbol.node, source)
+            )
+            symbol.features = _SymbolFeatures(
+                call_names=frozenset(call_names),
+                import_names=frozenset(import_names),
+                export_names=frozenset(export_names),
+                type_names=frozenset(type_names),
+            )
+        return symbol.features
 
     def _extract_ts_features(
         self, node: Any, source: bytes
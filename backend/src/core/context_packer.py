@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Sequence
+
+import tiktoken
+
+from utils.logger import logger
+
+FALLBACK_ENCODING = "o200k_base"
+MIN_TRUNCATED_ITEM_TOKENS = 32
+TRUNCATION_MARKER = "\n...[truncated]"
+# Word pieces of up to four characters, punctuation and newlines each count as
+# one token, which tracks BPE tokenizers closely enough for code and prose.
+APPROXIMATE_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]|\n")
+
+
+@lru_cache(maxsize=8)
+def _load_encoding(model: str | None) -> Any | None:
+    try:
+        try:
+            return tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:  # encoding files are fetched on first use and may be unavailable
+        logger.warning(
+            "Could not load a tiktoken encoding for %s; context budgets will use "
+            "approximate token counts",
+            model or FALLBACK_ENCODING,
+        )
+        return None
+
+
+def preload_encoding(model: str | None = None) -> bool:
+    """Loads the encoding up front so the first request does not fetch it."""
+    return _load_encoding(model) is not None
+
+
+class TokenCounter:
+    """Counts prompt tokens with the model's tiktoken encoding.
+
+    If the encoding files cannot be loaded (for example offline, before they
+    are cached), counts fall back to an approximation, so budgets are only
+    approximate in that case.
+    """
+
+    def __init__(self, model: str | None = None):
+        self.model = model
+        self._encoding = _load_encoding(model)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(APPROXIMATE_TOKEN_PATTERN.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> tuple[str, bool]:
+        if self.count(text) <= max_tokens:
+            return text, False
+
+        keep = max(0, max_tokens - self.count(TRUNCATION_MARKER))
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            head = self._encoding.decode(tokens[:keep])
+        else:
+            matches = list(APPROXIMATE_TOKEN_PATTERN.finditer(text))
+            head = text[: matches[keep].start()] if keep < len(matches) else text
+        return head + TRUNCATION_MARKER, True
+
+
+@dataclass(frozen=True)
+class PackedItem:
+    index: int
+    text: str
+    tokens: int
+    truncated: bool = False
+
+
+@dataclass(frozen=True)
+class PackedContext:
+    items: list[PackedItem]
+    used_tokens: int
+    dropped: int
+
+    @property
+    def partial(self) -> bool:
+        return self.dropped > 0 or any(item.truncated for item in self.items)
+
+
+class ContextPacker:
+    """Packs context items, most valuable first, into a token budget.
+
+    An item that does not fit is truncated to the remaining budget when enough
+    of it is left to be useful, and dropped otherwise. Smaller items further
+    down can still use the space that is left.
+    """
+
+    def __init__(self, token_budget: int, counter: TokenCounter | None = None):
+        self.token_budget = max(1, token_budget)
+        self.counter = counter or TokenCounter()
+
+    def pack(
+        self, texts: Sequence[str], *, max_item_tokens: int | None = None
+    ) -> PackedContext:
+        items: list[PackedItem] = []
+        used_tokens = 0
+        dropped = 0
+        for index, text in enumerate(texts):
+            limit = self.token_budget - used_tokens
+            if max_item_tokens is not None:
+                limit = min(limit, max_item_tokens)
+
+            tokens = self.counter.count(text)
+            truncated = False
+            if tokens > limit:
+                if limit < MIN_TRUNCATED_ITEM_TOKENS:
+                    dropped += 1
+                    continue
+                text, truncated = self.counter.truncate(text, limit)
+                tokens = self.counter.count(text)
+
+            items.append(PackedItem(index, text, tokens, truncated))
+            used_tokens += tokens
+
+        return PackedContext(items=items, used_tokens=used_tokens, dropped=dropped)
@@ -0,0 +1,400 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from threading import Lock
+from typing import Any
+
+import pygit2
+
+from core.patch_text import build_patch_hunks, patch_line_counts
+from data.data_model import DiffHunk, FileChange, FileSnapshot
+from data.schema import FileChangeStatus
+
+EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+ZERO_OID = "0" * 40
+DIFF_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Rough per-object overhead so entries without hunk text still count.
+DIFF_ENTRY_OVERHEAD_BYTES = 256
+FIND_RENAMES_AND_COPIES = pygit2.GIT_DIFF_FIND_RENAMES | pygit2.GIT_DIFF_FIND_COPIES
+
+# Patterns containing "/" match the whole path; the rest match the file name.
+DEFAULT_INGEST_EXCLUDE_PATTERNS = (
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "Gemfile.lock",
+    "Cargo.lock",
+    "poetry.lock",
+    "composer.lock",
+    "uv.lock",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*/node_modules/*",
+    "*/vendor/*",
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.bmp",
+    "*.tiff",
+    "*.ico",
+    "*.webp",
+    "*.heic",
+    "*.heif",
+    "*.avif",
+    "*.pdf",
+    "*.zip",
+    "*.gz",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+)
+
+
+@dataclass(frozen=True)
+class IngestSkipPolicy:
+    exclude_patterns: tuple[str, ...] = DEFAULT_INGEST_EXCLUDE_PATTERNS
+    max_blob_bytes: int = 1_000_000
+    max_hunk_bytes: int = 200_000
+    skip_binary: bool = True
+
+    def is_excluded(self, path: str | None) -> bool:
+        if not path:
+            return False
+        anchored_path = f"/{path}"
+        file_name = os.path.basename(path)
+        return any(
+            fnmatch(anchored_path if "/" in pattern else file_name, pattern)
+            for pattern in self.exclude_patterns
+        )
+
+    def skip_reason_before_patch(
+        self, repo: pygit2.Repository, delta: pygit2.DiffDelta
+    ) -> str | None:
+        """Reasons known without loading blob content, checked before a patch is built.
+
+        Tree-to-tree deltas carry no blob sizes yet, so they come from the
+        object headers.
+        """
+        if self.is_excluded(delta.new_file.path) or self.is_excluded(
+            delta.old_file.path
+        ):
+            return "excluded"
+        blob_bytes = max(
+            read_blob_size(repo, delta.new_file.id),
+            read_blob_size(repo, delta.old_file.id),
+        )
+        if blob_bytes > self.max_blob_bytes:
+            return "blob_too_large"
+        return None
+
+    def skip_reason(self, delta: pygit2.DiffDelta) -> str | None:
+        if self.is_excluded(delta.new_file.path) or self.is_excluded(
+            delta.old_file.path
+        ):
+            return "excluded"
+        if self.skip_binary and delta.is_binary:
+            return "binary"
+        if max(delta.new_file.size, delta.old_file.size) > self.max_blob_bytes:
+            return "blob_too_large"
+        return None
+
+
+DEFAULT_INGEST_SKIP_POLICY = IngestSkipPolicy()
+
+
+@dataclass(frozen=True)
+class DiffEntry:
+    """One file's part of a tree-pair diff; immutable so it can be cached."""
+
+    status_code: int
+    old_path: str
+    new_path: str
+    hunks: tuple[DiffHunk, ...]
+    additions: int
+    deletions: int
+    old_blob_id: str | None = None
+    new_blob_id: str | None = None
+    skip_reason: str | None = None
+
+    def build_hunks(self, commit_sha: str) -> list[DiffHunk]:
+        return [
+            hunk.model_copy(update={"commit_sha": commit_sha}) for hunk in self.hunks
+        ]
+
+
+def file_change_status(status_code: int) -> FileChangeStatus:
+    if status_code == 1:
+        return FileChangeStatus.ADDED
+    if status_code == 2:
+        return FileChangeStatus.DELETED
+    if status_code == 3:
+        return FileChangeStatus.MODIFIED
+    if status_code == 4:
+        return FileChangeStatus.RENAMED
+    if status_code == 5:
+        return FileChangeStatus.COPIED
+    raise ValueError(f"Invalid status: {status_code}")
+
+
+def read_blob_size(repo: pygit2.Repository, blob_id: Any) -> int:
+    """Size of a blob from its object header, without inflating the content."""
+    if not blob_id or str(blob_id) == ZERO_OID:
+        return 0
+    try:
+        _, size = repo.odb.read_header(blob_id)
+    except (KeyError, ValueError):
+        # Gitlinks point at commits that live in another repository.
+        return 0
+    return size
+
+
+def read_blob_text(repo: pygit2.Repository, blob_id: str | None) -> str | None:
+    """Decode a blob straight from its OID; no tree traversal is needed."""
+    if not blob_id or blob_id == ZERO_OID:
+        return None
+    try:
+        blob = repo[blob_id]
+    except (KeyError, ValueError):
+        # Gitlinks point at commits that live in another repository.
+        return None
+    if not isinstance(blob, pygit2.Blob):
+        return None
+    # Strip NUL characters to avoid DB errors when storing as TEXT
+    return blob.data.decode("utf-8", "replace").replace("\x00", "")
+
+
+def build_file_change(
+    repo: pygit2.Repository,
+    entry: DiffEntry,
+    *,
+    commit_sha: str,
+    base_commit_sha: str | None = None,
+    include_previous_snapshot: bool = False,
+) -> FileChange:
+    status = file_change_status(entry.status_code)
+    previous_snapshot = None
+    if status == FileChangeStatus.DELETED:
+        snapshot_path = entry.old_path or entry.new_path
+        snapshot_blob_id = entry.old_blob_id
+    else:
+        snapshot_path = entry.new_path or entry.old_path
+        snapshot_blob_id = entry.new_blob_id
+        if include_previous_snapshot and status in {
+            FileChangeStatus.MODIFIED,
+            FileChangeStatus.RENAMED,
+            FileChangeStatus.COPIED,
+        }:
+            previous_snapshot = FileSnapshot(
+                path=entry.old_path,
+                content=read_blob_text(repo, entry.old_blob_id) or "",
+                commit_sha=base_commit_sha,
+            )
+
+    # Skipped changes are placeholders whose content is never read.
+    snapshot_text = (
+        read_blob_text(repo, snapshot_blob_id) if entry.skip_reason is None else None
+    )
+    return FileChange(
+        old_path=entry.old_path,
+        new_path=entry.new_path,
+        status=status,
+        hunks=entry.build_hunks(commit_sha),
+        snapshot=FileSnapshot(
+            path=snapshot_path,
+            content=snapshot_text or "",
+            commit_sha=commit_sha,
+            previous_snapshot=previous_snapshot,
+        ),
+        commit_sha=commit_sha,
+        skip_reason=entry.skip_reason,
+    )
+
+
+def estimate_entries_bytes(entries: tuple[DiffEntry, ...]) -> int:
+    size = 0
+    for entry in entries:
+        size += DIFF_ENTRY_OVERHEAD_BYTES + len(entry.old_path) + len(entry.new_path)
+        for hunk in entry.hunks:
+            size += DIFF_ENTRY_OVERHEAD_BYTES + len(hunk.content or "")
+    return size
+
+
+class DiffEngine:
+    """Builds tree-pair diffs for ingest, branch loading and review.
+
+    Results are kept in an LRU keyed by the two tree OIDs and the diff
+    options, bounded by the approximate size of the cached hunk text. Tree
+    OIDs are content hashes, so an entry stays valid for as long as it is
+    cached, even across repositories. Callers that visit each tree pair once,
+    like ingest and branch walks, pass ``use_cache=False`` so they neither pay
+    for nor evict the entries that review comparisons reuse.
+    """
+
+    def __init__(self, max_bytes: int = DIFF_CACHE_MAX_BYTES):
+        self.max_bytes = max(0, max_bytes)
+        self._cache: OrderedDict[tuple, tuple[tuple[DiffEntry, ...], int]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def diff_commit(
+        self,
+        repo: pygit2.Repository,
+        commit: pygit2.Commit,
+        *,
+        context_lines: int,
+        skip_policy: IngestSkipPolicy | None = None,
+        use_cache: bool = True,
+    ) -> tuple[DiffEntry, ...]:
+        return self.diff_trees(
+            repo,
+            commit.parents[0].tree if commit.parents else None,
+            commit.tree,
+            context_lines=context_lines,
+            skip_policy=skip_policy,
+            use_cache=use_cache,
+        )
+
+    def diff_trees(
+        self,
+        repo: pygit2.Repository,
+        old_tree: pygit2.Tree | None,
+        new_tree: pygit2.Tree,
+        *,
+        context_lines: int,
+        find_similar_flags: int = 0,
+        skip_policy: IngestSkipPolicy | None = None,
+        use_cache: bool = True,
+    ) -> tuple[DiffEntry, ...]:
+        if not use_cache or not self.max_bytes:
+            return self._build_entries(
+                repo,
+                old_tree,
+                new_tree,
+                context_lines=context_lines,
+                find_similar_flags=find_similar_flags,
+                skip_policy=skip_policy,
+            )
+
+        key = (
+            str(old_tree.id) if old_tree is not None else EMPTY_TREE_SHA,
+            str(new_tree.id),
+            context_lines,
+            find_similar_flags,
+            skip_policy,
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        entries = self._build_entries(
+            repo,
+            old_tree,
+            new_tree,
+            context_lines=context_lines,
+            find_similar_flags=find_similar_flags,
+            skip_policy=skip_policy,
+        )
+        size = estimate_entries_bytes(entries)
+        if size > self.max_bytes:
+            return entries
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self.cached_bytes -= previous[1]
+            self._cache[key] = (entries, size)
+            self.cached_bytes += size
+            while self.cached_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self.cached_bytes -= evicted_size
+        return entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.cached_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _build_entries(
+        self,
+        repo: pygit2.Repository,
+        old_tree: pygit2.Tree | None,
+        new_tree: pygit2.Tree,
+        *,
+        context_lines: int,
+        find_similar_flags: int,
+        skip_policy: IngestSkipPolicy | None,
+    ) -> tuple[DiffEntry, ...]:
+        if old_tree is None:
+            # Root commit: diff the empty tree against the commit's tree.
+            diff = new_tree.diff_to_tree(context_lines=context_lines, swap=True)
+        else:
+            diff = old_tree.diff_to_tree(new_tree, context_lines=context_lines)
+        if find_similar_flags:
+            try:
+                diff.find_similar(flags=find_similar_flags)
+            except Exception:
+                # Rename detection is helpful but not required for a usable diff.
+                pass
+
+        entries: list[DiffEntry] = []
+        for index, delta in enumerate(diff.deltas):
+            # Excluded and oversized changes are decided from paths and object
+            # headers, so libgit2 never loads their blobs or builds a patch.
+            skip_reason = (
+                skip_policy.skip_reason_before_patch(repo, delta)
+                if skip_policy is not None
+                else None
+            )
+            hunks: list[DiffHunk] = []
+            additions = deletions = 0
+            if skip_reason is None:
+                patch = diff[index]
+                delta = patch.delta
+                skip_reason = (
+                    skip_policy.skip_reason(delta) if skip_policy is not None else None
+                )
+                if skip_reason is None:
+                    built_hunks = build_patch_hunks(
+                        patch,
+                        "",
+                        max_hunk_bytes=(
+                            skip_policy.max_hunk_bytes
+                            if skip_policy is not None
+                            else None
+                        ),
+                    )
+                    if built_hunks is None:
+                        skip_reason = "hunk_too_large"
+                    else:
+                        hunks = built_hunks
+                additions, deletions = patch_line_counts(patch)
+            entries.append(
+                DiffEntry(
+                    status_code=delta.status,
+                    old_path=delta.old_file.path or "",
+                    new_path=delta.new_file.path or "",
+                    hunks=tuple(hunks),
+                    additions=additions,
+                    deletions=deletions,
+                    old_blob_id=str(delta.old_file.id),
+                    new_blob_id=str(delta.new_file.id),
+                    skip_reason=skip_reason,
+                )
+            )
+        return tuple(entries)
+
+
+DEFAULT_DIFF_ENGINE = DiffEngine()
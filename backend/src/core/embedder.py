@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 import random
-from threading import Lock
+from threading import Condition, Lock
 from time import perf_counter, sleep
-from typing import TYPE_CHECKING, Any, List
+from typing import TYPE_CHECKING, Any, Iterator, List
 
+from data.embedding_storage import VectorStorage
 from infrastructure.ai_clients import EmbeddingClient, EmbeddingResult
 from infrastructure.errors import AIRateLimitError, AIRequestError
 from utils.logger import logger
@@ -83,6 +86,52 @@ class EmbeddingExecutionStats:
             self.rate_limit_failures += 1
 
 
+class FairBatchSlots:
+    """Concurrency slots handed out round-robin across jobs.
+
+    Each job queues its batches in order; when a slot frees up it goes to the
+    next job in turn, so a job with many queued batches cannot hold every
+    slot until it drains.
+    """
+
+    def __init__(self, slots: int):
+        self._condition = Condition()
+        self._free = slots
+        # Waiting tickets per job; dict order is the round-robin order.
+        self._queues: dict[object, deque[object]] = {}
+        self._granted: set[object] = set()
+
+    @contextmanager
+    def hold(self, job: object) -> Iterator[None]:
+        ticket = object()
+        with self._condition:
+            self._queues.setdefault(job, deque()).append(ticket)
+            self._dispatch()
+            while ticket not in self._granted:
+                self._condition.wait()
+            self._granted.discard(ticket)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._free += 1
+                self._dispatch()
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._free and self._queues:
+            job = next(iter(self._queues))
+            queue = self._queues.pop(job)
+            self._granted.add(queue.popleft())
+            self._free -= 1
+            granted = True
+            if queue:
+                # Back of the line until every other waiting job had a turn.
+                self._queues[job] = queue
+        if granted:
+            self._condition.notify_all()
+
+
 class BaseEmbeddingEngine(ABC):
     """Abstract base class for embedding implementations."""
 
@@ -91,6 +140,7 @@ class BaseEmbeddingEngine(ABC):
         self.token_limit = token_limit
         self.token_chars = 3
         self.observed_dimension: int | None = None
+        self.vector_storage: VectorStorage = "vector"
 
     def estimate_tokens(self, text: str) -> int:
         if not text:
@@ -173,6 +223,9 @@ class BaseEmbeddingEngine(ABC):
                     stats.semantic_tokens += work_item.token_count
 
             for file_change in commit.file_changes:
+                if getattr(file_change, "skip_reason", None) is not None:
+                    # Skipped changes are stored as placeholders without vectors.
+                    continue
                 normalized_hunks: list[str] = []
                 for hunk in file_change.hunks:
                     normalized_hunk = getattr(hunk, "_normalized_diff_text", None)
@@ -299,14 +352,19 @@ class EmbeddingEngine(BaseEmbeddingEngine):
         provider_type: str = "openai",
         base_url: str = "https://api.openai.com",
         profile_fingerprint: str | None = None,
+        vector_storage: VectorStorage = "vector",
     ):
         super().__init__(model=model, token_limit=token_limit)
         self.client = client
         self.max_input_tokens = max_input_tokens
         self.max_concurrency = self.DEFAULT_MAX_CONCURRENCY
+        # Shared by every ingest job using this engine so concurrent syncs
+        # split the provider budget instead of each opening its own pool.
+        self._batch_slots = FairBatchSlots(self.max_concurrency)
         self.provider_type = provider_type
         self.base_url = base_url
         self.profile_fingerprint = profile_fingerprint
+        self.vector_storage = vector_storage
 
     @staticmethod
     def _describe_request_error(exc: AIRequestError) -> str:
@@ -571,6 +629,16 @@ class EmbeddingEngine(BaseEmbeddingEngine):
                 texts[midpoint:], stats=stats
             )
 
+    def _embed_batch_texts_with_slot(
+        self,
+        texts: list[str],
+        *,
+        job: object,
+        stats: EmbeddingExecutionStats | None = None,
+    ) -> list[list[float]]:
+        with self._batch_slots.hold(job):
+            return self._embed_batch_texts(texts, stats=stats)
+
     def embed_work_items(
         self,
         work_items: list[EmbeddingWorkItem],
@@ -583,9 +651,12 @@ class EmbeddingEngine(BaseEmbeddingEngine):
         batches = self._chunk_work_items(work_items)
         completed_batches = 0
         total_batches = len(batches)
+        # Each call takes its turn for slots against other concurrent calls.
+        job = object()
         if len(batches) == 1:
-            embeddings = self._embed_batch_texts(
+            embeddings = self._embed_batch_texts_with_slot(
                 [item.text for item in batches[0]],
+                job=job,
                 stats=stats,
             )
             for item, embedding in zip(batches[0], embeddings):
@@ -597,21 +668,27 @@ class EmbeddingEngine(BaseEmbeddingEngine):
         with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
             future_map = {
                 executor.submit(
-                    self._embed_batch_texts,
+                    self._embed_batch_texts_with_slot,
                     [item.text for item in batch],
+                    job=job,
                     stats=stats,
                 ): index
                 for index, batch in enumerate(batches)
             }
-            for future in as_completed(future_map):
-                batch_index = future_map[future]
-                batch = batches[batch_index]
-                embeddings = future.result()
-                for item, embedding in zip(batch, embeddings):
-                    setattr(item.obj, item.field_name, embedding)
-                completed_batches += 1
-                if on_batch_completed is not None:
-                    on_batch_completed(completed_batches, total_batches, stats)
+            try:
+                for future in as_completed(future_map):
+                    batch_index = future_map[future]
+                    batch = batches[batch_index]
+                    embeddings = future.result()
+                    for item, embedding in zip(batch, embeddings):
+                        setattr(item.obj, item.field_name, embedding)
+                    completed_batches += 1
+                    if on_batch_completed is not None:
+                        on_batch_completed(completed_batches, total_batches, stats)
+            except BaseException:
+                # Don't start queued batches once the caller has bailed out.
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
 
     def embed_batch(self, repo_objects: List[Any]) -> None:
         work_items: list[EmbeddingWorkItem] = []
@@ -0,0 +1,98 @@
+import pygit2
+
+from data.data_model import DiffHunk
+
+_HUNK_HEADER_SEPARATOR = b"\n@@ "
+
+
+def split_patch_hunk_bodies(patch_data: bytes) -> list[bytes]:
+    """Split raw patch text into hunk bodies, dropping file and hunk headers.
+
+    Body lines always start with an origin character (" ", "+", "-" or "\\"),
+    so a line starting with "@@ " can only be a hunk header.
+    """
+    if patch_data.startswith(b"@@ "):
+        start = 0
+    else:
+        start = patch_data.find(_HUNK_HEADER_SEPARATOR)
+        if start < 0:
+            return []
+        start += 1
+
+    segments = patch_data[start:].split(_HUNK_HEADER_SEPARATOR)
+    bodies: list[bytes] = []
+    for index, segment in enumerate(segments):
+        header_end = segment.find(b"\n")
+        body = b"" if header_end < 0 else segment[header_end + 1 :]
+        if index < len(segments) - 1:
+            # The separator consumed the newline ending this body.
+            body += b"\n"
+        bodies.append(body)
+    return bodies
+
+
+def _hunk_text_from_lines(hunk: pygit2.DiffHunk) -> str:
+    hunk_lines = []
+    for line in hunk.lines:
+        content = (
+            line.content.decode("utf-8", "replace")
+            if isinstance(line.content, (bytes, bytearray))
+            else line.content
+        )
+        hunk_lines.append(f"{line.origin}{content}")
+    return "".join(hunk_lines)
+
+
+def build_patch_hunks(
+    patch: pygit2.Patch,
+    commit_sha: str,
+    *,
+    max_hunk_bytes: int | None = None,
+) -> list[DiffHunk] | None:
+    """Build DiffHunks from one patch, or None once a hunk exceeds max_hunk_bytes.
+
+    Hunk text is sliced from ``patch.data`` and decoded once per hunk instead
+    of once per line. "No newline at end of file" markers keep their unified
+    diff form.
+    """
+    pygit_hunks = patch.hunks
+    if not pygit_hunks:
+        return []
+
+    bodies = split_patch_hunk_bodies(patch.data)
+    if len(bodies) != len(pygit_hunks):
+        # Unexpected patch text; fall back to libgit2's per-line view.
+        bodies = None
+
+    hunks: list[DiffHunk] = []
+    for index, hunk in enumerate(pygit_hunks):
+        if bodies is not None:
+            body = bodies[index]
+            if max_hunk_bytes is not None and len(body) > max_hunk_bytes:
+                return None
+            content = body.decode("utf-8", "replace")
+        else:
+            content = _hunk_text_from_lines(hunk)
+            if (
+                max_hunk_bytes is not None
+                and len(content.encode("utf-8")) > max_hunk_bytes
+            ):
+                return None
+
+        hunks.append(
+            DiffHunk(
+                old_start=hunk.old_start,
+                old_lines=hunk.old_lines,
+                new_start=hunk.new_start,
+                new_lines=hunk.new_lines,
+                content=content,
+                commit_sha=commit_sha,
+            )
+        )
+    return hunks
+
+
+def patch_line_counts(patch: pygit2.Patch) -> tuple[int, int]:
+    """Return (additions, deletions) for a patch."""
+    _, additions, deletions = patch.line_stats
+    return additions, deletions
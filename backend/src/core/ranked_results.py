@@ -0,0 +1,101 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable
+
+RANKED_HANDLE_TTL_SECONDS = 300.0
+RANKED_HANDLE_LIMIT = 64
+RANKED_HANDLE_MAX_RESULTS = 1_000
+
+
+@dataclass(frozen=True)
+class RankedResultHandle:
+    request_key: tuple
+    query: str
+    items: tuple[Any, ...]
+    total_ranked_results: int
+    total_relevant_results: int
+    expires_at: float
+
+
+def encode_cursor(handle_id: str, offset: int) -> str:
+    return f"{handle_id}.{offset}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int] | None:
+    handle_id, _, offset = cursor.rpartition(".")
+    if not handle_id or not offset.isdigit():
+        return None
+    return handle_id, int(offset)
+
+
+class RankedResultHandles:
+    """Short-lived server-side copies of fully ranked filter results.
+
+    The first page of a search stores its ranked list here, and later pages
+    are sliced from it by cursor instead of re-ranking. Memory is bounded by
+    the handle count and a per-handle result cap. Expired or evicted handles
+    read as missing, and callers recompute.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = RANKED_HANDLE_TTL_SECONDS,
+        max_handles: int = RANKED_HANDLE_LIMIT,
+        max_results_per_handle: int = RANKED_HANDLE_MAX_RESULTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_handles = max(1, max_handles)
+        self.max_results_per_handle = max(1, max_results_per_handle)
+        self._clock = clock
+        self._handles: OrderedDict[str, RankedResultHandle] = OrderedDict()
+        self._lock = Lock()
+
+    def create(
+        self,
+        request_key: tuple,
+        query: str,
+        items: list[Any],
+        *,
+        total_ranked_results: int,
+        total_relevant_results: int,
+    ) -> str:
+        handle_id = uuid.uuid4().hex
+        handle = RankedResultHandle(
+            request_key=request_key,
+            query=query,
+            items=tuple(items[: self.max_results_per_handle]),
+            total_ranked_results=total_ranked_results,
+            total_relevant_results=total_relevant_results,
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._evict_expired()
+            self._handles[handle_id] = handle
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+        return handle_id
+
+    def get(self, handle_id: str, request_key: tuple) -> RankedResultHandle | None:
+        with self._lock:
+            self._evict_expired()
+            handle = self._handles.get(handle_id)
+        if handle is None or handle.request_key != request_key:
+            return None
+        return handle
+
+    def _evict_expired(self) -> None:
+        now = self._clock()
+        # Handles are inserted in expiry order, so expired ones lead.
+        while self._handles:
+            handle_id, handle = next(iter(self._handles.items()))
+            if handle.expires_at > now:
+                break
+            self._handles.pop(handle_id)
+
+
+DEFAULT_RANKED_RESULT_HANDLES = RankedResultHandles()
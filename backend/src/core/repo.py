@@ -1,10 +1,17 @@
+import hashlib
 import os
 from dataclasses import dataclass
 
 import pygit2
 
 from core.branch import Branch
-from data.data_model import Commit, DiffHunk, FileChange, FileSnapshot
+from core.diff_engine import (
+    DEFAULT_DIFF_ENGINE,
+    DEFAULT_INGEST_SKIP_POLICY,
+    IngestSkipPolicy,
+    build_file_change,
+)
+from data.data_model import Commit
 from data.schema import (
     FileChangeStatus,
     SQLBranch,
@@ -34,6 +41,19 @@ def normalize_repo_path(repo_path: str) -> str:
     return os.path.realpath(os.path.abspath(os.path.expanduser(repo_path)))
 
 
+def compute_branch_heads_fingerprint(branch_heads: dict[str, str | None]) -> str:
+    digest = hashlib.sha256()
+    for branch_name in sorted(branch_heads):
+        head_commit_sha = branch_heads[branch_name]
+        if head_commit_sha is None:
+            continue
+        digest.update(branch_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(head_commit_sha.encode("ascii"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
 class Repo:
     def __init__(
         self,
@@ -66,6 +86,11 @@ class Repo:
 
         return resolved_path, branch_heads
 
+    @classmethod
+    def get_branch_heads_fingerprint(cls, repo_path: str) -> str:
+        _, branch_heads = cls.get_branch_heads(repo_path)
+        return compute_branch_heads_fingerprint(branch_heads)
+
     @classmethod
     def get_branch_states(
         cls,
@@ -102,6 +127,7 @@ class Repo:
         *,
         context_lines: int = 0,
         progress_callback=None,
+        skip_policy: IngestSkipPolicy = DEFAULT_INGEST_SKIP_POLICY,
     ) -> tuple[str, dict[str, Commit]]:
         pygit_repo, resolved_path = cls.open_repo(repo_path)
         commits: dict[str, Commit] = {}
@@ -115,6 +141,7 @@ class Repo:
                 resolved_path,
                 commit,
                 context_lines=context_lines,
+                skip_policy=skip_policy,
             )
             if progress_callback is not None:
                 progress_callback(index, total_commits)
@@ -200,76 +227,26 @@ class Repo:
         commit: pygit2.Commit,
         *,
         context_lines: int,
+        skip_policy: IngestSkipPolicy = DEFAULT_INGEST_SKIP_POLICY,
     ) -> Commit:
-        if commit.parents:
-            diff = pygit_repo.diff(
-                commit.parents[0], commit, context_lines=context_lines
-            )
-        else:
-            diff = commit.tree.diff_to_tree(context_lines=context_lines)
-
-        file_changes: list[FileChange] = []
         commit_sha = str(commit.id)
-        for patch in diff:
-            delta = patch.delta
-            hunks: list[DiffHunk] = []
-
-            for hunk in patch.hunks:
-                hunk_lines = []
-                for line in hunk.lines:
-                    content = (
-                        line.content.decode("utf-8", "replace")
-                        if isinstance(line.content, (bytes, bytearray))
-                        else line.content
-                    )
-                    hunk_lines.append(f"{line.origin}{content}")
-
-                hunks.append(
-                    DiffHunk(
-                        old_start=hunk.old_start,
-                        old_lines=hunk.old_lines,
-                        new_start=hunk.new_start,
-                        new_lines=hunk.new_lines,
-                        content="".join(hunk_lines),
-                        commit_sha=commit_sha,
-                    )
-                )
-
-            status_enum = Repo._get_file_change_status(delta.status)
-            if status_enum == FileChangeStatus.DELETED and commit.parents:
-                snapshot_text = Repo._get_snapshot(
-                    pygit_repo,
-                    commit.parents[0].tree,
-                    delta.old_file.path,
-                )
-            elif status_enum == FileChangeStatus.DELETED:
-                snapshot_text = None
-            else:
-                snapshot_text = Repo._get_snapshot(
-                    pygit_repo,
-                    commit.tree,
-                    delta.new_file.path,
-                )
-
-            snapshot_path = (
-                delta.old_file.path
-                if status_enum == FileChangeStatus.DELETED
-                else delta.new_file.path
-            )
-            file_changes.append(
-                FileChange(
-                    old_path=delta.old_file.path,
-                    new_path=delta.new_file.path,
-                    status=status_enum,
-                    hunks=hunks,
-                    snapshot=FileSnapshot(
-                        path=snapshot_path,
-                        content=snapshot_text or "",
-                        commit_sha=commit_sha,
-                    ),
-                    commit_sha=commit_sha,
-                )
+        old_tree = commit.parents[0].tree if commit.parents else None
+        entries = DEFAULT_DIFF_ENGINE.diff_trees(
+            pygit_repo,
+            old_tree,
+            commit.tree,
+            context_lines=context_lines,
+            skip_policy=skip_policy,
+            use_cache=False,
+        )
+        file_changes = [
+            build_file_change(
+                pygit_repo,
+                entry,
+                commit_sha=commit_sha,
             )
+            for entry in entries
+        ]
 
         return Commit(
             sha=commit_sha,
@@ -282,44 +259,6 @@ class Repo:
             file_changes=file_changes,
         )
 
-    @staticmethod
-    def _get_snapshot(
-        pygit_repo: pygit2.Repository,
-        tree: pygit2.Tree,
-        path: str,
-    ) -> str | None:
-        try:
-            parts = [part for part in path.split("/") if part]
-            current = tree
-            for index, part in enumerate(parts):
-                entry = current[part]
-                obj = pygit_repo[entry.id]
-                if index < len(parts) - 1:
-                    if isinstance(obj, pygit2.Tree):
-                        current = obj
-                        continue
-                    return None
-                if hasattr(obj, "data"):
-                    text = obj.data.decode("utf-8", "replace")
-                    return text.replace("\x00", "")
-                return None
-        except Exception:
-            return None
-
-    @staticmethod
-    def _get_file_change_status(status: int) -> FileChangeStatus:
-        if status == 1:
-            return FileChangeStatus.ADDED
-        if status == 2:
-            return FileChangeStatus.DELETED
-        if status == 3:
-            return FileChangeStatus.MODIFIED
-        if status == 4:
-            return FileChangeStatus.RENAMED
-        if status == 5:
-            return FileChangeStatus.COPIED
-        raise ValueError(f"Invalid status: {status}")
-
     @staticmethod
     def _build_branch_specs(pygit_repo: pygit2.Repository) -> list[dict[str, object]]:
         if not pygit_repo.head_is_unborn and pygit_repo.head_is_detached:
@@ -1,18 +1,35 @@
+import json
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Literal, Optional
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Literal, Optional, Sequence
 
-from sqlalchemy import String, distinct, func, literal, or_, select
+from sqlalchemy import distinct, func, literal, or_, select
 from sqlalchemy.orm import Session, joinedload
 
+from core.context_packer import ContextPacker, TokenCounter
 from core.embedder import EmbeddingEngine
+from core.ranked_results import (
+    DEFAULT_RANKED_RESULT_HANDLES,
+    decode_cursor,
+    encode_cursor,
+)
+from core.vector_index import VectorHit, VectorIndexRegistry
+from data.embedding_storage import embedding_distance, embedding_present
 from data.adapter import DatabaseAdapter
 from data.data_model import Commit, DiffHunk, FileChange
-from data.schema import SQLCommit, SQLDiffHunk, SQLFileChange
+from data.file_exclusions import build_file_exclusion_filter
+from data.schema import (
+    FileChangeStatus,
+    SQLCommit,
+    SQLDiffHunk,
+    SQLFileChange,
+    SQLRepo,
+)
 from utils.logger import logger
 
 
 MatchType = Literal["commit", "file_change", "hunk"]
+SearchMode = Literal["ranked", "hybrid"]
 HighlightStrategy = Literal["exact_query", "target_hunk", "file_header", "none"]
 PreviewKind = Literal["text", "diff"]
 
@@ -25,6 +42,8 @@ PREVIEW_CONTEXT_CHARS = 84
 PREVIEW_MAX_CHARS = 220
 DIFF_PREVIEW_MAX_LINES = 8
 DIFF_PREVIEW_CONTEXT_LINES = 3
+CHAT_CONTEXT_TOP_K = 5
+CHAT_CONTEXT_TOKEN_BUDGET = 2_000
 
 
 @dataclass(frozen=True)
@@ -68,6 +87,7 @@ class FilterExecutionResult:
     total_relevant_results: int
     has_more_relevant: bool
     max_results: int
+    next_cursor: str | None = None
 
 
 def _escape_like_query(value: str) -> str:
@@ -78,6 +98,12 @@ def _escape_like_query(value: str) -> str:
     )
 
 
+def _limit_statement(statement, limit: int | None, *order_by):
+    if limit is None:
+        return statement
+    return statement.order_by(*order_by).limit(limit)
+
+
 def _normalize_preview_text(value: str | None) -> str:
     if not value:
         return ""
@@ -226,51 +252,37 @@ class Retriever:
     MIN_ADAPTIVE_SCORE_DROP = 0.08
     ADAPTIVE_DROP_SPREAD_WEIGHT = 0.75
     ADAPTIVE_DROP_SPREAD_CAP = 0.10
-
-    EXCLUDED_FILE_PATTERNS = [
-        ".gitignore",
-        "package-lock.json",
-        "package.json",
-        "yarn.lock",
-        "pnpm-lock.yaml",
-        "Gemfile.lock",
-        "Cargo.lock",
-        "poetry.lock",
-        "composer.lock",
-        "go.sum",
-        ".env",
-        ".env.example",
-        "components.json",
-        "tsconfig.json",
-        "jsconfig.json",
-        ".prettierrc",
-        ".eslintrc",
-        "tailwind.config",
-        "vite.config",
-        "webpack.config",
-        "rollup.config",
-        ".png",
-        ".jpg",
-        ".jpeg",
-        ".gif",
-        ".bmp",
-        ".tiff",
-        ".ico",
-        ".webp",
-        ".heic",
-        ".heif",
-        ".avif",
-    ]
+    # Hybrid mode: per-source candidate cap and reciprocal rank fusion constant.
+    HYBRID_SOURCE_LIMIT = 50
+    RRF_K = 60
+    # Chat context: per-source over-fetch before the top-k cut, and no
+    # distance cutoff when searching the vector index.
+    CHAT_CONTEXT_SOURCE_FACTOR = 2
+    CHAT_CONTEXT_MAX_DISTANCES = {
+        "commit": 2.0,
+        "file_change": 2.0,
+        "hunk": 2.0,
+    }
+    ranked_result_handles = DEFAULT_RANKED_RESULT_HANDLES
+    chat_context_top_k = CHAT_CONTEXT_TOP_K
+    chat_context_token_budget = CHAT_CONTEXT_TOKEN_BUDGET
 
     def __init__(
         self,
         session: Session,
         embedder: EmbeddingEngine | None,
         db_adapter: DatabaseAdapter,
+        vector_indexes: VectorIndexRegistry | None = None,
+        *,
+        chat_context_top_k: int = CHAT_CONTEXT_TOP_K,
+        chat_context_token_budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
     ):
         self.session = session
         self.embedder = embedder
         self.db_adapter = db_adapter
+        self.vector_indexes = vector_indexes
+        self.chat_context_top_k = max(1, chat_context_top_k)
+        self.chat_context_token_budget = max(1, chat_context_token_budget)
         self.filter_actions = {
             "author": lambda q, v: q.filter(SQLCommit.author.ilike(f"%{v}%")),
             "start_date": lambda q, v: q.filter(SQLCommit.time >= v),
@@ -296,17 +308,6 @@ class Retriever:
             return None
         return self.embedder.embed_query(query)
 
-    def _build_file_exclusion_filter(self):
-        exclusion_matches = []
-        for pattern in self.EXCLUDED_FILE_PATTERNS:
-            exclusion_matches.append(
-                or_(
-                    SQLFileChange.new_path.ilike(f"%{pattern}%"),
-                    SQLFileChange.old_path.ilike(f"%{pattern}%"),
-                )
-            )
-        return ~or_(*exclusion_matches)
-
     def _format_status(self, status: Any) -> str:
         return {
             "ADDED": "added",
@@ -491,69 +492,109 @@ class Retriever:
             return self.db_adapter.parse_sql_hunk(result)
         return None
 
-    def _get_representative_hunks(
-        self, file_change_ids: list[int]
-    ) -> dict[int, dict[str, Any]]:
-        if not file_change_ids:
-            return {}
-
-        rows = self.session.execute(
-            select(
-                SQLDiffHunk.id.label("id"),
-                SQLDiffHunk.file_change_id.label("file_change_id"),
-                SQLDiffHunk.content.label("content"),
-                SQLDiffHunk.old_start.label("old_start"),
-                SQLDiffHunk.old_lines.label("old_lines"),
-                SQLDiffHunk.new_start.label("new_start"),
-                SQLDiffHunk.new_lines.label("new_lines"),
-            )
-            .where(SQLDiffHunk.file_change_id.in_(file_change_ids))
-            .order_by(
-                SQLDiffHunk.file_change_id,
-                SQLDiffHunk.new_start,
-                SQLDiffHunk.old_start,
-                SQLDiffHunk.id,
-            )
-        ).mappings().all()
-
-        representative_hunks: dict[int, dict[str, Any]] = {}
-        for row in rows:
-            representative_hunks.setdefault(row["file_change_id"], dict(row))
-
-        return representative_hunks
+    def _materialize_previews(
+        self, candidates: Sequence[FilterCandidate]
+    ) -> list[FilterCandidate]:
+        """Load preview text for the candidates of one result page.
+
+        Candidate queries only carry ids and scores, so commit messages and
+        hunk contents are fetched here in a batch once the page is known.
+        """
+        commit_shas = {
+            candidate.sha
+            for candidate in candidates
+            if candidate.preview_source is None and candidate.match_type == "commit"
+        }
+        hunk_ids = {
+            candidate.hunk_id
+            for candidate in candidates
+            if candidate.preview_source is None
+            and candidate.match_type == "hunk"
+            and candidate.hunk_id is not None
+        }
+        file_change_ids = {
+            candidate.file_change_id
+            for candidate in candidates
+            if candidate.preview_source is None
+            and candidate.match_type == "file_change"
+            and candidate.file_change_id is not None
+        }
 
-    def _attach_file_change_diff_previews(
-        self, rows: list[dict[str, Any]]
-    ) -> list[dict[str, Any]]:
-        file_change_ids = [
-            int(row["file_change_id"])
-            for row in rows
-            if row.get("file_change_id") is not None
-        ]
-        representative_hunks = self._get_representative_hunks(file_change_ids)
+        messages: dict[str, str] = {}
+        if commit_shas:
+            messages = {
+                row.sha: row.message
+                for row in self.session.execute(
+                    select(SQLCommit.sha, SQLCommit.message).where(
+                        SQLCommit.sha.in_(commit_shas)
+                    )
+                ).all()
+            }
 
-        enriched_rows: list[dict[str, Any]] = []
-        for row in rows:
-            next_row = dict(row)
-            representative_hunk = representative_hunks.get(
-                next_row.get("file_change_id")
-            )
-            if representative_hunk:
-                next_row["preview_source"] = representative_hunk["content"]
-                next_row["preview_kind"] = "diff"
-                next_row["preview_old_start"] = representative_hunk["old_start"]
-                next_row["preview_old_lines"] = representative_hunk["old_lines"]
-                next_row["preview_new_start"] = representative_hunk["new_start"]
-                next_row["preview_new_lines"] = representative_hunk["new_lines"]
+        hunks: dict[int, Any] = {}
+        representative_hunks: dict[int, Any] = {}
+        if hunk_ids or file_change_ids:
+            rows = self.session.execute(
+                select(
+                    SQLDiffHunk.id,
+                    SQLDiffHunk.file_change_id,
+                    SQLDiffHunk.content,
+                    SQLDiffHunk.old_start,
+                    SQLDiffHunk.old_lines,
+                    SQLDiffHunk.new_start,
+                    SQLDiffHunk.new_lines,
+                )
+                .where(
+                    or_(
+                        SQLDiffHunk.id.in_(hunk_ids),
+                        SQLDiffHunk.file_change_id.in_(file_change_ids),
+                    )
+                )
+                .order_by(
+                    SQLDiffHunk.file_change_id,
+                    SQLDiffHunk.new_start,
+                    SQLDiffHunk.old_start,
+                    SQLDiffHunk.id,
+                )
+            ).all()
+            for row in rows:
+                hunks[row.id] = row
+                if row.file_change_id in file_change_ids:
+                    # A file change is previewed by its first hunk.
+                    representative_hunks.setdefault(row.file_change_id, row)
+
+        materialized: list[FilterCandidate] = []
+        for candidate in candidates:
+            if candidate.preview_source is not None:
+                materialized.append(candidate)
+            elif candidate.match_type == "commit":
+                materialized.append(
+                    replace(candidate, preview_source=messages.get(candidate.sha))
+                )
+            elif candidate.match_type == "hunk":
+                hunk = hunks.get(candidate.hunk_id)
+                materialized.append(
+                    replace(candidate, preview_source=hunk.content)
+                    if hunk is not None
+                    else candidate
+                )
             else:
-                next_row["preview_kind"] = "text"
-                next_row["preview_old_start"] = None
-                next_row["preview_old_lines"] = None
-                next_row["preview_new_start"] = None
-                next_row["preview_new_lines"] = None
-            enriched_rows.append(next_row)
+                hunk = representative_hunks.get(candidate.file_change_id)
+                materialized.append(
+                    replace(
+                        candidate,
+                        preview_source=hunk.content,
+                        preview_kind="diff",
+                        preview_old_start=hunk.old_start,
+                        preview_old_lines=hunk.old_lines,
+                        preview_new_start=hunk.new_start,
+                        preview_new_lines=hunk.new_lines,
+                    )
+                    if hunk is not None
+                    else candidate
+                )
 
-        return enriched_rows
+        return materialized
 
     def _build_filter_result(
         self, candidate: FilterCandidate, query: str | None = None
@@ -726,6 +767,87 @@ class Retriever:
 
         return ranked_candidates
 
+    def _fuse_candidates(
+        self, candidates: list[FilterCandidate]
+    ) -> list[RankedFilterResult]:
+        # Every (source, match type) pair is one ranked list. A commit scores
+        # 1 / (RRF_K + rank) for its best position in each list it appears in.
+        ranked_lists: dict[tuple[bool, str], list[FilterCandidate]] = {}
+        for candidate in candidates:
+            ranked_lists.setdefault(
+                (candidate.exact_match, candidate.match_type), []
+            ).append(candidate)
+
+        grouped: dict[str, list[FilterCandidate]] = {}
+        fused_scores: dict[str, float] = {}
+        for (exact_match, _match_type), ranked_list in ranked_lists.items():
+            if exact_match:
+                ranked_list.sort(
+                    key=lambda candidate: (-(candidate.commit_time or 0), candidate.sha)
+                )
+            else:
+                ranked_list.sort(
+                    key=lambda candidate: (
+                        -self._candidate_semantic_score(candidate),
+                        candidate.sha,
+                    )
+                )
+
+            ranked_shas: set[str] = set()
+            for candidate in ranked_list:
+                grouped.setdefault(candidate.sha, []).append(candidate)
+                if candidate.sha in ranked_shas:
+                    continue
+                ranked_shas.add(candidate.sha)
+                fused_scores[candidate.sha] = fused_scores.get(
+                    candidate.sha, 0.0
+                ) + 1.0 / (self.RRF_K + len(ranked_shas))
+
+        ranked_candidates: list[RankedFilterResult] = []
+        for sha, group in grouped.items():
+            semantic_candidates = [
+                candidate for candidate in group if candidate.similarity is not None
+            ]
+            best_semantic_candidate = max(
+                semantic_candidates,
+                key=self._candidate_semantic_score,
+                default=None,
+            )
+            _, best_exact_candidate = self._best_exact_match_bonus(group)
+            ranked_candidates.append(
+                RankedFilterResult(
+                    final_score=fused_scores[sha],
+                    exact_bonus=0.0,
+                    semantic_score=(
+                        self._candidate_semantic_score(best_semantic_candidate)
+                        if best_semantic_candidate is not None
+                        else 0.0
+                    ),
+                    recency_score=0.0,
+                    display_candidate=(
+                        best_exact_candidate
+                        if best_exact_candidate is not None
+                        else min(group, key=_candidate_display_sort_key)
+                    ),
+                    similarity=(
+                        best_semantic_candidate.similarity
+                        if best_semantic_candidate is not None
+                        else None
+                    ),
+                )
+            )
+
+        ranked_candidates.sort(
+            key=lambda item: (
+                -item.final_score,
+                -item.semantic_score,
+                MATCH_TYPE_PRIORITY.get(item.display_candidate.match_type, 99),
+                -(item.display_candidate.commit_time or 0),
+                item.display_candidate.sha,
+            )
+        )
+        return ranked_candidates
+
     def _adaptive_relevance_threshold(
         self,
         ranked_results: list[RankedFilterResult],
@@ -771,28 +893,131 @@ class Retriever:
         ranked_results: list[RankedFilterResult],
         query: str,
         max_results: int,
+        *,
+        filter_relevant: bool = True,
+        request_key: tuple | None = None,
     ) -> FilterExecutionResult:
-        relevant_results = self._filter_relevant_ranked_results(ranked_results)
-        limited_results = relevant_results[:max_results]
-        results: list[dict[str, Any]] = []
-
-        for item in limited_results:
-            result = self._build_filter_result(item.display_candidate, query)
-            result["similarity"] = item.similarity
-            results.append(result)
-
+        relevant_results = (
+            self._filter_relevant_ranked_results(ranked_results)
+            if filter_relevant
+            else ranked_results
+        )
         total_ranked_results = len(ranked_results)
         total_relevant_results = len(relevant_results)
+
+        next_cursor = None
+        if request_key is not None and total_relevant_results > max_results:
+            handle_id = self.ranked_result_handles.create(
+                request_key,
+                query,
+                relevant_results,
+                total_ranked_results=total_ranked_results,
+                total_relevant_results=total_relevant_results,
+            )
+            next_cursor = encode_cursor(handle_id, max_results)
+
         return FilterExecutionResult(
-            results=results,
+            results=self._build_ranked_page(relevant_results[:max_results], query),
             total_ranked_results=total_ranked_results,
             total_relevant_results=total_relevant_results,
             has_more_relevant=total_relevant_results > max_results,
             max_results=max_results,
+            next_cursor=next_cursor,
+        )
+
+    def _build_ranked_page(
+        self, page: Sequence[RankedFilterResult], query: str
+    ) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        candidates = self._materialize_previews(
+            [item.display_candidate for item in page]
+        )
+        for item, candidate in zip(page, candidates):
+            result = self._build_filter_result(candidate, query)
+            result["similarity"] = item.similarity
+            results.append(result)
+        return results
+
+    def _filter_request_key(
+        self,
+        query: str,
+        filters: Dict[str, Any],
+        repo_path: str,
+        search_mode: SearchMode,
+    ) -> tuple:
+        # Generations come from one global sequence, so the highest one also
+        # moves whenever any repo in a cross-repo search is synced.
+        generation_query = select(func.max(SQLRepo.sync_generation))
+        if repo_path:
+            generation_query = generation_query.where(SQLRepo.path == repo_path)
+        return (
+            repo_path,
+            query.strip(),
+            json.dumps(filters, sort_keys=True, default=str),
+            search_mode,
+            self.session.execute(generation_query).scalar(),
+        )
+
+    def filter_page(
+        self,
+        query: str,
+        filters: Dict[str, Any],
+        repo_path: str,
+        max_results: int,
+        cursor: str,
+        *,
+        search_mode: SearchMode = "ranked",
+    ) -> FilterExecutionResult:
+        """Return the page at ``cursor`` of an earlier ``filter`` call.
+
+        Pages are sliced from the stored ranked list. If the handle expired or
+        the cursor does not belong to this search, the search is recomputed
+        up to the end of the requested page.
+        """
+        max_results = max(1, max_results)
+        request_key = self._filter_request_key(query, filters, repo_path, search_mode)
+        decoded = decode_cursor(cursor)
+        offset = decoded[1] if decoded is not None else 0
+        handle = (
+            self.ranked_result_handles.get(decoded[0], request_key)
+            if decoded is not None
+            else None
+        )
+        end = offset + max_results
+        truncated = (
+            handle is not None
+            and end > len(handle.items)
+            and len(handle.items) < handle.total_relevant_results
+        )
+
+        if handle is None or truncated:
+            recomputed = self.filter(
+                query, filters, repo_path, end, search_mode=search_mode
+            )
+            return FilterExecutionResult(
+                results=recomputed.results[offset:],
+                total_ranked_results=recomputed.total_ranked_results,
+                total_relevant_results=recomputed.total_relevant_results,
+                has_more_relevant=recomputed.has_more_relevant,
+                max_results=max_results,
+                next_cursor=recomputed.next_cursor,
+            )
+
+        return FilterExecutionResult(
+            results=self._build_ranked_page(handle.items[offset:end], handle.query),
+            total_ranked_results=handle.total_ranked_results,
+            total_relevant_results=handle.total_relevant_results,
+            has_more_relevant=handle.total_relevant_results > end,
+            max_results=max_results,
+            next_cursor=(
+                encode_cursor(decoded[0], end)
+                if handle.total_relevant_results > end
+                else None
+            ),
         )
 
     def _fetch_exact_candidates(
-        self, commit_shas: list[str], query: str
+        self, commit_shas: list[str], query: str, *, limit: int | None = None
     ) -> list[FilterCandidate]:
         normalized_query = query.strip()
         if not commit_shas or not normalized_query:
@@ -800,66 +1025,166 @@ class Retriever:
 
         pattern = f"%{_escape_like_query(normalized_query)}%"
         file_path_expr = func.coalesce(SQLFileChange.new_path, SQLFileChange.old_path)
+        # Paths go through the trigram indexes; statuses are matched here
+        # because casting the enum column would defeat them.
+        file_match_filters = [
+            SQLFileChange.new_path.ilike(pattern, escape="\\"),
+            SQLFileChange.old_path.ilike(pattern, escape="\\"),
+        ]
+        matching_statuses = [
+            status
+            for status in FileChangeStatus
+            if normalized_query.lower() in status.value
+        ]
+        if matching_statuses:
+            file_match_filters.append(SQLFileChange.status.in_(matching_statuses))
 
         commit_rows = self.session.execute(
-            select(
-                SQLCommit.sha.label("sha"),
-                literal("commit").label("match_type"),
-                literal(None).label("similarity"),
-                SQLCommit.time.label("commit_time"),
-                SQLCommit.message.label("preview_source"),
-                literal("text").label("preview_kind"),
-                literal(None).label("file_change_id"),
-                literal(None).label("hunk_id"),
-                literal(None).label("file_path"),
-                literal(None).label("old_start"),
-                literal(None).label("new_start"),
-                literal(None).label("preview_old_start"),
-                literal(None).label("preview_old_lines"),
-                literal(None).label("preview_new_start"),
-                literal(None).label("preview_new_lines"),
-            ).where(
-                SQLCommit.sha.in_(commit_shas),
-                SQLCommit.message.ilike(pattern, escape="\\"),
+            _limit_statement(
+                select(
+                    SQLCommit.sha.label("sha"),
+                    literal("commit").label("match_type"),
+                    literal(None).label("similarity"),
+                    SQLCommit.time.label("commit_time"),
+                    literal("text").label("preview_kind"),
+                    literal(None).label("file_change_id"),
+                    literal(None).label("hunk_id"),
+                    literal(None).label("file_path"),
+                    literal(None).label("old_start"),
+                    literal(None).label("new_start"),
+                    literal(None).label("preview_old_start"),
+                    literal(None).label("preview_old_lines"),
+                    literal(None).label("preview_new_start"),
+                    literal(None).label("preview_new_lines"),
+                ).where(
+                    SQLCommit.sha.in_(commit_shas),
+                    SQLCommit.message.ilike(pattern, escape="\\"),
+                ),
+                limit,
+                SQLCommit.time.desc(),
+                SQLCommit.sha,
             )
         ).mappings().all()
 
         file_rows = self.session.execute(
-            select(
-                SQLFileChange.commit_sha.label("sha"),
-                literal("file_change").label("match_type"),
-                literal(None).label("similarity"),
-                SQLCommit.time.label("commit_time"),
-                file_path_expr.label("preview_source"),
-                literal("text").label("preview_kind"),
-                SQLFileChange.id.label("file_change_id"),
-                literal(None).label("hunk_id"),
-                file_path_expr.label("file_path"),
-                literal(None).label("old_start"),
-                literal(None).label("new_start"),
-                literal(None).label("preview_old_start"),
-                literal(None).label("preview_old_lines"),
-                literal(None).label("preview_new_start"),
-                literal(None).label("preview_new_lines"),
-            )
-            .join(SQLCommit, SQLCommit.sha == SQLFileChange.commit_sha)
-            .where(
-                SQLFileChange.commit_sha.in_(commit_shas),
-                or_(
-                    SQLFileChange.new_path.ilike(pattern, escape="\\"),
-                    SQLFileChange.old_path.ilike(pattern, escape="\\"),
-                    SQLFileChange.status.cast(String).ilike(pattern, escape="\\"),
+            _limit_statement(
+                select(
+                    SQLFileChange.commit_sha.label("sha"),
+                    literal("file_change").label("match_type"),
+                    literal(None).label("similarity"),
+                    SQLCommit.time.label("commit_time"),
+                    literal("text").label("preview_kind"),
+                    SQLFileChange.id.label("file_change_id"),
+                    literal(None).label("hunk_id"),
+                    file_path_expr.label("file_path"),
+                    literal(None).label("old_start"),
+                    literal(None).label("new_start"),
+                    literal(None).label("preview_old_start"),
+                    literal(None).label("preview_old_lines"),
+                    literal(None).label("preview_new_start"),
+                    literal(None).label("preview_new_lines"),
+                )
+                .join(SQLCommit, SQLCommit.sha == SQLFileChange.commit_sha)
+                .where(
+                    SQLFileChange.commit_sha.in_(commit_shas),
+                    or_(*file_match_filters),
                 ),
+                limit,
+                SQLCommit.time.desc(),
+                SQLFileChange.id,
             )
         ).mappings().all()
 
         hunk_rows = self.session.execute(
+            _limit_statement(
+                select(
+                    SQLDiffHunk.commit_sha.label("sha"),
+                    literal("hunk").label("match_type"),
+                    literal(None).label("similarity"),
+                    SQLCommit.time.label("commit_time"),
+                    literal("diff").label("preview_kind"),
+                    SQLDiffHunk.file_change_id.label("file_change_id"),
+                    SQLDiffHunk.id.label("hunk_id"),
+                    file_path_expr.label("file_path"),
+                    SQLDiffHunk.old_start.label("old_start"),
+                    SQLDiffHunk.new_start.label("new_start"),
+                    SQLDiffHunk.old_start.label("preview_old_start"),
+                    SQLDiffHunk.old_lines.label("preview_old_lines"),
+                    SQLDiffHunk.new_start.label("preview_new_start"),
+                    SQLDiffHunk.new_lines.label("preview_new_lines"),
+                )
+                .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
+                .join(SQLCommit, SQLCommit.sha == SQLDiffHunk.commit_sha)
+                .where(
+                    SQLDiffHunk.commit_sha.in_(commit_shas),
+                    SQLDiffHunk.content.ilike(pattern, escape="\\"),
+                ),
+                limit,
+                SQLCommit.time.desc(),
+                SQLDiffHunk.id,
+            )
+        ).mappings().all()
+
+        return self._create_candidates(
+            [*hunk_rows, *file_rows, *commit_rows],
+            exact_match=True,
+        )
+
+    def _select_semantic_commits(self, similarity):
+        return select(
+            SQLCommit.sha.label("sha"),
+            literal("commit").label("match_type"),
+            similarity.label("similarity"),
+            similarity.label("text_similarity"),
+            literal(None).label("ast_similarity"),
+            literal(False).label("used_ast_signal"),
+            literal(None).label("semantic_score"),
+            SQLCommit.time.label("commit_time"),
+            literal("text").label("preview_kind"),
+            literal(None).label("file_change_id"),
+            literal(None).label("hunk_id"),
+            literal(None).label("file_path"),
+            literal(None).label("old_start"),
+            literal(None).label("new_start"),
+            literal(None).label("preview_old_start"),
+            literal(None).label("preview_old_lines"),
+            literal(None).label("preview_new_start"),
+            literal(None).label("preview_new_lines"),
+        )
+
+    def _select_semantic_file_changes(self, similarity, ast_similarity, file_path_expr):
+        return select(
+            SQLFileChange.commit_sha.label("sha"),
+            literal("file_change").label("match_type"),
+            literal(None).label("similarity"),
+            similarity.label("text_similarity"),
+            ast_similarity.label("ast_similarity"),
+            literal(None).label("used_ast_signal"),
+            literal(None).label("semantic_score"),
+            SQLCommit.time.label("commit_time"),
+            literal("text").label("preview_kind"),
+            SQLFileChange.id.label("file_change_id"),
+            literal(None).label("hunk_id"),
+            file_path_expr.label("file_path"),
+            literal(None).label("old_start"),
+            literal(None).label("new_start"),
+            literal(None).label("preview_old_start"),
+            literal(None).label("preview_old_lines"),
+            literal(None).label("preview_new_start"),
+            literal(None).label("preview_new_lines"),
+        ).join(SQLCommit, SQLCommit.sha == SQLFileChange.commit_sha)
+
+    def _select_semantic_hunks(self, similarity, ast_similarity, file_path_expr):
+        return (
             select(
                 SQLDiffHunk.commit_sha.label("sha"),
                 literal("hunk").label("match_type"),
                 literal(None).label("similarity"),
+                similarity.label("text_similarity"),
+                ast_similarity.label("ast_similarity"),
+                literal(None).label("used_ast_signal"),
+                literal(None).label("semantic_score"),
                 SQLCommit.time.label("commit_time"),
-                SQLDiffHunk.content.label("preview_source"),
                 literal("diff").label("preview_kind"),
                 SQLDiffHunk.file_change_id.label("file_change_id"),
                 SQLDiffHunk.id.label("hunk_id"),
@@ -873,135 +1198,185 @@ class Retriever:
             )
             .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
             .join(SQLCommit, SQLCommit.sha == SQLDiffHunk.commit_sha)
-            .where(
-                SQLDiffHunk.commit_sha.in_(commit_shas),
-                SQLDiffHunk.content.ilike(pattern, escape="\\"),
-            )
-        ).mappings().all()
+        )
 
-        file_rows = self._attach_file_change_diff_previews(
-            [dict(row) for row in file_rows]
+    def _search_vector_index(
+        self,
+        repo_path: str,
+        commit_shas: list[str] | None,
+        query_embedding: list[float],
+        *,
+        limit: int | None,
+        max_distances: dict[str, float] | None = None,
+    ) -> dict[str, list[VectorHit]] | None:
+        if self.vector_indexes is None or not repo_path:
+            return None
+        index = self.vector_indexes.get(
+            self.session,
+            repo_path,
+            file_filter=build_file_exclusion_filter(),
+        )
+        if index is None:
+            return None
+        return index.search(
+            query_embedding,
+            commit_shas=commit_shas,
+            max_distances=(
+                max_distances
+                if max_distances is not None
+                else self.SIMILARITY_THRESHOLDS
+            ),
+            limit=limit,
         )
 
-        return self._create_candidates(
-            [*hunk_rows, *file_rows, *commit_rows],
-            exact_match=True,
+    def _hydrate_vector_hits(
+        self, vector_hits: dict[str, list[VectorHit]], file_path_expr
+    ) -> list[FilterCandidate]:
+        hits_by_type = {
+            match_type: {hit.key: hit for hit in hits}
+            for match_type, hits in vector_hits.items()
+        }
+        rows_by_type: dict[str, list[dict[str, Any]]] = {}
+        for match_type, statement, key_column, key_field in (
+            (
+                "commit",
+                self._select_semantic_commits(literal(None)),
+                SQLCommit.sha,
+                "sha",
+            ),
+            (
+                "file_change",
+                self._select_semantic_file_changes(
+                    literal(None), literal(None), file_path_expr
+                ),
+                SQLFileChange.id,
+                "file_change_id",
+            ),
+            (
+                "hunk",
+                self._select_semantic_hunks(
+                    literal(None), literal(None), file_path_expr
+                ),
+                SQLDiffHunk.id,
+                "hunk_id",
+            ),
+        ):
+            hits = hits_by_type.get(match_type, {})
+            rows_by_type[match_type] = []
+            if not hits:
+                continue
+            for row in self.session.execute(
+                statement.where(key_column.in_(list(hits)))
+            ).mappings():
+                row = dict(row)
+                hit = hits[row[key_field]]
+                row["text_similarity"] = hit.text_distance
+                row["ast_similarity"] = hit.ast_distance
+                if match_type == "commit":
+                    row["similarity"] = hit.text_distance
+                rows_by_type[match_type].append(row)
+
+        return self._build_semantic_candidates(
+            rows_by_type["commit"], rows_by_type["file_change"], rows_by_type["hunk"]
         )
 
     def _fetch_semantic_candidates(
-        self, commit_shas: list[str], query_embedding: list[float]
+        self,
+        commit_shas: list[str],
+        query_embedding: list[float],
+        *,
+        limit: int | None = None,
+        repo_path: str = "",
     ) -> list[FilterCandidate]:
         if not commit_shas:
             return []
 
-        file_exclusion_filter = self._build_file_exclusion_filter()
+        file_exclusion_filter = build_file_exclusion_filter()
         file_path_expr = func.coalesce(SQLFileChange.new_path, SQLFileChange.old_path)
 
-        commit_similarity = SQLCommit.semantic_embedding.cosine_distance(query_embedding)
+        vector_hits = self._search_vector_index(
+            repo_path, commit_shas, query_embedding, limit=limit
+        )
+        if vector_hits is not None:
+            if not any(vector_hits.values()):
+                return []
+            # Distances come from the in-memory index; SQL only hydrates its hits.
+            return self._hydrate_vector_hits(vector_hits, file_path_expr)
+
+        commit_similarity = embedding_distance(
+            SQLCommit, "semantic_embedding", query_embedding
+        )
         commit_rows = self.session.execute(
-            select(
-                SQLCommit.sha.label("sha"),
-                literal("commit").label("match_type"),
-                commit_similarity.label("similarity"),
-                commit_similarity.label("text_similarity"),
-                literal(None).label("ast_similarity"),
-                literal(False).label("used_ast_signal"),
-                literal(None).label("semantic_score"),
-                SQLCommit.time.label("commit_time"),
-                SQLCommit.message.label("preview_source"),
-                literal("text").label("preview_kind"),
-                literal(None).label("file_change_id"),
-                literal(None).label("hunk_id"),
-                literal(None).label("file_path"),
-                literal(None).label("old_start"),
-                literal(None).label("new_start"),
-                literal(None).label("preview_old_start"),
-                literal(None).label("preview_old_lines"),
-                literal(None).label("preview_new_start"),
-                literal(None).label("preview_new_lines"),
-            ).where(
-                SQLCommit.sha.in_(commit_shas),
-                SQLCommit.semantic_embedding.isnot(None),
-                commit_similarity <= self.SIMILARITY_THRESHOLDS["commit"],
+            _limit_statement(
+                self._select_semantic_commits(commit_similarity).where(
+                    SQLCommit.sha.in_(commit_shas),
+                    embedding_present(SQLCommit, "semantic_embedding"),
+                    commit_similarity <= self.SIMILARITY_THRESHOLDS["commit"],
+                ),
+                limit,
+                commit_similarity,
             )
         ).mappings().all()
 
-        fc_similarity = SQLFileChange.semantic_embedding.cosine_distance(query_embedding)
-        fc_ast_similarity = SQLFileChange.ast_embedding.cosine_distance(query_embedding)
+        fc_similarity = embedding_distance(
+            SQLFileChange, "semantic_embedding", query_embedding
+        )
+        fc_ast_similarity = embedding_distance(
+            SQLFileChange, "ast_embedding", query_embedding
+        )
         file_rows = self.session.execute(
-            select(
-                SQLFileChange.commit_sha.label("sha"),
-                literal("file_change").label("match_type"),
-                literal(None).label("similarity"),
-                fc_similarity.label("text_similarity"),
-                fc_ast_similarity.label("ast_similarity"),
-                literal(None).label("used_ast_signal"),
-                literal(None).label("semantic_score"),
-                SQLCommit.time.label("commit_time"),
-                file_path_expr.label("preview_source"),
-                literal("text").label("preview_kind"),
-                SQLFileChange.id.label("file_change_id"),
-                literal(None).label("hunk_id"),
-                file_path_expr.label("file_path"),
-                literal(None).label("old_start"),
-                literal(None).label("new_start"),
-                literal(None).label("preview_old_start"),
-                literal(None).label("preview_old_lines"),
-                literal(None).label("preview_new_start"),
-                literal(None).label("preview_new_lines"),
-            )
-            .join(SQLCommit, SQLCommit.sha == SQLFileChange.commit_sha)
-            .where(
-                SQLFileChange.commit_sha.in_(commit_shas),
-                or_(
-                    SQLFileChange.semantic_embedding.isnot(None),
-                    SQLFileChange.ast_embedding.isnot(None),
+            _limit_statement(
+                self._select_semantic_file_changes(
+                    fc_similarity, fc_ast_similarity, file_path_expr
+                ).where(
+                    SQLFileChange.commit_sha.in_(commit_shas),
+                    or_(
+                        embedding_present(SQLFileChange, "semantic_embedding"),
+                        embedding_present(SQLFileChange, "ast_embedding"),
+                    ),
+                    file_exclusion_filter,
                 ),
-                file_exclusion_filter,
+                limit,
+                func.least(fc_similarity, fc_ast_similarity),
             )
         ).mappings().all()
 
-        hunk_similarity = SQLDiffHunk.semantic_embedding.cosine_distance(query_embedding)
-        hunk_ast_similarity = SQLDiffHunk.ast_embedding.cosine_distance(query_embedding)
+        hunk_similarity = embedding_distance(
+            SQLDiffHunk, "semantic_embedding", query_embedding
+        )
+        hunk_ast_similarity = embedding_distance(
+            SQLDiffHunk, "ast_embedding", query_embedding
+        )
         hunk_rows = self.session.execute(
-            select(
-                SQLDiffHunk.commit_sha.label("sha"),
-                literal("hunk").label("match_type"),
-                literal(None).label("similarity"),
-                hunk_similarity.label("text_similarity"),
-                hunk_ast_similarity.label("ast_similarity"),
-                literal(None).label("used_ast_signal"),
-                literal(None).label("semantic_score"),
-                SQLCommit.time.label("commit_time"),
-                SQLDiffHunk.content.label("preview_source"),
-                literal("diff").label("preview_kind"),
-                SQLDiffHunk.file_change_id.label("file_change_id"),
-                SQLDiffHunk.id.label("hunk_id"),
-                file_path_expr.label("file_path"),
-                SQLDiffHunk.old_start.label("old_start"),
-                SQLDiffHunk.new_start.label("new_start"),
-                SQLDiffHunk.old_start.label("preview_old_start"),
-                SQLDiffHunk.old_lines.label("preview_old_lines"),
-                SQLDiffHunk.new_start.label("preview_new_start"),
-                SQLDiffHunk.new_lines.label("preview_new_lines"),
-            )
-            .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
-            .join(SQLCommit, SQLCommit.sha == SQLDiffHunk.commit_sha)
-            .where(
-                SQLDiffHunk.commit_sha.in_(commit_shas),
-                or_(
-                    SQLDiffHunk.semantic_embedding.isnot(None),
-                    SQLDiffHunk.ast_embedding.isnot(None),
+            _limit_statement(
+                self._select_semantic_hunks(
+                    hunk_similarity, hunk_ast_similarity, file_path_expr
+                ).where(
+                    SQLDiffHunk.commit_sha.in_(commit_shas),
+                    or_(
+                        embedding_present(SQLDiffHunk, "semantic_embedding"),
+                        embedding_present(SQLDiffHunk, "ast_embedding"),
+                    ),
+                    file_exclusion_filter,
                 ),
-                file_exclusion_filter,
+                limit,
+                func.least(hunk_similarity, hunk_ast_similarity),
             )
         ).mappings().all()
 
+        return self._build_semantic_candidates(commit_rows, file_rows, hunk_rows)
+
+    def _build_semantic_candidates(
+        self,
+        commit_rows: list[Any],
+        file_rows: list[Any],
+        hunk_rows: list[Any],
+    ) -> list[FilterCandidate]:
         file_rows = [
             row
             for row in (
                 self._apply_semantic_blend_to_row(dict(row), "file_change")
-                for row in self._attach_file_change_diff_previews([dict(row) for row in file_rows])
+                for row in file_rows
             )
             if row is not None
         ]
@@ -1034,7 +1409,13 @@ class Retriever:
         return [row.sha for row in rows]
 
     def filter(
-        self, query: str, filters: Dict[str, Any], repo_path: str, max_results: int
+        self,
+        query: str,
+        filters: Dict[str, Any],
+        repo_path: str,
+        max_results: int,
+        *,
+        search_mode: SearchMode = "ranked",
     ) -> FilterExecutionResult:
         logger.info("Filtering for query '%s' with filters %s", query, filters)
 
@@ -1093,27 +1474,43 @@ class Retriever:
                 max_results=max_results,
             )
 
-        exact_candidates = self._fetch_exact_candidates(filtered_shas, normalized_query)
+        hybrid = search_mode == "hybrid"
+        # Hybrid mode bounds every source to its own top-k before fusing.
+        source_limit = max(self.HYBRID_SOURCE_LIMIT, max_results) if hybrid else None
+        exact_candidates = self._fetch_exact_candidates(
+            filtered_shas, normalized_query, limit=source_limit
+        )
         query_embedding = self._get_query_embedding(normalized_query)
         semantic_candidates: list[FilterCandidate] = []
         if query_embedding:
             semantic_candidates = self._fetch_semantic_candidates(
                 filtered_shas,
                 query_embedding,
+                limit=source_limit,
+                repo_path=repo_path,
             )
 
-        ranked_results = self._rank_candidates([*exact_candidates, *semantic_candidates])
+        candidates = [*exact_candidates, *semantic_candidates]
+        ranked_results = (
+            self._fuse_candidates(candidates)
+            if hybrid
+            else self._rank_candidates(candidates)
+        )
         results = self._build_ranked_response(
             ranked_results,
             normalized_query,
             max_results,
+            filter_relevant=not hybrid,
+            request_key=self._filter_request_key(
+                query, filters, repo_path, search_mode
+            ),
         )
 
         logger.info("Found %s relevant commits", len(results.results))
         return results
 
     def _build_fallback_context(
-        self, repo_path: str, context_shas: list[str]
+        self, repo_path: str, context_shas: list[str] | None
     ) -> tuple[str, list[dict[str, Any]]]:
         query = (
             select(
@@ -1123,10 +1520,12 @@ class Retriever:
                 SQLCommit.time,
                 SQLCommit.summary,
             )
-            .where(SQLCommit.repo_path == repo_path, SQLCommit.sha.in_(context_shas))
+            .where(SQLCommit.repo_path == repo_path)
             .order_by(SQLCommit.time.desc())
-            .limit(5)
+            .limit(self.chat_context_top_k)
         )
+        if context_shas is not None:
+            query = query.where(SQLCommit.sha.in_(context_shas))
         rows = self.session.execute(query).mappings().all()
 
         context_lines = ["## Relevant Context:\n"]
@@ -1148,204 +1547,286 @@ class Retriever:
 
         return "".join(context_lines), cited_commits
 
-    def get_context_with_citations(
-        self, query: str, repo_path: str, context_shas: List[str]
-    ) -> tuple[str, List[dict[str, Any]]]:
-        if not repo_path:
-            raise ValueError("Repository path is required for chat retrieval.")
+    def _query_chat_context_rows(
+        self,
+        repo_path: str,
+        context_shas: list[str] | None,
+        query_embedding: list[float],
+        limit: int,
+    ) -> dict[MatchType, list[Any]]:
+        scope = [SQLCommit.repo_path == repo_path]
+        if context_shas is not None:
+            scope.append(SQLCommit.sha.in_(context_shas))
+
+        commit_distance = embedding_distance(
+            SQLCommit, "semantic_embedding", query_embedding
+        )
+        rows_by_type: dict[MatchType, list[Any]] = {
+            "commit": self.session.execute(
+                select(
+                    SQLCommit.sha.label("key"),
+                    commit_distance.label("text_similarity"),
+                )
+                .where(*scope, embedding_present(SQLCommit, "semantic_embedding"))
+                .order_by(commit_distance)
+                .limit(limit)
+            )
+            .mappings()
+            .all()
+        }
 
-        if context_shas:
-            allowed_shas = (
+        file_exclusion_filter = build_file_exclusion_filter()
+        for match_type, model in (
+            ("file_change", SQLFileChange),
+            ("hunk", SQLDiffHunk),
+        ):
+            text_distance = embedding_distance(
+                model, "semantic_embedding", query_embedding
+            )
+            ast_distance = embedding_distance(model, "ast_embedding", query_embedding)
+            statement = select(
+                model.id.label("key"),
+                text_distance.label("text_similarity"),
+                ast_distance.label("ast_similarity"),
+            ).join(SQLCommit, model.commit_sha == SQLCommit.sha)
+            if model is SQLDiffHunk:
+                statement = statement.join(
+                    SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id
+                )
+            rows_by_type[match_type] = (
                 self.session.execute(
-                    select(SQLCommit.sha).where(
-                        SQLCommit.repo_path == repo_path,
-                        SQLCommit.sha.in_(context_shas),
+                    statement.where(
+                        *scope,
+                        or_(
+                            embedding_present(model, "semantic_embedding"),
+                            embedding_present(model, "ast_embedding"),
+                        ),
+                        file_exclusion_filter,
                     )
+                    .order_by(func.least(text_distance, ast_distance))
+                    .limit(limit)
                 )
-                .scalars()
+                .mappings()
                 .all()
             )
-            context_shas = list(allowed_shas)
 
-        query_embedding = self._get_query_embedding(query)
+        return rows_by_type
 
-        if not context_shas:
-            if query_embedding is None:
-                context_shas = (
-                    self.session.execute(
-                        select(SQLCommit.sha)
-                        .where(SQLCommit.repo_path == repo_path)
-                        .order_by(SQLCommit.time.desc())
-                        .limit(5)
-                    )
-                    .scalars()
-                    .all()
-                )
-            else:
-                context_shas = (
-                    self.session.execute(
-                        select(SQLCommit.sha).where(SQLCommit.repo_path == repo_path)
-                    )
-                    .scalars()
-                    .all()
-                )
-
-        logger.info(
-            "Gathering context for query '%s' in repo %s with context SHAs %s",
-            query,
+    def _search_chat_context(
+        self,
+        repo_path: str,
+        context_shas: list[str] | None,
+        query_embedding: list[float],
+    ) -> list[tuple[MatchType, Any, float]]:
+        """Nearest (match type, key, distance) rows for chat, nearest first."""
+        # Blending can reorder file change and hunk rows, so each source
+        # over-fetches a little before the final top-k cut.
+        limit = self.chat_context_top_k * self.CHAT_CONTEXT_SOURCE_FACTOR
+        vector_hits = self._search_vector_index(
             repo_path,
             context_shas,
+            query_embedding,
+            limit=limit,
+            max_distances=self.CHAT_CONTEXT_MAX_DISTANCES,
         )
+        rows_by_type: dict[MatchType, list[Any]]
+        if vector_hits is not None:
+            rows_by_type = {
+                match_type: [
+                    {
+                        "key": hit.key,
+                        "text_similarity": hit.text_distance,
+                        "ast_similarity": hit.ast_distance,
+                    }
+                    for hit in hits
+                ]
+                for match_type, hits in vector_hits.items()
+            }
+        else:
+            rows_by_type = self._query_chat_context_rows(
+                repo_path, context_shas, query_embedding, limit
+            )
 
-        if not context_shas:
-            return "## Relevant Context:\n", []
+        hits: list[tuple[MatchType, Any, float]] = []
+        for match_type, rows in rows_by_type.items():
+            for row in rows:
+                if match_type == "commit":
+                    if row["text_similarity"] is not None:
+                        hits.append(
+                            (match_type, row["key"], float(row["text_similarity"]))
+                        )
+                    continue
+                blended_row = self._apply_semantic_blend_to_row(dict(row), match_type)
+                if blended_row is not None:
+                    hits.append(
+                        (match_type, row["key"], float(blended_row["similarity"]))
+                    )
 
-        if query_embedding is None:
-            return self._build_fallback_context(repo_path, context_shas)
+        hits.sort(key=lambda hit: hit[2])
+        return hits[: self.chat_context_top_k]
 
-        context_items: list[dict[str, Any]] = []
-        file_exclusion_filter = self._build_file_exclusion_filter()
+    def _load_chat_context_items(
+        self, hits: list[tuple[MatchType, Any, float]]
+    ) -> list[dict[str, Any]]:
+        keys_by_type: dict[MatchType, list[Any]] = {}
+        for match_type, key, _ in hits:
+            keys_by_type.setdefault(match_type, []).append(key)
 
-        commits_query = (
-            select(
-                SQLCommit.sha,
-                SQLCommit.message,
-                SQLCommit.author,
-                SQLCommit.time,
-                SQLCommit.summary,
-                SQLCommit.semantic_embedding.cosine_distance(query_embedding).label(
-                    "similarity"
-                ),
-            )
-            .where(
-                SQLCommit.repo_path == repo_path,
-                SQLCommit.sha.in_(context_shas),
-                SQLCommit.semantic_embedding.isnot(None),
-            )
-        )
-        commits_results = self.session.execute(commits_query).mappings().all()
-        for row in commits_results:
-            context_items.append(
-                {
+        loaded: dict[tuple[MatchType, Any], dict[str, Any]] = {}
+        if keys_by_type.get("commit"):
+            for row in self.session.execute(
+                select(
+                    SQLCommit.sha,
+                    SQLCommit.message,
+                    SQLCommit.author,
+                    SQLCommit.time,
+                    SQLCommit.summary,
+                ).where(SQLCommit.sha.in_(keys_by_type["commit"]))
+            ).mappings():
+                loaded[("commit", row["sha"])] = {
                     "type": "commit",
                     "sha": row["sha"],
                     "message": row["message"] or "",
-                    "similarity": float(row["similarity"]),
                     "content": (
                         f"Commit {row['sha'][:8]} by {row['author']} on {row['time']}: "
                         f"{row['message']}\nSummary: {row['summary']}\n\n"
                     ),
                 }
-            )
 
-        fc_query = (
-            select(
-                SQLFileChange.commit_sha,
-                SQLFileChange.old_path,
-                SQLFileChange.new_path,
-                SQLFileChange.status,
-                SQLFileChange.summary,
-                SQLCommit.message.label("commit_message"),
-                SQLCommit.author.label("commit_author"),
-                SQLCommit.time.label("commit_time"),
-                SQLFileChange.semantic_embedding.cosine_distance(query_embedding).label(
-                    "text_similarity"
-                ),
-                SQLFileChange.ast_embedding.cosine_distance(query_embedding).label(
-                    "ast_similarity"
-                ),
-            )
-            .join(SQLCommit, SQLFileChange.commit_sha == SQLCommit.sha)
-            .where(
-                SQLCommit.repo_path == repo_path,
-                SQLFileChange.commit_sha.in_(context_shas),
-                or_(
-                    SQLFileChange.semantic_embedding.isnot(None),
-                    SQLFileChange.ast_embedding.isnot(None),
-                ),
-            )
-            .filter(file_exclusion_filter)
-        )
-        fc_results = self.session.execute(fc_query).mappings().all()
-        for row in fc_results:
-            blended_row = self._apply_semantic_blend_to_row(dict(row), "file_change")
-            if blended_row is None:
-                continue
-            path_info = row["new_path"] or row["old_path"]
-            status = self._format_status(row["status"])
-            context_items.append(
-                {
+        if keys_by_type.get("file_change"):
+            for row in self.session.execute(
+                select(
+                    SQLFileChange.id,
+                    SQLFileChange.commit_sha,
+                    SQLFileChange.old_path,
+                    SQLFileChange.new_path,
+                    SQLFileChange.status,
+                    SQLFileChange.summary,
+                    SQLCommit.message.label("commit_message"),
+                    SQLCommit.author.label("commit_author"),
+                    SQLCommit.time.label("commit_time"),
+                )
+                .join(SQLCommit, SQLFileChange.commit_sha == SQLCommit.sha)
+                .where(SQLFileChange.id.in_(keys_by_type["file_change"]))
+            ).mappings():
+                path_info = row["new_path"] or row["old_path"]
+                status = self._format_status(row["status"])
+                loaded[("file_change", row["id"])] = {
                     "type": "file_change",
                     "sha": row["commit_sha"],
                     "message": row["commit_message"] or "",
-                    "similarity": float(blended_row["similarity"]),
                     "content": (
                         f"{status} {path_info} in commit {row['commit_sha'][:8]} by "
                         f"{row['commit_author']} on {row['commit_time']}\n"
                         f"Summary: {row['summary']}\n\n"
                     ),
                 }
-            )
 
-        hunk_query = (
-            select(
-                SQLDiffHunk.commit_sha,
-                SQLDiffHunk.old_lines,
-                SQLDiffHunk.new_lines,
-                SQLDiffHunk.content,
-                SQLDiffHunk.summary,
-                SQLFileChange.old_path,
-                SQLFileChange.new_path,
-                SQLCommit.message.label("commit_message"),
-                SQLCommit.author.label("commit_author"),
-                SQLCommit.time.label("commit_time"),
-                SQLDiffHunk.semantic_embedding.cosine_distance(query_embedding).label(
-                    "text_similarity"
-                ),
-                SQLDiffHunk.ast_embedding.cosine_distance(query_embedding).label(
-                    "ast_similarity"
-                ),
-            )
-            .join(SQLCommit, SQLDiffHunk.commit_sha == SQLCommit.sha)
-            .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
-            .where(
-                SQLCommit.repo_path == repo_path,
-                SQLDiffHunk.commit_sha.in_(context_shas),
-                or_(
-                    SQLDiffHunk.semantic_embedding.isnot(None),
-                    SQLDiffHunk.ast_embedding.isnot(None),
-                ),
-            )
-            .filter(file_exclusion_filter)
-        )
-        hunk_results = self.session.execute(hunk_query).mappings().all()
-        for row in hunk_results:
-            blended_row = self._apply_semantic_blend_to_row(dict(row), "hunk")
-            if blended_row is None:
-                continue
-            file_path = row["new_path"] or row["old_path"]
-            lines_info = f"{row['old_lines']}/{row['new_lines']} lines"
-            preview = (row["content"] or "")[:200]
-            context_items.append(
-                {
+        if keys_by_type.get("hunk"):
+            for row in self.session.execute(
+                select(
+                    SQLDiffHunk.id,
+                    SQLDiffHunk.commit_sha,
+                    SQLDiffHunk.old_lines,
+                    SQLDiffHunk.new_lines,
+                    SQLDiffHunk.content,
+                    SQLDiffHunk.summary,
+                    SQLFileChange.old_path,
+                    SQLFileChange.new_path,
+                    SQLCommit.message.label("commit_message"),
+                    SQLCommit.author.label("commit_author"),
+                    SQLCommit.time.label("commit_time"),
+                )
+                .join(SQLCommit, SQLDiffHunk.commit_sha == SQLCommit.sha)
+                .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
+                .where(SQLDiffHunk.id.in_(keys_by_type["hunk"]))
+            ).mappings():
+                file_path = row["new_path"] or row["old_path"]
+                lines_info = f"{row['old_lines']}/{row['new_lines']} lines"
+                loaded[("hunk", row["id"])] = {
                     "type": "diff_hunk",
                     "sha": row["commit_sha"],
                     "message": row["commit_message"] or "",
-                    "similarity": float(blended_row["similarity"]),
                     "content": (
                         f"{lines_info} in {file_path} (commit {row['commit_sha'][:8]} by "
                         f"{row['commit_author']} on {row['commit_time']}):\n"
-                        f"```\n{preview}...\n```\n"
+                        f"```\n{row['content'] or ''}\n```\n"
                         f"Summary: {row['summary']}\n\n"
                     ),
                 }
+
+        context_items: list[dict[str, Any]] = []
+        for match_type, key, similarity in hits:
+            item = loaded.get((match_type, key))
+            if item is not None:
+                context_items.append({**item, "similarity": similarity})
+        return context_items
+
+    def _pack_chat_context(
+        self,
+        context_items: list[dict[str, Any]],
+        token_budget: int | None = None,
+        token_counter: TokenCounter | None = None,
+    ) -> list[dict[str, Any]]:
+        budget = token_budget or self.chat_context_token_budget
+        packed = ContextPacker(budget, token_counter).pack(
+            [item["content"] for item in context_items],
+            # One large hunk may not crowd out every other item.
+            max_item_tokens=max(1, budget // 2),
+        )
+        return [
+            {**context_items[item.index], "content": item.text}
+            for item in packed.items
+        ]
+
+    def get_context_with_citations(
+        self,
+        query: str,
+        repo_path: str,
+        context_shas: List[str],
+        *,
+        token_budget: int | None = None,
+        token_counter: TokenCounter | None = None,
+    ) -> tuple[str, List[dict[str, Any]]]:
+        if not repo_path:
+            raise ValueError("Repository path is required for chat retrieval.")
+
+        scoped_shas: list[str] | None = None
+        if context_shas:
+            scoped_shas = list(
+                self.session.execute(
+                    select(SQLCommit.sha).where(
+                        SQLCommit.repo_path == repo_path,
+                        SQLCommit.sha.in_(context_shas),
+                    )
+                )
+                .scalars()
+                .all()
             )
+            if not scoped_shas:
+                # None of the pinned commits belong to this repo; use the whole repo.
+                scoped_shas = None
+
+        logger.info(
+            "Gathering context for query '%s' in repo %s with context SHAs %s",
+            query,
+            repo_path,
+            scoped_shas,
+        )
+
+        query_embedding = self._get_query_embedding(query)
+        if query_embedding is None:
+            return self._build_fallback_context(repo_path, scoped_shas)
 
+        context_items = self._load_chat_context_items(
+            self._search_chat_context(repo_path, scoped_shas, query_embedding)
+        )
         if not context_items:
-            return self._build_fallback_context(repo_path, context_shas)
+            return self._build_fallback_context(repo_path, scoped_shas)
 
-        context_items.sort(key=lambda item: item["similarity"])
-        top_context = context_items[:5]
+        top_context = self._pack_chat_context(
+            context_items, token_budget, token_counter
+        )
 
         context_lines = ["## Relevant Context:\n"]
         for index, item in enumerate(top_context, 1):
@@ -1372,7 +1853,7 @@ class Retriever:
             cited_by_sha.values(),
             key=lambda item: item["similarity"],
             reverse=True,
-        )[:5]
+        )[: self.chat_context_top_k]
 
         logger.info(
             "Selected %s cited commits for repo-scoped chat context",
@@ -1385,11 +1866,13 @@ class Retriever:
         self, shas_cte, query_embedding, top_k: int = 15
     ) -> None:
         try:
-            commit_sim = SQLCommit.semantic_embedding.cosine_distance(query_embedding)
+            commit_sim = embedding_distance(
+                SQLCommit, "semantic_embedding", query_embedding
+            )
             top_commits_stmt = (
                 select(SQLCommit.sha, SQLCommit.message, commit_sim.label("similarity"))
                 .join(shas_cte, SQLCommit.sha == shas_cte.c.sha)
-                .filter(SQLCommit.semantic_embedding.isnot(None))
+                .filter(embedding_present(SQLCommit, "semantic_embedding"))
                 .order_by(commit_sim)
                 .limit(top_k)
             )
@@ -1401,7 +1884,9 @@ class Retriever:
                         f"  {i}. type=commit sha={row.sha} sim={row.similarity:.5f} msg={row.message[:80] if row.message else ''}"
                     )
 
-            fc_sim = SQLFileChange.semantic_embedding.cosine_distance(query_embedding)
+            fc_sim = embedding_distance(
+                SQLFileChange, "semantic_embedding", query_embedding
+            )
             top_fc_stmt = (
                 select(
                     SQLFileChange.commit_sha,
@@ -1411,7 +1896,7 @@ class Retriever:
                     fc_sim.label("similarity"),
                 )
                 .join(shas_cte, SQLFileChange.commit_sha == shas_cte.c.sha)
-                .filter(SQLFileChange.semantic_embedding.isnot(None))
+                .filter(embedding_present(SQLFileChange, "semantic_embedding"))
                 .order_by(fc_sim)
                 .limit(top_k)
             )
@@ -1430,7 +1915,9 @@ class Retriever:
                         )
                     )
 
-            hunk_sim = SQLDiffHunk.semantic_embedding.cosine_distance(query_embedding)
+            hunk_sim = embedding_distance(
+                SQLDiffHunk, "semantic_embedding", query_embedding
+            )
             top_hunk_stmt = (
                 select(
                     SQLDiffHunk.commit_sha,
@@ -1441,7 +1928,7 @@ class Retriever:
                 )
                 .join(shas_cte, SQLDiffHunk.commit_sha == shas_cte.c.sha)
                 .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
-                .filter(SQLDiffHunk.semantic_embedding.isnot(None))
+                .filter(embedding_present(SQLDiffHunk, "semantic_embedding"))
                 .order_by(hunk_sim)
                 .limit(top_k)
             )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Generic, Protocol, Sequence, TypeVar
+
+
+class LineSpanSymbol(Protocol):
+    path: str
+    start_line: int
+    end_line: int
+
+
+S = TypeVar("S", bound=LineSpanSymbol)
+
+
+class SymbolIntervalIndex(Generic[S]):
+    """Static interval index over symbol line spans.
+
+    Symbols are sorted by start line and a max-segment tree over their end
+    lines lets ``overlapping`` visit only the symbols that actually overlap a
+    query span, so each lookup costs O(k log n) instead of a full scan.
+    """
+
+    def __init__(self, symbols: Sequence[S]):
+        self._symbols: list[S] = sorted(
+            symbols, key=lambda symbol: (symbol.start_line, symbol.end_line)
+        )
+        self._starts = [symbol.start_line for symbol in self._symbols]
+        size = 1
+        while size < len(self._symbols):
+            size *= 2
+        self._size = size
+        self._max_ends = [0] * (2 * size)
+        for offset, symbol in enumerate(self._symbols):
+            self._max_ends[size + offset] = symbol.end_line
+        for node in range(size - 1, 0, -1):
+            self._max_ends[node] = max(
+                self._max_ends[2 * node], self._max_ends[2 * node + 1]
+            )
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __bool__(self) -> bool:
+        return bool(self._symbols)
+
+    @property
+    def symbols(self) -> list[S]:
+        return self._symbols
+
+    def overlapping(self, start_line: int, end_line: int) -> list[S]:
+        # Only symbols starting at or before end_line can overlap; among those,
+        # descend into subtrees whose largest end line reaches start_line.
+        limit = bisect_right(self._starts, end_line)
+        if limit == 0:
+            return []
+
+        matches: list[S] = []
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, node_start, node_end = stack.pop()
+            if node_start >= limit or self._max_ends[node] < start_line:
+                continue
+            if node >= self._size:
+                matches.append(self._symbols[node - self._size])
+                continue
+            middle = (node_start + node_end) // 2
+            stack.append((2 * node + 1, middle, node_end))
+            stack.append((2 * node, node_start, middle))
+        return matches
+
+    def resolve(self, start_line: int, end_line: int) -> S | None:
+        """Return the tightest symbol overlapping the span, ties broken by path."""
+        overlapping = self.overlapping(start_line, end_line)
+        if not overlapping:
+            return None
+        return min(
+            overlapping,
+            key=lambda symbol: (symbol.end_line - symbol.start_line, symbol.path),
+        )
@@ -0,0 +1,564 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from data.embedding_storage import embedding_present, embedding_value
+from data.schema import SQLCommit, SQLDiffHunk, SQLFileChange, SQLRepo
+from utils.logger import logger
+
+if TYPE_CHECKING:
+    from core.vector_segments import VectorSegmentStore
+
+COMMIT_SHA_DTYPE = "S40"
+# Rows scored per matrix-vector product, so memory-mapped float16 segments
+# are upcast one block at a time instead of all at once.
+SEARCH_BLOCK_ROWS = 65_536
+# Tables per match type that appends may add before the index is reloaded.
+MAX_INDEX_TABLES = 64
+
+
+@dataclass(frozen=True)
+class VectorHit:
+    key: Any
+    text_distance: float | None
+    ast_distance: float | None
+
+
+def unit_rows(vectors: Sequence[Any | None], dimension: int) -> tuple[Any, Any]:
+    matrix = np.zeros((len(vectors), dimension), dtype=np.float32)
+    present = np.zeros(len(vectors), dtype=bool)
+    for row, vector in enumerate(vectors):
+        if vector is None or len(vector) != dimension:
+            continue
+        matrix[row] = vector
+        present[row] = True
+    norms = np.linalg.norm(matrix, axis=1)
+    present &= norms > 0
+    matrix[present] /= norms[present, None]
+    return matrix, present
+
+
+def _block_distances(matrix, present, start: int, stop: int, query_unit):
+    distances = 1.0 - (matrix[start:stop] @ query_unit).astype(np.float32)
+    return np.where(present[start:stop], distances, np.nan)
+
+
+def _nearest(limit: int | None, best, *columns) -> tuple[Any, ...]:
+    if limit is None or len(best) <= limit:
+        return (best, *columns)
+    nearest = np.argpartition(best, limit - 1)[:limit]
+    return (best[nearest], *(column[nearest] for column in columns))
+
+
+class EmbeddingTable:
+    """Unit-normalized text and AST embeddings for one kind of row.
+
+    Matrices may be in-memory arrays or read-only memory maps. Cosine
+    distances come from one matrix-vector product per block and embedding
+    column; rows without an embedding get NaN.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Any],
+        commit_shas: Any,
+        text_matrix: Any,
+        text_present: Any,
+        ast_matrix: Any | None = None,
+        ast_present: Any | None = None,
+    ):
+        self.keys = keys
+        self.commit_shas = commit_shas
+        self.text_matrix = text_matrix
+        self.text_present = text_present
+        self.ast_matrix = ast_matrix
+        self.ast_present = ast_present
+
+    @classmethod
+    def from_vectors(
+        cls,
+        keys: list[Any],
+        commit_shas: list[str],
+        text_vectors: list[Any | None],
+        ast_vectors: list[Any | None] | None,
+        dimension: int,
+    ) -> "EmbeddingTable":
+        text_matrix, text_present = unit_rows(text_vectors, dimension)
+        ast_matrix, ast_present = None, None
+        if ast_vectors is not None:
+            ast_matrix, ast_present = unit_rows(ast_vectors, dimension)
+        return cls(
+            keys,
+            np.array(commit_shas, dtype=COMMIT_SHA_DTYPE),
+            text_matrix,
+            text_present,
+            ast_matrix,
+            ast_present,
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(
+        self,
+        query_unit: Any,
+        *,
+        allowed_shas: Any | None,
+        max_distance: float,
+        limit: int | None,
+    ) -> list[VectorHit]:
+        parts: list[tuple[Any, Any, Any, Any]] = []
+        kept_rows = 0
+        for start in range(0, len(self), SEARCH_BLOCK_ROWS):
+            stop = min(start + SEARCH_BLOCK_ROWS, len(self))
+            text_distances = _block_distances(
+                self.text_matrix, self.text_present, start, stop, query_unit
+            )
+            ast_distances = (
+                _block_distances(
+                    self.ast_matrix, self.ast_present, start, stop, query_unit
+                )
+                if self.ast_matrix is not None
+                else np.full(stop - start, np.nan, dtype=np.float32)
+            )
+            best_distances = np.fmin(text_distances, ast_distances)
+
+            mask = best_distances <= max_distance
+            if allowed_shas is not None:
+                mask &= np.isin(self.commit_shas[start:stop], allowed_shas)
+            local_rows = np.flatnonzero(mask)
+            if not len(local_rows):
+                continue
+            parts.append(
+                (
+                    best_distances[local_rows],
+                    start + local_rows,
+                    text_distances[local_rows],
+                    ast_distances[local_rows],
+                )
+            )
+            kept_rows += len(local_rows)
+            if limit is not None and kept_rows > limit:
+                # Keep memory bounded by the limit rather than the table size.
+                parts = [
+                    _nearest(limit, *(np.concatenate(column) for column in zip(*parts)))
+                ]
+                kept_rows = limit
+
+        if not parts:
+            return []
+        best, rows, text, ast = _nearest(
+            limit, *(np.concatenate(column) for column in zip(*parts))
+        )
+        return [
+            VectorHit(
+                key=self.keys[int(rows[position])],
+                text_distance=(
+                    None if np.isnan(text[position]) else float(text[position])
+                ),
+                ast_distance=None if np.isnan(ast[position]) else float(ast[position]),
+            )
+            for position in np.argsort(best, kind="stable")
+        ]
+
+
+def _embedding_row_statements(
+    repo_path: str,
+    *,
+    commit_shas: Iterable[str] | None = None,
+    file_filter=None,
+) -> dict[str, Any]:
+    commit_statement = select(
+        SQLCommit.sha, SQLCommit.sha, embedding_value(SQLCommit, "semantic_embedding")
+    ).where(
+        SQLCommit.repo_path == repo_path,
+        embedding_present(SQLCommit, "semantic_embedding"),
+    )
+    file_statement = (
+        select(
+            SQLFileChange.id,
+            SQLFileChange.commit_sha,
+            embedding_value(SQLFileChange, "semantic_embedding"),
+            embedding_value(SQLFileChange, "ast_embedding"),
+        )
+        .join(SQLCommit, SQLCommit.sha == SQLFileChange.commit_sha)
+        .where(
+            SQLCommit.repo_path == repo_path,
+            or_(
+                embedding_present(SQLFileChange, "semantic_embedding"),
+                embedding_present(SQLFileChange, "ast_embedding"),
+            ),
+        )
+    )
+    hunk_statement = (
+        select(
+            SQLDiffHunk.id,
+            SQLDiffHunk.commit_sha,
+            embedding_value(SQLDiffHunk, "semantic_embedding"),
+            embedding_value(SQLDiffHunk, "ast_embedding"),
+        )
+        .join(SQLFileChange, SQLDiffHunk.file_change_id == SQLFileChange.id)
+        .join(SQLCommit, SQLCommit.sha == SQLDiffHunk.commit_sha)
+        .where(
+            SQLCommit.repo_path == repo_path,
+            or_(
+                embedding_present(SQLDiffHunk, "semantic_embedding"),
+                embedding_present(SQLDiffHunk, "ast_embedding"),
+            ),
+        )
+    )
+    if commit_shas is not None:
+        commit_shas = list(commit_shas)
+        commit_statement = commit_statement.where(SQLCommit.sha.in_(commit_shas))
+        file_statement = file_statement.where(SQLCommit.sha.in_(commit_shas))
+        hunk_statement = hunk_statement.where(SQLCommit.sha.in_(commit_shas))
+    if file_filter is not None:
+        file_statement = file_statement.where(file_filter)
+        hunk_statement = hunk_statement.where(file_filter)
+    return {
+        "commit": commit_statement,
+        "file_change": file_statement,
+        "hunk": hunk_statement,
+    }
+
+
+def fetch_embedding_rows(
+    session: Session,
+    repo_path: str,
+    *,
+    commit_shas: Iterable[str] | None = None,
+    file_filter=None,
+) -> dict[str, list[Any]]:
+    """Embedded rows of a repo as (key, commit_sha, text, ast) per match type."""
+    statements = _embedding_row_statements(
+        repo_path, commit_shas=commit_shas, file_filter=file_filter
+    )
+    return {
+        match_type: [
+            (*row, None) if match_type == "commit" else row
+            for row in session.execute(statement)
+        ]
+        for match_type, statement in statements.items()
+    }
+
+
+def stream_embedding_rows(
+    session: Session,
+    repo_path: str,
+    *,
+    file_filter=None,
+    batch_rows: int = 8_192,
+) -> Iterator[tuple[str, list[Any]]]:
+    """Yield ``(match_type, rows)`` batches of at most ``batch_rows`` rows.
+
+    Rows have the same shape as ``fetch_embedding_rows``, but are read through
+    a server-side cursor so a whole repo never sits in memory at once.
+    """
+    statements = _embedding_row_statements(repo_path, file_filter=file_filter)
+    for match_type, statement in statements.items():
+        result = session.execute(statement.execution_options(yield_per=batch_rows))
+        for partition in result.partitions():
+            if match_type == "commit":
+                partition = [(*row, None) for row in partition]
+            yield match_type, list(partition)
+
+
+def first_dimension(rows_by_type: dict[str, list[Any]]) -> int | None:
+    for rows in rows_by_type.values():
+        for row in rows:
+            for vector in row[2:]:
+                if vector is not None:
+                    return len(vector)
+    return None
+
+
+class RepoVectorIndex:
+    """Commit, file-change and hunk embeddings for one repo and profile."""
+
+    def __init__(
+        self,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        tables: dict[str, list[EmbeddingTable]],
+        dimension: int | None,
+    ):
+        self.repo_path = repo_path
+        self.embedding_profile_id = embedding_profile_id
+        self.tables = tables
+        self.dimension = dimension
+
+    @classmethod
+    def load(
+        cls,
+        session: Session,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        *,
+        file_filter=None,
+    ) -> "RepoVectorIndex":
+        rows_by_type = fetch_embedding_rows(session, repo_path, file_filter=file_filter)
+        dimension = first_dimension(rows_by_type)
+        tables: dict[str, list[EmbeddingTable]] = {}
+        if dimension is not None:
+            for match_type, rows in rows_by_type.items():
+                tables[match_type] = [_table_from_rows(match_type, rows, dimension)]
+
+        logger.info(
+            "Loaded vector index for %s (%s commits, %s file changes, %s hunks)",
+            repo_path,
+            len(rows_by_type["commit"]),
+            len(rows_by_type["file_change"]),
+            len(rows_by_type["hunk"]),
+        )
+        return cls(repo_path, embedding_profile_id, tables, dimension)
+
+    def with_rows(
+        self, rows_by_type: dict[str, list[Any]]
+    ) -> "RepoVectorIndex | None":
+        """A copy that searches ``rows_by_type`` ahead of the existing tables.
+
+        Returns None once a match type has ``MAX_INDEX_TABLES`` tables, so the
+        caller reloads the index instead of searching ever smaller tables.
+        """
+        dimension = self.dimension or first_dimension(rows_by_type)
+        tables = {
+            match_type: list(match_tables)
+            for match_type, match_tables in self.tables.items()
+        }
+        for match_type, rows in rows_by_type.items():
+            if not rows or dimension is None:
+                continue
+            match_tables = tables.setdefault(match_type, [])
+            if len(match_tables) >= MAX_INDEX_TABLES:
+                return None
+            match_tables.insert(0, _table_from_rows(match_type, rows, dimension))
+        return RepoVectorIndex(
+            self.repo_path, self.embedding_profile_id, tables, dimension
+        )
+
+    def search(
+        self,
+        query_embedding: list[float],
+        *,
+        commit_shas: Iterable[str] | None,
+        max_distances: dict[str, float],
+        limit: int | None = None,
+    ) -> dict[str, list[VectorHit]] | None:
+        """Top rows per match type, nearest first; None if dimensions differ."""
+        if self.dimension is None:
+            return {match_type: [] for match_type in max_distances}
+        if len(query_embedding) != self.dimension:
+            return None
+
+        query_unit = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_unit)
+        if query_norm == 0:
+            return {match_type: [] for match_type in max_distances}
+        query_unit /= query_norm
+
+        allowed_shas = (
+            np.array(sorted(set(commit_shas)), dtype=COMMIT_SHA_DTYPE)
+            if commit_shas is not None
+            else None
+        )
+        results: dict[str, list[VectorHit]] = {}
+        for match_type, max_distance in max_distances.items():
+            hits = [
+                hit
+                for table in self.tables.get(match_type, [])
+                for hit in table.search(
+                    query_unit,
+                    allowed_shas=allowed_shas,
+                    max_distance=max_distance,
+                    limit=limit,
+                )
+            ]
+            # Tables are ordered newest first, so on equal distance the stable
+            # sort keeps the latest row for a key that was re-embedded.
+            hits.sort(key=_hit_distance)
+            seen_keys: set[Any] = set()
+            hits = [
+                hit
+                for hit in hits
+                if hit.key not in seen_keys and not seen_keys.add(hit.key)
+            ]
+            results[match_type] = hits[:limit] if limit is not None else hits
+        return results
+
+
+def _table_from_rows(
+    match_type: str, rows: list[Any], dimension: int
+) -> EmbeddingTable:
+    return EmbeddingTable.from_vectors(
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        [row[3] for row in rows] if match_type != "commit" else None,
+        dimension,
+    )
+
+
+def _hit_distance(hit: VectorHit) -> float:
+    return min(
+        distance
+        for distance in (hit.text_distance, hit.ast_distance, float("inf"))
+        if distance is not None
+    )
+
+
+class VectorIndexRegistry:
+    """Process-wide cache of RepoVectorIndex keyed by (repo, embedding profile).
+
+    Indexes are built lazily on first search and dropped by ``invalidate``
+    whenever embeddings for a repo are written. With a segment store
+    configured they are memory-mapped from on-disk segments instead of being
+    loaded into RAM; ingest backfills those segments, and until it has, ``get``
+    returns None so search falls back to SQL.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._indexes: dict[tuple[str, int | None], RepoVectorIndex] = {}
+        self._generation = 0
+        self.segment_store: VectorSegmentStore | None = None
+
+    def configure_segments(self, segment_store: VectorSegmentStore | None) -> None:
+        with self._lock:
+            self.segment_store = segment_store
+            self._generation += 1
+            self._indexes.clear()
+
+    def get(
+        self,
+        session: Session,
+        repo_path: str,
+        *,
+        file_filter=None,
+    ) -> RepoVectorIndex | None:
+        if not repo_path:
+            return None
+
+        embedding_profile_id = session.execute(
+            select(SQLRepo.embedding_profile_id).where(SQLRepo.path == repo_path)
+        ).scalar()
+        key = (repo_path, embedding_profile_id)
+        with self._lock:
+            index = self._indexes.get(key)
+            generation = self._generation
+            segment_store = self.segment_store
+        if index is not None:
+            return index
+
+        if segment_store is not None:
+            index = segment_store.open_index(repo_path, embedding_profile_id)
+            if index is None:
+                return None
+        else:
+            index = RepoVectorIndex.load(
+                session,
+                repo_path,
+                embedding_profile_id,
+                file_filter=file_filter,
+            )
+        with self._lock:
+            if generation != self._generation:
+                # Embeddings changed while loading; serve this snapshot once.
+                return index
+            for stale_key in [
+                stale_key for stale_key in self._indexes if stale_key[0] == repo_path
+            ]:
+                self._indexes.pop(stale_key)
+            self._indexes[key] = index
+        return index
+
+    def append_commits(
+        self,
+        session: Session,
+        repo_path: str,
+        commit_shas: Iterable[str],
+        *,
+        file_filter=None,
+        chunk_size: int = 500,
+    ) -> None:
+        """Record new embeddings for ``commit_shas``.
+
+        With a segment store they are written to new segments, and a repo
+        without segments yet is backfilled in full, which already covers
+        ``commit_shas``. Otherwise they are appended to the cached index as
+        extra tables rather than reloading the whole repo.
+        """
+        embedding_profile_id = session.execute(
+            select(SQLRepo.embedding_profile_id).where(SQLRepo.path == repo_path)
+        ).scalar()
+        segment_store = self.segment_store
+        if segment_store is not None:
+            if segment_store.has_manifest(repo_path, embedding_profile_id):
+                segment_store.append(
+                    session,
+                    repo_path,
+                    embedding_profile_id,
+                    commit_shas,
+                    file_filter=file_filter,
+                )
+            else:
+                segment_store.backfill(
+                    session,
+                    repo_path,
+                    embedding_profile_id,
+                    file_filter=file_filter,
+                )
+            self.invalidate(repo_path)
+            return
+
+        key = (repo_path, embedding_profile_id)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is None:
+            self.invalidate(repo_path)
+            return
+
+        commit_shas = sorted(set(commit_shas))
+        rows_by_type: dict[str, list[Any]] = {}
+        for start in range(0, len(commit_shas), chunk_size):
+            chunk = fetch_embedding_rows(
+                session,
+                repo_path,
+                commit_shas=commit_shas[start : start + chunk_size],
+                file_filter=file_filter,
+            )
+            for match_type, rows in chunk.items():
+                rows_by_type.setdefault(match_type, []).extend(rows)
+        appended = index.with_rows(rows_by_type)
+        with self._lock:
+            # Loads that started before these rows were committed must not
+            # be cached over the appended index.
+            self._generation += 1
+            if appended is not None and self._indexes.get(key) is index:
+                self._indexes[key] = appended
+            else:
+                self._indexes.pop(key, None)
+
+    def drop(self, repo_path: str) -> None:
+        """Forget a repo's index; segments are backfilled by the next ingest."""
+        segment_store = self.segment_store
+        if segment_store is not None:
+            segment_store.drop(repo_path)
+        self.invalidate(repo_path)
+
+    def invalidate(self, repo_path: str | None = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if repo_path is None:
+                self._indexes.clear()
+                return
+            for key in [key for key in self._indexes if key[0] == repo_path]:
+                self._indexes.pop(key)
+
+
+DEFAULT_VECTOR_INDEXES = VectorIndexRegistry()
@@ -0,0 +1,528 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import struct
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+from sqlalchemy.orm import Session
+
+from core.vector_index import (
+    COMMIT_SHA_DTYPE,
+    EmbeddingTable,
+    RepoVectorIndex,
+    fetch_embedding_rows,
+    first_dimension,
+    np,
+    stream_embedding_rows,
+    unit_rows,
+)
+from utils.logger import logger
+
+SEGMENT_MAGIC = b"GOVSEG01"
+SEGMENT_SUFFIX = ".vseg"
+SEGMENT_ALIGNMENT = 64
+MANIFEST_NAME = "manifest.json"
+SEGMENT_DTYPES = ("float32", "float16")
+MATCH_TYPES = ("commit", "file_change", "hunk")
+COMPACTION_BLOCK_ROWS = 65_536
+BACKFILL_SEGMENT_ROWS = 8_192
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SEGMENT_ALIGNMENT) * SEGMENT_ALIGNMENT
+
+
+def _segment_sections(
+    match_type: str, rows: int, dimension: int, dtype: str, has_ast: bool
+) -> list[tuple[str, str, tuple[int, ...]]]:
+    sections = []
+    if match_type != "commit":
+        sections.append(("ids", "int64", (rows,)))
+    sections += [
+        ("commit_shas", COMMIT_SHA_DTYPE, (rows,)),
+        ("text_present", "bool", (rows,)),
+        ("text", dtype, (rows, dimension)),
+    ]
+    if has_ast:
+        sections += [
+            ("ast_present", "bool", (rows,)),
+            ("ast", dtype, (rows, dimension)),
+        ]
+    return sections
+
+
+def create_segment(
+    path: Path,
+    *,
+    embedding_profile_id: int | None,
+    match_type: str,
+    rows: int,
+    dimension: int,
+    dtype: str,
+    has_ast: bool,
+) -> dict[str, Any]:
+    """Lay out a segment file at ``path`` and return writable section memmaps.
+
+    Layout: magic, uint32 header length, JSON header, then 64-byte aligned
+    sections whose offsets are relative to the aligned end of the header.
+    """
+    layout: dict[str, dict[str, Any]] = {}
+    offset = 0
+    sections = _segment_sections(match_type, rows, dimension, dtype, has_ast)
+    for name, section_dtype, shape in sections:
+        layout[name] = {"dtype": section_dtype, "shape": list(shape), "offset": offset}
+        size = int(np.prod(shape)) * np.dtype(section_dtype).itemsize
+        offset = _align(offset + size)
+    header = json.dumps(
+        {
+            "embedding_profile_id": embedding_profile_id,
+            "match_type": match_type,
+            "dtype": dtype,
+            "dimension": dimension,
+            "rows": rows,
+            "has_ast": has_ast,
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    data_offset = _align(len(SEGMENT_MAGIC) + 4 + len(header))
+
+    with open(path, "wb") as handle:
+        handle.write(SEGMENT_MAGIC)
+        handle.write(struct.pack("<I", len(header)))
+        handle.write(header)
+        handle.truncate(data_offset + max(offset, 1))
+
+    arrays: dict[str, Any] = {}
+    for name, section in layout.items():
+        shape = tuple(section["shape"])
+        if shape[0] == 0:
+            arrays[name] = np.zeros(shape, dtype=section["dtype"])
+            continue
+        arrays[name] = np.memmap(
+            path,
+            dtype=section["dtype"],
+            mode="r+",
+            offset=data_offset + section["offset"],
+            shape=shape,
+        )
+    return arrays
+
+
+@dataclass(frozen=True)
+class Segment:
+    path: Path
+    match_type: str
+    embedding_profile_id: int | None
+    dimension: int
+    arrays: dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.arrays["commit_shas"])
+
+    def table(self) -> EmbeddingTable:
+        return EmbeddingTable(
+            SegmentKeys(self.arrays.get("ids"), self.arrays["commit_shas"]),
+            self.arrays["commit_shas"],
+            self.arrays["text"],
+            self.arrays["text_present"],
+            self.arrays.get("ast"),
+            self.arrays.get("ast_present"),
+        )
+
+
+class SegmentKeys:
+    """Row keys of a segment: commit SHAs for commits, row ids otherwise."""
+
+    def __init__(self, ids: Any | None, commit_shas: Any):
+        self.ids = ids
+        self.commit_shas = commit_shas
+
+    def __len__(self) -> int:
+        return len(self.commit_shas)
+
+    def __getitem__(self, row: int) -> Any:
+        if self.ids is None:
+            return self.commit_shas[row].decode("ascii")
+        return int(self.ids[row])
+
+
+def open_segment(path: Path) -> Segment:
+    with open(path, "rb") as handle:
+        if handle.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+            raise ValueError(f"Not a vector segment: {path}")
+        (header_length,) = struct.unpack("<I", handle.read(4))
+        header = json.loads(handle.read(header_length))
+    data_offset = _align(len(SEGMENT_MAGIC) + 4 + header_length)
+
+    arrays: dict[str, Any] = {}
+    for name, section in header["sections"].items():
+        shape = tuple(section["shape"])
+        if shape[0] == 0:
+            arrays[name] = np.zeros(shape, dtype=section["dtype"])
+            continue
+        arrays[name] = np.memmap(
+            path,
+            dtype=section["dtype"],
+            mode="r",
+            offset=data_offset + section["offset"],
+            shape=shape,
+        )
+    return Segment(
+        path=path,
+        match_type=header["match_type"],
+        embedding_profile_id=header["embedding_profile_id"],
+        dimension=header["dimension"],
+        arrays=arrays,
+    )
+
+
+class VectorSegmentStore:
+    """Append-only, memory-mapped embedding segments per repo and profile.
+
+    ``backfill`` streams a repo's existing embeddings into bounded segments;
+    it runs from ingest and the compaction command, never from search. Each
+    later sync appends one segment per match type; ``compact`` merges them and
+    drops rows of commits that are no longer reachable. Until then, search
+    filters those rows out by commit SHA.
+    """
+
+    def __init__(self, root: str | os.PathLike[str], *, dtype: str = "float16"):
+        if dtype not in SEGMENT_DTYPES:
+            raise ValueError(f"Unsupported vector segment dtype: {dtype}")
+        self.root = Path(root)
+        self.dtype = dtype
+        self._lock = Lock()
+
+    def repo_dir(self, repo_path: str) -> Path:
+        digest = hashlib.sha256(repo_path.encode("utf-8")).hexdigest()[:24]
+        return self.root / digest
+
+    def profile_dir(self, repo_path: str, embedding_profile_id: int | None) -> Path:
+        return self.repo_dir(repo_path) / f"profile-{embedding_profile_id or 0}"
+
+    def has_manifest(self, repo_path: str, embedding_profile_id: int | None) -> bool:
+        return (
+            self.profile_dir(repo_path, embedding_profile_id) / MANIFEST_NAME
+        ).exists()
+
+    def segment_paths(
+        self, repo_path: str, embedding_profile_id: int | None
+    ) -> list[Path]:
+        profile_dir = self.profile_dir(repo_path, embedding_profile_id)
+        if not profile_dir.is_dir():
+            return []
+        return sorted(profile_dir.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def open_index(
+        self, repo_path: str, embedding_profile_id: int | None
+    ) -> RepoVectorIndex | None:
+        """Map the repo's segments, or return None until it has been backfilled."""
+        with self._lock:
+            if not self.has_manifest(repo_path, embedding_profile_id):
+                return None
+            manifest = self._read_manifest(repo_path, embedding_profile_id)
+            segments = [
+                open_segment(path)
+                for path in self.segment_paths(repo_path, embedding_profile_id)
+            ]
+
+        tables: dict[str, list[EmbeddingTable]] = {}
+        # Newest first, so duplicate keys resolve to the latest embeddings.
+        for segment in reversed(segments):
+            if len(segment):
+                tables.setdefault(segment.match_type, []).append(segment.table())
+        return RepoVectorIndex(
+            repo_path, embedding_profile_id, tables, manifest.get("dimension")
+        )
+
+    def backfill(
+        self,
+        session: Session,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        *,
+        file_filter=None,
+        segment_rows: int = BACKFILL_SEGMENT_ROWS,
+    ) -> int:
+        """Rewrite the repo's segments from the database, ``segment_rows`` at a time.
+
+        The manifest is published last, so searches keep falling back to SQL
+        until every segment is in place. Returns the number of rows written.
+        """
+        with self._lock:
+            shutil.rmtree(
+                self.profile_dir(repo_path, embedding_profile_id), ignore_errors=True
+            )
+        dimension = None
+        written = 0
+        for match_type, rows in stream_embedding_rows(
+            session, repo_path, file_filter=file_filter, batch_rows=segment_rows
+        ):
+            dimension = dimension or first_dimension({match_type: rows})
+            written += self._write_rows(
+                repo_path, embedding_profile_id, {match_type: rows}
+            )
+        with self._lock:
+            self._write_manifest(repo_path, embedding_profile_id, dimension)
+        logger.info("Backfilled %s vector segment rows for %s", written, repo_path)
+        return written
+
+    def append(
+        self,
+        session: Session,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        commit_shas: Iterable[str],
+        *,
+        file_filter=None,
+        chunk_size: int = 500,
+    ) -> int:
+        """Write segments for ``commit_shas``; a no-op until the repo is backfilled."""
+        commit_shas = sorted(set(commit_shas))
+        with self._lock:
+            if not commit_shas or not self.has_manifest(
+                repo_path, embedding_profile_id
+            ):
+                return 0
+            rows_by_type: dict[str, list[Any]] = {
+                match_type: [] for match_type in MATCH_TYPES
+            }
+            for start in range(0, len(commit_shas), chunk_size):
+                chunk = fetch_embedding_rows(
+                    session,
+                    repo_path,
+                    commit_shas=commit_shas[start : start + chunk_size],
+                    file_filter=file_filter,
+                )
+                for match_type, rows in chunk.items():
+                    rows_by_type[match_type].extend(rows)
+            return self._write_rows(repo_path, embedding_profile_id, rows_by_type)
+
+    def drop(self, repo_path: str) -> None:
+        with self._lock:
+            shutil.rmtree(self.repo_dir(repo_path), ignore_errors=True)
+
+    def compact(
+        self,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        live_commit_shas: Iterable[str],
+    ) -> dict[str, int]:
+        """Merge each match type into one segment, keeping rows of live commits.
+
+        Rows are streamed block by block into the new memmap, and segments of
+        other embedding profiles are removed. Returns kept and dropped counts.
+        """
+        live_shas = np.array(sorted(set(live_commit_shas)), dtype=COMMIT_SHA_DTYPE)
+        with self._lock:
+            for stale_dir in self.repo_dir(repo_path).glob("profile-*"):
+                if stale_dir != self.profile_dir(repo_path, embedding_profile_id):
+                    shutil.rmtree(stale_dir, ignore_errors=True)
+            if not self.has_manifest(repo_path, embedding_profile_id):
+                return {"kept_rows": 0, "dropped_rows": 0, "merged_segments": 0}
+
+            paths = self.segment_paths(repo_path, embedding_profile_id)
+            segments_by_type: dict[str, list[Segment]] = {}
+            # Newest first, so the first row seen for a key wins.
+            for path in reversed(paths):
+                segment = open_segment(path)
+                segments_by_type.setdefault(segment.match_type, []).append(segment)
+
+            kept_rows = dropped_rows = 0
+            for match_type, segments in segments_by_type.items():
+                selections = []
+                seen_keys: list[Any] = []
+                for segment in segments:
+                    rows = np.flatnonzero(
+                        np.isin(segment.arrays["commit_shas"], live_shas)
+                    )
+                    keys = np.asarray(
+                        segment.arrays.get("ids", segment.arrays["commit_shas"])[rows]
+                    )
+                    _, first_rows = np.unique(keys, return_index=True)
+                    first_rows.sort()
+                    rows, keys = rows[first_rows], keys[first_rows]
+                    if seen_keys:
+                        fresh = ~np.isin(keys, np.concatenate(seen_keys))
+                        rows, keys = rows[fresh], keys[fresh]
+                    seen_keys.append(keys)
+                    selections.append((segment, rows))
+                    dropped_rows += len(segment) - len(rows)
+
+                total = sum(len(rows) for _, rows in selections)
+                kept_rows += total
+                if total:
+                    self._write_merged(
+                        repo_path, embedding_profile_id, match_type, selections, total
+                    )
+
+            for path in paths:
+                path.unlink(missing_ok=True)
+            logger.info(
+                "Compacted %s vector segments for %s (%s rows kept, %s dropped)",
+                len(paths),
+                repo_path,
+                kept_rows,
+                dropped_rows,
+            )
+            return {
+                "kept_rows": kept_rows,
+                "dropped_rows": dropped_rows,
+                "merged_segments": len(paths),
+            }
+
+    def _write_rows(
+        self,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        rows_by_type: dict[str, list[Any]],
+    ) -> int:
+        manifest = self._read_manifest(repo_path, embedding_profile_id)
+        dimension = manifest.get("dimension") or first_dimension(rows_by_type)
+        if dimension is None:
+            return 0
+
+        written = 0
+        for match_type, rows in rows_by_type.items():
+            if not rows:
+                continue
+            has_ast = match_type != "commit"
+            text_matrix, text_present = unit_rows([row[2] for row in rows], dimension)
+            with self._new_segment(
+                repo_path,
+                embedding_profile_id,
+                match_type,
+                rows=len(rows),
+                dimension=dimension,
+                has_ast=has_ast,
+            ) as arrays:
+                if "ids" in arrays:
+                    arrays["ids"][:] = [row[0] for row in rows]
+                arrays["commit_shas"][:] = [row[1] for row in rows]
+                arrays["text"][:] = text_matrix
+                arrays["text_present"][:] = text_present
+                if has_ast:
+                    ast_matrix, ast_present = unit_rows(
+                        [row[3] for row in rows], dimension
+                    )
+                    arrays["ast"][:] = ast_matrix
+                    arrays["ast_present"][:] = ast_present
+            written += len(rows)
+
+        if manifest and manifest.get("dimension") is None:
+            self._write_manifest(repo_path, embedding_profile_id, dimension)
+        return written
+
+    def _write_merged(
+        self,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        match_type: str,
+        selections: list[tuple[Segment, Any]],
+        total: int,
+    ) -> None:
+        has_ast = any("ast" in segment.arrays for segment, _ in selections)
+        with self._new_segment(
+            repo_path,
+            embedding_profile_id,
+            match_type,
+            rows=total,
+            dimension=selections[0][0].dimension,
+            has_ast=has_ast,
+        ) as arrays:
+            position = 0
+            for segment, rows in selections:
+                for start in range(0, len(rows), COMPACTION_BLOCK_ROWS):
+                    block = rows[start : start + COMPACTION_BLOCK_ROWS]
+                    target = slice(position, position + len(block))
+                    for name, array in arrays.items():
+                        if name in segment.arrays:
+                            array[target] = segment.arrays[name][block]
+                    position += len(block)
+
+    def _new_segment(
+        self,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        match_type: str,
+        *,
+        rows: int,
+        dimension: int,
+        has_ast: bool,
+    ) -> "_PendingSegment":
+        profile_dir = self.profile_dir(repo_path, embedding_profile_id)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{match_type}-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        return _PendingSegment(
+            final_path=profile_dir / f"{name}{SEGMENT_SUFFIX}",
+            tmp_path=profile_dir / f".{name}.tmp",
+            create_kwargs={
+                "embedding_profile_id": embedding_profile_id,
+                "match_type": match_type,
+                "rows": rows,
+                "dimension": dimension,
+                "dtype": self.dtype,
+                "has_ast": has_ast,
+            },
+        )
+
+    def _read_manifest(
+        self, repo_path: str, embedding_profile_id: int | None
+    ) -> dict[str, Any]:
+        path = self.profile_dir(repo_path, embedding_profile_id) / MANIFEST_NAME
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def _write_manifest(
+        self,
+        repo_path: str,
+        embedding_profile_id: int | None,
+        dimension: int | None,
+    ) -> None:
+        profile_dir = self.profile_dir(repo_path, embedding_profile_id)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = profile_dir / f".{MANIFEST_NAME}.tmp"
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "repo_path": repo_path,
+                    "embedding_profile_id": embedding_profile_id,
+                    "dimension": dimension,
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, profile_dir / MANIFEST_NAME)
+
+
+@dataclass
+class _PendingSegment:
+    """Writes a segment to a temporary file and publishes it on success."""
+
+    final_path: Path
+    tmp_path: Path
+    create_kwargs: dict[str, Any]
+
+    def __enter__(self) -> dict[str, Any]:
+        self.arrays = create_segment(self.tmp_path, **self.create_kwargs)
+        return self.arrays
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        for array in self.arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+        self.arrays = {}
+        if exc_type is not None:
+            self.tmp_path.unlink(missing_ok=True)
+            return
+        os.replace(self.tmp_path, self.final_path)
@@ -1,7 +1,17 @@
 from data.data_model import Commit, FileChange, DiffHunk
-from data.schema import SQLCommit, SQLFileChange, SQLDiffHunk
+from data.embedding_storage import read_embedding, write_embedding
+from data.file_exclusions import build_file_exclusion_filter
+from data.schema import (
+    REPO_SYNC_GENERATION,
+    SQLCommit,
+    SQLDiffHunk,
+    SQLFileChange,
+    SQLRepo,
+)
 from typing import Union, List
 from core.embedder import EmbeddingEngine
+from core.vector_index import DEFAULT_VECTOR_INDEXES
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 
@@ -21,24 +31,24 @@ class Writer:
 
         should_embed = self._should_write_semantic_embeddings(git_object)
         valid_updates = (
-            [update for update in updates if update["summary"] is not None]
+            [pending for pending in updates if pending["summary"] is not None]
             if should_embed
             else []
         )
         if valid_updates:
             embeddings = self.embedder.get_batch_embeddings(
-                [update["summary"] for update in valid_updates]
+                [pending["summary"] for pending in valid_updates]
             )
         else:
             embeddings = []
 
         valid_embedding_map = {}
-        for update, embedding in zip(valid_updates, embeddings):
-            valid_embedding_map[update["id"]] = embedding
+        for pending, embedding in zip(valid_updates, embeddings):
+            valid_embedding_map[pending["id"]] = embedding
 
         updates_by_type: dict[type, dict[object, object]] = {}
         for sql_type in (SQLCommit, SQLFileChange, SQLDiffHunk):
-            target_ids = [update["id"] for update in updates if update["type"] is sql_type]
+            target_ids = [pending["id"] for pending in updates if pending["type"] is sql_type]
             if not target_ids:
                 continue
             rows = (
@@ -51,16 +61,49 @@ class Writer:
             }
             updates_by_type[sql_type] = row_map
 
-        for update in updates:
-            db_object = updates_by_type[update["type"]][update["id"]]
-            db_object.summary = update["summary"]
+        for pending in updates:
+            db_object = updates_by_type[pending["type"]][pending["id"]]
+            db_object.summary = pending["summary"]
             if (
-                update["id"] in valid_embedding_map
-                and db_object.semantic_embedding is None
+                pending["id"] in valid_embedding_map
+                and read_embedding(db_object, "semantic_embedding") is None
             ):
-                db_object.semantic_embedding = valid_embedding_map[update["id"]]
+                write_embedding(
+                    db_object,
+                    "semantic_embedding",
+                    valid_embedding_map[pending["id"]],
+                    self.embedder.vector_storage,
+                )
+
+        repo_path = None
+        if valid_embedding_map:
+            commit_sha = (
+                git_object.sha if isinstance(git_object, Commit) else git_object.commit_sha
+            )
+            repo_path = (
+                self.session.query(SQLCommit.repo_path)
+                .filter(SQLCommit.sha == commit_sha)
+                .scalar()
+            )
+            if repo_path is not None:
+                # New embeddings change semantic results, like a sync does.
+                self.session.execute(
+                    update(SQLRepo)
+                    .where(SQLRepo.path == repo_path)
+                    .values(sync_generation=REPO_SYNC_GENERATION.next_value())
+                )
 
         self.session.commit()
+        if valid_embedding_map:
+            if repo_path is None:
+                DEFAULT_VECTOR_INDEXES.invalidate()
+            else:
+                DEFAULT_VECTOR_INDEXES.append_commits(
+                    self.session,
+                    repo_path,
+                    [commit_sha],
+                    file_filter=build_file_exclusion_filter(),
+                )
         print(f"Summaries saved for {type(git_object).__name__}...")
 
     def _recursive_collect_updates(
@@ -1,3 +1,4 @@
+from data.embedding_storage import read_embedding
 from data.schema import SQLDiffHunk, SQLFileChange, SQLCommit, SQLBranch, SQLUser
 from data.data_model import DiffHunk, FileChange, Commit, Branch, FileSnapshot, User
 
@@ -20,8 +21,12 @@ class DatabaseAdapter:
             commit_sha=(
                 sql_hunk.file_change.commit_sha if sql_hunk.file_change else None
             ),
-            semantic_embedding=sql_hunk.semantic_embedding if not compressed else None,
-            ast_embedding=sql_hunk.ast_embedding if not compressed else None,
+            semantic_embedding=(
+                read_embedding(sql_hunk, "semantic_embedding") if not compressed else None
+            ),
+            ast_embedding=(
+                read_embedding(sql_hunk, "ast_embedding") if not compressed else None
+            ),
         )
 
     def parse_sql_user(self, sql_user: SQLUser) -> User:
@@ -77,9 +82,15 @@ class DatabaseAdapter:
             ast_summary=sql_file_change.ast_summary,
             commit_sha=sql_file_change.commit_sha,
             semantic_embedding=(
-                sql_file_change.semantic_embedding if not compressed else None
+                read_embedding(sql_file_change, "semantic_embedding")
+                if not compressed
+                else None
+            ),
+            ast_embedding=(
+                read_embedding(sql_file_change, "ast_embedding")
+                if not compressed
+                else None
             ),
-            ast_embedding=sql_file_change.ast_embedding if not compressed else None,
         )
 
     def parse_sql_commit(
@@ -102,7 +113,9 @@ class DatabaseAdapter:
             file_changes=file_changes,
             summary=sql_commit.summary,
             semantic_embedding=(
-                sql_commit.semantic_embedding if not compressed else None
+                read_embedding(sql_commit, "semantic_embedding")
+                if not compressed
+                else None
             ),
         )
 
@@ -110,6 +110,10 @@ class FileChange(BaseModel):
     commit_sha: str = Field(
         None, description="SHA of the commit this file change belongs to"
     )
+    skip_reason: Optional[str] = Field(
+        None,
+        description="Why ingest stored this change as a placeholder (excluded, binary, blob_too_large, hunk_too_large)",
+    )
 
 class Commit(BaseModel):
     """Represents a commit."""
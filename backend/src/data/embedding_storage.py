@@ -0,0 +1,123 @@
+from typing import Any, Iterable, Literal
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import cast, func, or_, text
+
+VectorStorage = Literal["vector", "halfvec"]
+VECTOR_STORAGE_MODES: tuple[str, ...] = ("vector", "halfvec")
+HALF_SUFFIX = "_half"
+
+# (table, embedding columns) in the order rows are converted.
+EMBEDDING_TABLES = (
+    ("commits", ("semantic_embedding",)),
+    ("file_changes", ("semantic_embedding", "ast_embedding")),
+    ("diff_hunks", ("semantic_embedding", "ast_embedding")),
+)
+
+
+def embedding_columns(model, name: str):
+    """Full-precision and half-precision columns backing one embedding."""
+    return getattr(model, name), getattr(model, f"{name}{HALF_SUFFIX}")
+
+
+def embedding_distance(model, name: str, query_embedding: list[float]):
+    """Cosine distance read from whichever column holds the row's embedding."""
+    full, half = embedding_columns(model, name)
+    return func.coalesce(
+        full.cosine_distance(query_embedding),
+        half.cosine_distance(query_embedding),
+    )
+
+
+def embedding_present(model, name: str):
+    full, half = embedding_columns(model, name)
+    return or_(full.isnot(None), half.isnot(None))
+
+
+def embedding_value(model, name: str):
+    """Select expression returning the embedding as a full-precision vector."""
+    full, half = embedding_columns(model, name)
+    return func.coalesce(full, cast(half, Vector()), type_=Vector())
+
+
+def read_embedding(row: Any, name: str) -> Any | None:
+    value = getattr(row, name)
+    if value is not None:
+        return value
+    half_value = getattr(row, f"{name}{HALF_SUFFIX}", None)
+    return half_value.to_list() if half_value is not None else None
+
+
+def write_embedding(
+    row: Any, name: str, value: Any | None, storage: VectorStorage
+) -> None:
+    if storage == "halfvec":
+        setattr(row, name, None)
+        setattr(row, f"{name}{HALF_SUFFIX}", value)
+    else:
+        setattr(row, name, value)
+        setattr(row, f"{name}{HALF_SUFFIX}", None)
+
+
+def apply_vector_storage(rows: Iterable[Any], storage: VectorStorage) -> None:
+    """Move embeddings of freshly built rows into the profile's columns."""
+    if storage == "vector":
+        return
+    for row in rows:
+        for name in ("semantic_embedding", "ast_embedding"):
+            if hasattr(row, f"{name}{HALF_SUFFIX}"):
+                write_embedding(row, name, getattr(row, name), storage)
+
+
+def convert_vector_storage(
+    connection,
+    embedding_profile_id: int,
+    storage: VectorStorage,
+    *,
+    repo_path: str,
+) -> None:
+    """Rewrite one repo's stored embeddings into ``storage`` columns.
+
+    ``connection`` may be a Connection or a Session. The profile's recorded
+    storage is left to the caller. Space freed by the old columns is
+    reclaimed by the next VACUUM.
+    """
+    if storage not in VECTOR_STORAGE_MODES:
+        raise ValueError(f"Unsupported vector storage: {storage}")
+    source_suffix, target_suffix, target_type = (
+        ("", HALF_SUFFIX, "halfvec") if storage == "halfvec" else (HALF_SUFFIX, "", "vector")
+    )
+    for table_name, columns in EMBEDDING_TABLES:
+        assignments = ",\n                ".join(
+            assignment
+            for column in columns
+            for assignment in (
+                f"{column}{target_suffix} = COALESCE("
+                f"{table_name}.{column}{target_suffix}, "
+                f"{table_name}.{column}{source_suffix}::{target_type})",
+                f"{column}{source_suffix} = NULL",
+            )
+        )
+        has_source = " OR ".join(
+            f"{table_name}.{column}{source_suffix} IS NOT NULL" for column in columns
+        )
+        commit_join = (
+            "commits.repo_path = repos.path"
+            if table_name == "commits"
+            else f"commits.sha = {table_name}.commit_sha AND commits.repo_path = repos.path"
+        )
+        source_tables = "repos" if table_name == "commits" else "commits, repos"
+        connection.execute(
+            text(
+                f"""
+                UPDATE {table_name}
+                SET {assignments}
+                FROM {source_tables}
+                WHERE {commit_join}
+                  AND repos.embedding_profile_id = :embedding_profile_id
+                  AND repos.path = :repo_path
+                  AND ({has_source})
+                """
+            ),
+            {"embedding_profile_id": embedding_profile_id, "repo_path": repo_path},
+        )
@@ -0,0 +1,52 @@
+from sqlalchemy import or_
+
+from data.schema import SQLFileChange
+
+# Substrings of file paths kept out of search results and vector indexes.
+EXCLUDED_FILE_PATTERNS = (
+    ".gitignore",
+    "package-lock.json",
+    "package.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "Gemfile.lock",
+    "Cargo.lock",
+    "poetry.lock",
+    "composer.lock",
+    "go.sum",
+    ".env",
+    ".env.example",
+    "components.json",
+    "tsconfig.json",
+    "jsconfig.json",
+    ".prettierrc",
+    ".eslintrc",
+    "tailwind.config",
+    "vite.config",
+    "webpack.config",
+    "rollup.config",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".bmp",
+    ".tiff",
+    ".ico",
+    ".webp",
+    ".heic",
+    ".heif",
+    ".avif",
+)
+
+
+def build_file_exclusion_filter():
+    """SQL filter dropping file changes whose old or new path matches a pattern."""
+    exclusion_matches = []
+    for pattern in EXCLUDED_FILE_PATTERNS:
+        exclusion_matches.append(
+            or_(
+                SQLFileChange.new_path.ilike(f"%{pattern}%"),
+                SQLFileChange.old_path.ilike(f"%{pattern}%"),
+            )
+        )
+    return ~or_(*exclusion_matches)
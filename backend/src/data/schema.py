@@ -1,6 +1,8 @@
 from typing import List, Optional
 from enum import Enum
 from sqlalchemy import (
+    BigInteger,
+    Sequence,
     String,
     Integer,
     Text,
@@ -17,7 +19,7 @@ from sqlalchemy.orm import (
     mapped_column,
     relationship,
 )
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from sqlalchemy import Table
 from datetime import datetime
 
@@ -28,6 +30,11 @@ class Base(DeclarativeBase):
     pass
 
 
+# Repo sync generations are drawn from one sequence, so a repo that is
+# deleted and re-ingested never reuses a generation.
+REPO_SYNC_GENERATION = Sequence("repo_sync_generation_seq", metadata=Base.metadata)
+
+
 class FileChangeStatus(str, Enum):
     """Enum for file change status types."""
 
@@ -61,6 +68,7 @@ class SQLEmbeddingProfile(Base):
     model_id: Mapped[str] = mapped_column(Text)
     observed_dimension: Mapped[Optional[int]]
     ast_schema_version: Mapped[int] = mapped_column(Integer, default=0)
+    vector_storage: Mapped[str] = mapped_column(String(16), default="vector")
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
@@ -84,6 +92,8 @@ class SQLDiffHunk(Base):
     ast_summary: Mapped[Optional[str]] = mapped_column(Text)
     semantic_embedding: Mapped[Optional[List[float]]] = mapped_column(Vector())
     ast_embedding: Mapped[Optional[List[float]]] = mapped_column(Vector())
+    semantic_embedding_half: Mapped[Optional[List[float]]] = mapped_column(HALFVEC())
+    ast_embedding_half: Mapped[Optional[List[float]]] = mapped_column(HALFVEC())
 
     # Foreign Keys
     file_change_id: Mapped[int] = mapped_column(ForeignKey("file_changes.id"))
@@ -129,6 +139,8 @@ class SQLFileChange(Base):
     ast_summary: Mapped[Optional[str]] = mapped_column(Text)
     semantic_embedding: Mapped[Optional[List[float]]] = mapped_column(Vector())
     ast_embedding: Mapped[Optional[List[float]]] = mapped_column(Vector())
+    semantic_embedding_half: Mapped[Optional[List[float]]] = mapped_column(HALFVEC())
+    ast_embedding_half: Mapped[Optional[List[float]]] = mapped_column(HALFVEC())
 
     # Foreign Keys
     commit_sha: Mapped[Optional[str]] = mapped_column(ForeignKey("commits.sha"))
@@ -180,6 +192,7 @@ class SQLCommit(Base):
     message: Mapped[str] = mapped_column(Text)
     summary: Mapped[Optional[str]] = mapped_column(Text)
     semantic_embedding: Mapped[Optional[List[float]]] = mapped_column(Vector())
+    semantic_embedding_half: Mapped[Optional[List[float]]] = mapped_column(HALFVEC())
 
     # Foreign Keys
     repo_path: Mapped[str] = mapped_column(ForeignKey("repos.path"))
@@ -211,6 +224,10 @@ class SQLRepo(Base):
     last_synced_at: Mapped[Optional[datetime]]
     last_sync_status: Mapped[Optional[str]] = mapped_column(String(32))
     last_sync_summary: Mapped[Optional[dict]] = mapped_column(JSON)
+    branch_heads_fingerprint: Mapped[Optional[str]] = mapped_column(String(64))
+    sync_generation: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
 
     # Foreign Keys
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -228,6 +245,23 @@ class SQLRepo(Base):
     )
 
 
+class SQLIngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    repo_path: Mapped[str] = mapped_column(Text, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    status: Mapped[str] = mapped_column(String(32), default="queued", index=True)
+    request_payload: Mapped[dict] = mapped_column(JSON)
+    result_repo_path: Mapped[Optional[str]] = mapped_column(Text)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    progress: Mapped[Optional[dict]] = mapped_column(JSON)
+    checkpoint: Mapped[Optional[dict]] = mapped_column(JSON)
+    started_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    completed_at: Mapped[Optional[datetime]]
+
+
 class SQLReviewSession(Base):
     __tablename__ = "review_sessions"
 
@@ -6,6 +6,7 @@ from urllib.parse import urlparse
 
 from pydantic import BaseModel, Field, ValidationError, model_validator
 
+from data.embedding_storage import VectorStorage
 from infrastructure.errors import AIConfigurationError
 
 ProviderType = Literal["openai", "openai_compatible"]
@@ -128,11 +129,13 @@ class TextGenerationBinding(BaseModel):
     model_id: str
     temperature: float = 0.2
     reasoning_effort: ReasoningEffort | None = None
+    context_token_budget: int | None = Field(default=None, gt=0)
 
 
 class EmbeddingsBinding(BaseModel):
     provider_profile_id: str
     model_id: str
+    vector_storage: VectorStorage = "vector"
 
 
 class CapabilityBindings(BaseModel):
@@ -4,6 +4,7 @@ from typing import Callable
 from sqlalchemy import text
 
 import infrastructure.db as db
+from data.embedding_storage import EMBEDDING_TABLES, HALF_SUFFIX
 from infrastructure.ai_runtime import (
     DEFAULT_EMBEDDING_MODEL,
     OPENAI_DEFAULT_BASE_URL,
@@ -1189,6 +1190,110 @@ def _review_run_instructions_migration(connection, settings: Settings) -> None:
     )
 
 
+def _repo_branch_heads_fingerprint_migration(connection, settings: Settings) -> None:
+    connection.execute(
+        text(
+            """
+            ALTER TABLE repos
+            ADD COLUMN IF NOT EXISTS branch_heads_fingerprint VARCHAR(64)
+            """
+        )
+    )
+
+
+def _ingest_jobs_migration(connection, settings: Settings) -> None:
+    connection.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS ingest_jobs (
+                id VARCHAR(64) PRIMARY KEY,
+                repo_path TEXT NOT NULL,
+                user_id INTEGER NOT NULL REFERENCES users(id),
+                status VARCHAR(32) NOT NULL DEFAULT 'queued',
+                request_payload JSONB NOT NULL,
+                result_repo_path TEXT,
+                error TEXT,
+                progress JSONB,
+                checkpoint JSONB,
+                started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                completed_at TIMESTAMPTZ
+            )
+            """
+        )
+    )
+    connection.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_ingest_jobs_repo_path
+            ON ingest_jobs (repo_path)
+            """
+        )
+    )
+    connection.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_ingest_jobs_status
+            ON ingest_jobs (status)
+            """
+        )
+    )
+
+
+def _trigram_search_indexes_migration(connection, settings: Settings) -> None:
+    # pg_trgm GIN indexes serve the ILIKE '%query%' filters of exact search.
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for index_name, table_name, column_name in (
+        ("ix_commits_message_trgm", "commits", "message"),
+        ("ix_file_changes_new_path_trgm", "file_changes", "new_path"),
+        ("ix_file_changes_old_path_trgm", "file_changes", "old_path"),
+        ("ix_diff_hunks_content_trgm", "diff_hunks", "content"),
+    ):
+        connection.execute(
+            text(
+                f"""
+                CREATE INDEX IF NOT EXISTS {index_name}
+                ON {table_name} USING gin ({column_name} gin_trgm_ops)
+                """
+            )
+        )
+
+
+def _halfvec_embedding_storage_migration(connection, settings: Settings) -> None:
+    # pgvector 0.7+ is checked by ensure_pgvector_extension. Stored rows are
+    # moved into the configured storage at startup, not here.
+    connection.execute(
+        text(
+            """
+            ALTER TABLE embedding_profiles
+            ADD COLUMN IF NOT EXISTS vector_storage VARCHAR(16) NOT NULL DEFAULT 'vector'
+            """
+        )
+    )
+    for table_name, columns in EMBEDDING_TABLES:
+        for column_name in columns:
+            connection.execute(
+                text(
+                    f"""
+                    ALTER TABLE {table_name}
+                    ADD COLUMN IF NOT EXISTS {column_name}{HALF_SUFFIX} halfvec
+                    """
+                )
+            )
+
+
+def _repo_sync_generation_migration(connection, settings: Settings) -> None:
+    connection.execute(text("CREATE SEQUENCE IF NOT EXISTS repo_sync_generation_seq"))
+    connection.execute(
+        text(
+            """
+            ALTER TABLE repos
+            ADD COLUMN IF NOT EXISTS sync_generation BIGINT NOT NULL DEFAULT 0
+            """
+        )
+    )
+
+
 MIGRATIONS = [
     Migration(
         version="20260321_ai_runtime_embeddings",
@@ -1226,6 +1331,26 @@ MIGRATIONS = [
         version="20260409_review_run_instructions",
         run=_review_run_instructions_migration,
     ),
+    Migration(
+        version="20261019_repo_branch_heads_fingerprint",
+        run=_repo_branch_heads_fingerprint_migration,
+    ),
+    Migration(
+        version="20261019_ingest_jobs",
+        run=_ingest_jobs_migration,
+    ),
+    Migration(
+        version="20261019_trigram_search_indexes",
+        run=_trigram_search_indexes_migration,
+    ),
+    Migration(
+        version="20261019_halfvec_embedding_storage",
+        run=_halfvec_embedding_storage_migration,
+    ),
+    Migration(
+        version="20261019_repo_sync_generation",
+        run=_repo_sync_generation_migration,
+    ),
 ]
 
 
@@ -13,14 +13,21 @@ def ensure_pgvector_extension() -> None:
 
     with db.engine.begin() as connection:
         connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        vector_enabled = connection.execute(
-            text("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+        vector_version = connection.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
         ).scalar()
 
-    if vector_enabled != 1:
+    if vector_version is None:
         raise RuntimeError(
             "pgvector extension is required but could not be enabled."
         )
+    # The schema maps halfvec embedding columns, which arrived in pgvector 0.7.
+    if tuple(int(part) for part in vector_version.split(".")[:2]) < (0, 7):
+        raise RuntimeError(
+            f"pgvector {vector_version} is installed but 0.7 or newer is "
+            "required. Install a newer pgvector and run "
+            "'ALTER EXTENSION vector UPDATE'."
+        )
 
 
 def init_schema():
@@ -7,6 +7,18 @@ class Settings(BaseSettings):
     ai_runtime_config_json: str | None = None
     ai_secret_values_json: str | None = None
     ingest_flush_size: int = 100
+    ingest_checkpoint_window_size: int = 250
+    ingest_max_workers: int = 2
+    ingest_ast_workers: int = 1
+    ingest_progress_stream_interval_seconds: float = 0.25
+    semantic_vector_index_enabled: bool = False
+    vector_segment_dir: str | None = None
+    vector_segment_dtype: str = "float16"
+    chat_context_top_k: int = 5
+    chat_context_token_budget: int = 2000
+    repo_watcher_enabled: bool = False
+    repo_watcher_poll_seconds: float = 2.0
+    repo_watcher_debounce_seconds: float = 1.5
     desktop_user_id: int = 1
     desktop_user_username: str = "local-user"
     desktop_user_email: str = "local@gitodyssey.app"
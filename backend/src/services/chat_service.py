@@ -1,16 +1,30 @@
 from core.retriever import Retriever
 from core.ai import AIEngine
+from core.context_packer import TokenCounter
 from api.api_model import ChatbotRequest, ChatbotResponse, CitedCommit
 
 
 class ChatService:
-    def __init__(self, ai_engine: AIEngine, retriever: Retriever):
+    def __init__(
+        self,
+        ai_engine: AIEngine,
+        retriever: Retriever,
+        *,
+        context_token_budget: int | None = None,
+        token_counter: TokenCounter | None = None,
+    ):
         self.retriever = retriever
         self.ai = ai_engine
+        self.context_token_budget = context_token_budget
+        self.token_counter = token_counter
 
     def chat(self, request: ChatbotRequest) -> ChatbotResponse:
         context, cited_commits_with_scores = self.retriever.get_context_with_citations(
-            request.query, request.repo_path, request.context_shas
+            request.query,
+            request.repo_path,
+            request.context_shas,
+            token_budget=self.context_token_budget,
+            token_counter=self.token_counter,
         )
         response = self.ai.answer_question(request.query, context)
         cited_commits = [
@@ -1,18 +1,96 @@
-from core.retriever import Retriever
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+from sqlalchemy import select
+
+from core.retriever import FilterExecutionResult, Retriever
 from api.api_model import FilterRequest, FilterResponse
+from data.schema import SQLRepo
+
+FILTER_CACHE_SIZE = 256
+
+
+class FilterResultCache:
+    """LRU of filter results keyed by the repo's sync generation.
+
+    Every sync, and every summary that adds embeddings, bumps the
+    generation, so entries for older generations can never be hit again and
+    simply age out.
+    """
+
+    def __init__(self, cache_size: int = FILTER_CACHE_SIZE):
+        self.cache_size = max(0, cache_size)
+        self._cache: OrderedDict[tuple, FilterExecutionResult] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> FilterExecutionResult | None:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key: tuple, result: FilterExecutionResult) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+DEFAULT_FILTER_RESULT_CACHE = FilterResultCache()
 
 
 class FilterService:
+    result_cache = DEFAULT_FILTER_RESULT_CACHE
+
     def __init__(self, retriever: Retriever):
         self.retriever = retriever
 
     def filter(self, request: FilterRequest) -> FilterResponse:
-        search_result = self.retriever.filter(
-            request.query,
-            request.filters,
-            request.repo_path,
-            request.max_results,
+        if request.cursor:
+            # Later pages are sliced from the ranked-result handle.
+            return self._to_response(
+                self.retriever.filter_page(
+                    request.query,
+                    request.filters,
+                    request.repo_path,
+                    request.max_results,
+                    request.cursor,
+                    search_mode=request.search_mode,
+                )
+            )
+
+        cache_key = self._cache_key(request)
+        search_result = (
+            self.result_cache.get(cache_key) if cache_key is not None else None
         )
+        if search_result is None:
+            search_result = self.retriever.filter(
+                request.query,
+                request.filters,
+                request.repo_path,
+                request.max_results,
+                search_mode=request.search_mode,
+            )
+            if cache_key is not None:
+                self.result_cache.put(cache_key, search_result)
+        return self._to_response(search_result)
+
+    def _to_response(self, search_result: FilterExecutionResult) -> FilterResponse:
         return FilterResponse(
             commit_shas=[result["sha"] for result in search_result.results],
             results=search_result.results,
@@ -20,4 +98,29 @@ class FilterService:
             total_relevant_results=search_result.total_relevant_results,
             has_more_relevant=search_result.has_more_relevant,
             max_results=search_result.max_results,
+            next_cursor=search_result.next_cursor,
+        )
+
+    def _cache_key(self, request: FilterRequest) -> tuple[Any, ...] | None:
+        if not request.repo_path:
+            # Cross-repo searches have no single generation to key on.
+            return None
+        repo_state = self.retriever.session.execute(
+            select(SQLRepo.sync_generation, SQLRepo.embedding_profile_id).where(
+                SQLRepo.path == request.repo_path
+            )
+        ).first()
+        if repo_state is None:
+            return None
+
+        embedder = self.retriever.embedder
+        return (
+            request.repo_path,
+            request.query.strip(),
+            json.dumps(request.filters, sort_keys=True, default=str),
+            request.max_results,
+            request.search_mode,
+            repo_state.embedding_profile_id,
+            embedder.profile_fingerprint if embedder is not None else None,
+            repo_state.sync_generation,
         )
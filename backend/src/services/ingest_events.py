@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from threading import Lock
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class IngestEventSubscription(Generic[T]):
+    """Latest-value mailbox bound to the event loop that subscribed.
+
+    Publishers may run on any thread; values are handed over with
+    ``call_soon_threadsafe`` and only the newest undelivered value is kept,
+    so slow consumers see coalesced updates instead of a growing backlog.
+    """
+
+    def __init__(
+        self,
+        broker: "IngestEventBroker[T]",
+        key: str,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self.broker = broker
+        self.key = key
+        self.loop = loop
+        self._latest: T | None = None
+        self._event = asyncio.Event()
+
+    def _deliver(self, value: T) -> None:
+        self._latest = value
+        self._event.set()
+
+    async def next(self, timeout: float | None = None) -> T:
+        await asyncio.wait_for(self._event.wait(), timeout)
+        self._event.clear()
+        value = self._latest
+        self._latest = None
+        return value
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def __enter__(self) -> "IngestEventSubscription[T]":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class IngestEventBroker(Generic[T]):
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._subscriptions: dict[str, set[IngestEventSubscription[T]]] = {}
+
+    def subscribe(self, key: str) -> IngestEventSubscription[T]:
+        subscription = IngestEventSubscription(self, key, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: IngestEventSubscription[T]) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.key)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.key, None)
+
+    def publish(self, key: str, value: T) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(key, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, value)
+            except RuntimeError:
+                # The subscriber's loop has shut down.
+                self.unsubscribe(subscription)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscriptions.clear()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from math import ceil
+from time import monotonic
+from typing import Callable
+
+DEFAULT_PUBLISH_INTERVAL_SECONDS = 0.1
+DEFAULT_PUBLISH_STEPS = 200
+
+
+class ThrottledProgressReporter:
+    """Counts completed units and publishes a snapshot only now and then.
+
+    ``advance`` is meant for hot loops: it bumps a plain counter owned by the
+    calling worker and calls ``publish`` only once ``min_interval_seconds`` has
+    elapsed or ``1 / publish_steps`` of the total has completed since the last
+    publish. The final unit is always published.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[int], None],
+        *,
+        total_units: int,
+        min_interval_seconds: float = DEFAULT_PUBLISH_INTERVAL_SECONDS,
+        publish_steps: int = DEFAULT_PUBLISH_STEPS,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.publish = publish
+        self.total_units = total_units
+        self.min_interval_seconds = max(0.0, min_interval_seconds)
+        self.unit_step = max(1, ceil(total_units / max(1, publish_steps)))
+        self.clock = clock
+        self.completed_units = 0
+        self.published_count = 0
+        self._published_units = 0
+        self._published_at = clock()
+
+    def advance(self, units: int = 1) -> None:
+        self.completed_units += units
+        if (
+            self.completed_units >= self.total_units
+            or self.completed_units - self._published_units >= self.unit_step
+        ):
+            self.flush()
+            return
+
+        now = self.clock()
+        if now - self._published_at >= self.min_interval_seconds:
+            self._publish(now)
+
+    def update(self, completed_units: int) -> None:
+        self.advance(completed_units - self.completed_units)
+
+    def flush(self) -> None:
+        if self.completed_units != self._published_units:
+            self._publish(self.clock())
+
+    def _publish(self, now: float) -> None:
+        self._published_units = self.completed_units
+        self._published_at = now
+        self.published_count += 1
+        self.publish(self.completed_units)
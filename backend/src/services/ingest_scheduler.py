@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from itertools import count
+from threading import Condition, Thread
+from typing import Callable, Literal
+
+from utils.logger import logger
+
+IngestPriority = Literal["interactive", "background"]
+
+PRIORITY_RANKS: dict[str, int] = {"interactive": 0, "background": 1}
+
+
+@dataclass(order=True)
+class _QueuedJob:
+    rank: int
+    sequence: int
+    job_id: str = field(compare=False)
+    priority: IngestPriority = field(compare=False)
+    run: Callable[[], None] = field(compare=False)
+
+
+class IngestJobScheduler:
+    """Runs ingest jobs on a bounded worker pool, interactive jobs first.
+
+    When an interactive job is queued and every worker is busy, one running
+    background job is asked to yield through ``preempt``; it is expected to
+    stop at its next checkpoint and resubmit itself.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        *,
+        preempt: Callable[[str], bool] | None = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.preempt = preempt
+        self._condition = Condition()
+        self._queue: list[_QueuedJob] = []
+        self._sequence = count()
+        self._running: dict[str, _QueuedJob] = {}
+        self._preempting: set[str] = set()
+        self._workers: list[Thread] = []
+
+    def submit(
+        self,
+        job_id: str,
+        run: Callable[[], None],
+        *,
+        priority: IngestPriority = "interactive",
+    ) -> None:
+        with self._condition:
+            heapq.heappush(
+                self._queue,
+                _QueuedJob(
+                    rank=PRIORITY_RANKS[priority],
+                    sequence=next(self._sequence),
+                    job_id=job_id,
+                    priority=priority,
+                    run=run,
+                ),
+            )
+            self._ensure_workers()
+            self._condition.notify()
+            victim_job_id = self._select_preemption_victim()
+
+        self._request_preemption(victim_job_id)
+
+    def promote(self, job_id: str) -> None:
+        with self._condition:
+            for queued_job in self._queue:
+                if queued_job.job_id == job_id and queued_job.priority != "interactive":
+                    queued_job.priority = "interactive"
+                    queued_job.rank = PRIORITY_RANKS["interactive"]
+                    heapq.heapify(self._queue)
+                    break
+            else:
+                running_job = self._running.get(job_id)
+                if running_job is not None:
+                    running_job.priority = "interactive"
+                return
+            victim_job_id = self._select_preemption_victim()
+
+        self._request_preemption(victim_job_id)
+
+    def queued_job_ids(self) -> list[str]:
+        with self._condition:
+            return [queued_job.job_id for queued_job in sorted(self._queue)]
+
+    def running_job_ids(self) -> list[str]:
+        with self._condition:
+            return list(self._running)
+
+    def _ensure_workers(self) -> None:
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = Thread(
+                target=self._run_worker,
+                name=f"git-odyssey-ingest-worker-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _select_preemption_victim(self) -> str | None:
+        queued_interactive = sum(
+            1 for queued_job in self._queue if queued_job.priority == "interactive"
+        )
+        idle_workers = self.max_workers - len(self._running)
+        if queued_interactive <= idle_workers + len(self._preempting):
+            return None
+
+        for job_id, running_job in self._running.items():
+            if running_job.priority == "background" and job_id not in self._preempting:
+                self._preempting.add(job_id)
+                return job_id
+        return None
+
+    def _request_preemption(self, job_id: str | None) -> None:
+        if job_id is None or self.preempt is None:
+            return
+        logger.info("Preempting background ingest job %s", job_id)
+        if not self.preempt(job_id):
+            with self._condition:
+                self._preempting.discard(job_id)
+
+    def _run_worker(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                queued_job = heapq.heappop(self._queue)
+                self._running[queued_job.job_id] = queued_job
+                self._preempting.discard(queued_job.job_id)
+
+            try:
+                queued_job.run()
+            except Exception:
+                logger.exception("Ingest job %s crashed its worker", queued_job.job_id)
+            finally:
+                with self._condition:
+                    # A preempted job may already have been resubmitted and
+                    # picked up by another worker under the same id.
+                    if self._running.get(queued_job.job_id) is queued_job:
+                        self._running.pop(queued_job.job_id, None)
+                        self._preempting.discard(queued_job.job_id)
@@ -1,22 +1,34 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from threading import Lock, Thread
+from threading import Event, Lock
 from time import perf_counter
 from typing import Literal
 from uuid import uuid4
 
-from sqlalchemy import delete
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session, joinedload, selectinload
 
 from api.api_model import IngestRequest
 from core.ast_extractor import ASTSummaryExtractor
 from core.embedder import EmbeddingEngine, EmbeddingExecutionStats
-from core.repo import BranchState, Repo, normalize_repo_path
+from core.repo import (
+    DEFAULT_INGEST_SKIP_POLICY,
+    BranchState,
+    IngestSkipPolicy,
+    Repo,
+    compute_branch_heads_fingerprint,
+    normalize_repo_path,
+)
+from core.vector_index import DEFAULT_VECTOR_INDEXES
 from data.data_model import Commit
+from data.embedding_storage import apply_vector_storage, convert_vector_storage
+from data.file_exclusions import build_file_exclusion_filter
 from data.schema import (
+    REPO_SYNC_GENERATION,
     FileChangeStatus,
     SQLBranch,
     SQLCommit,
@@ -24,16 +36,27 @@ from data.schema import (
     SQLEmbeddingProfile,
     SQLFileChange,
     SQLFileSnapshot,
+    SQLIngestJob,
     SQLRepo,
     SQLReviewSession,
     SQLUser,
     commits_branches,
 )
+from services.ingest_events import IngestEventBroker, IngestEventSubscription
+from services.ingest_progress import ThrottledProgressReporter
+from services.ingest_scheduler import IngestJobScheduler
 import infrastructure.db as db
 from utils.logger import logger
 
 SyncMode = Literal["noop", "incremental", "full_rebuild"]
-IngestJobStatus = Literal["queued", "running", "completed", "failed", "cancelled"]
+IngestJobStatus = Literal[
+    "queued",
+    "running",
+    "completed",
+    "failed",
+    "cancelled",
+    "paused",
+]
 IngestPhase = Literal[
     "planning",
     "loading_commits",
@@ -42,6 +65,8 @@ IngestPhase = Literal[
     "writing_db",
     "completed",
     "failed",
+    "cancelled",
+    "paused",
 ]
 
 PLANNING_WEIGHT = 5.0
@@ -49,7 +74,41 @@ COMMIT_LOAD_WEIGHT = 10.0
 AST_WEIGHT = 15.0
 EMBEDDING_WEIGHT = 55.0
 DB_WRITE_WEIGHT = 15.0
+WINDOWED_STAGE_START = PLANNING_WEIGHT + COMMIT_LOAD_WEIGHT
+WINDOWED_STAGE_WEIGHT = AST_WEIGHT + EMBEDDING_WEIGHT + DB_WRITE_WEIGHT
+WINDOWED_PHASES = {"extracting_ast", "embedding", "writing_db"}
 TERMINAL_JOB_STATUSES = {"completed", "failed", "cancelled"}
+STOPPED_JOB_STATUSES = TERMINAL_JOB_STATUSES | {"paused"}
+RESUMABLE_JOB_STATUSES = ("queued", "running")
+
+
+class IngestJobInterrupted(Exception):
+    def __init__(self, status: IngestJobStatus):
+        super().__init__(f"Ingest job {status}")
+        self.status = status
+
+
+class IngestJobControl:
+    """Stop token shared between a job worker and the cancel/pause endpoints."""
+
+    def __init__(self) -> None:
+        self._stop_requested = Event()
+        self.stop_status: IngestJobStatus | None = None
+        # Both guarded by IngestService._jobs_lock. A resume that arrives
+        # while the stopped worker is still running is deferred to its exit.
+        self.worker_active = False
+        self.resume_requested = False
+
+    def request_stop(self, status: IngestJobStatus) -> None:
+        self.stop_status = status
+        self._stop_requested.set()
+
+    def is_stop_requested(self) -> bool:
+        return self._stop_requested.is_set()
+
+    def raise_if_stopped(self) -> None:
+        if self._stop_requested.is_set():
+            raise IngestJobInterrupted(self.stop_status or "cancelled")
 
 
 @dataclass(frozen=True)
@@ -117,6 +176,8 @@ class IngestMetrics:
     rate_limit_sleep_seconds: float = 0.0
     semantic_batches: int = 0
     ast_batches: int = 0
+    skipped_file_changes: int = 0
+    skipped_by_reason: dict[str, int] = field(default_factory=dict)
 
     def as_payload(self) -> dict[str, object]:
         return {
@@ -143,6 +204,8 @@ class IngestMetrics:
             "rate_limit_sleep_seconds": round(self.rate_limit_sleep_seconds, 6),
             "semantic_batches": self.semantic_batches,
             "ast_batches": self.ast_batches,
+            "skipped_file_changes": self.skipped_file_changes,
+            "skipped_by_reason": dict(self.skipped_by_reason),
         }
 
 
@@ -187,6 +250,25 @@ class IngestProgressSnapshot:
             "updated_at": self.updated_at,
         }
 
+    def as_record(self) -> dict[str, object]:
+        return {
+            **self.as_payload(),
+            "percent": self.percent,
+            "stage_percent": self.stage_percent,
+            "started_at": self.started_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "IngestProgressSnapshot":
+        return cls(
+            **{
+                **record,
+                "started_at": datetime.fromisoformat(record["started_at"]),
+                "updated_at": datetime.fromisoformat(record["updated_at"]),
+            }
+        )
+
 
 @dataclass
 class IngestJobSnapshot:
@@ -199,6 +281,7 @@ class IngestJobSnapshot:
     started_at: datetime
     updated_at: datetime
     completed_at: datetime | None
+    checkpoint: dict[str, object] | None = None
 
     def as_payload(self) -> dict[str, object]:
         return {
@@ -211,6 +294,7 @@ class IngestJobSnapshot:
             "started_at": self.started_at,
             "updated_at": self.updated_at,
             "completed_at": self.completed_at,
+            "checkpoint": self.checkpoint,
         }
 
 
@@ -220,33 +304,162 @@ class IngestService:
     _jobs_lock = Lock()
     _jobs_by_id: dict[str, IngestJobSnapshot] = {}
     _active_job_ids_by_repo: dict[str, str] = {}
+    _job_controls_by_id: dict[str, IngestJobControl] = {}
+    _job_requests_by_id: dict[str, tuple[IngestRequest, str | int]] = {}
+    _scheduler_lock = Lock()
+    _scheduler: IngestJobScheduler | None = None
+    _job_events: IngestEventBroker[IngestJobSnapshot] = IngestEventBroker()
 
     def __init__(
         self,
         session: Session,
         embedder: EmbeddingEngine | None,
         flush_size: int = 100,
+        checkpoint_window_size: int = 250,
+        skip_policy: IngestSkipPolicy = DEFAULT_INGEST_SKIP_POLICY,
     ):
         self.session = session
         self.embedder = embedder
         self.ast_extractor = ASTSummaryExtractor()
+        self.skip_policy = skip_policy
         self.flush_size = max(1, flush_size)
+        self.checkpoint_window_size = max(1, checkpoint_window_size)
+        self._progress_window = (0, 1)
+        self._job_control: IngestJobControl | None = None
+        # Commits whose embeddings already reached the vector segments.
+        self._vector_published_shas: set[str] = set()
 
     @classmethod
     def get_progress(cls, progress_id: str) -> IngestProgressSnapshot | None:
         with cls._progress_lock:
-            return cls._progress_by_id.get(progress_id)
+            progress = cls._progress_by_id.get(progress_id)
+        if progress is not None:
+            return progress
+        job = cls._load_persisted_job(progress_id)
+        return job.progress if job is not None else None
 
     @classmethod
     def get_job(cls, job_id: str) -> IngestJobSnapshot | None:
         with cls._jobs_lock:
-            return cls._jobs_by_id.get(job_id)
+            job = cls._jobs_by_id.get(job_id)
+        if job is not None:
+            return job
+        return cls._load_persisted_job(job_id)
+
+    @classmethod
+    def subscribe_job(cls, job_id: str) -> IngestEventSubscription[IngestJobSnapshot]:
+        return cls._job_events.subscribe(job_id)
+
+    @classmethod
+    def configure_scheduler(cls, max_workers: int) -> IngestJobScheduler:
+        with cls._scheduler_lock:
+            cls._scheduler = IngestJobScheduler(
+                max_workers=max_workers,
+                preempt=cls._preempt_job,
+            )
+            return cls._scheduler
+
+    @classmethod
+    def _get_scheduler(cls) -> IngestJobScheduler:
+        with cls._scheduler_lock:
+            if cls._scheduler is None:
+                cls._scheduler = IngestJobScheduler(preempt=cls._preempt_job)
+            return cls._scheduler
+
+    @classmethod
+    def _preempt_job(cls, job_id: str) -> bool:
+        with cls._jobs_lock:
+            control = cls._job_controls_by_id.get(job_id)
+        if control is None or control.is_stop_requested():
+            return False
+        # "queued" tells the worker to yield and resubmit itself; the job
+        # resumes from its last checkpoint once a worker frees up.
+        control.request_stop("queued")
+        return True
+
+    @classmethod
+    def _job_snapshot_from_row(cls, row: SQLIngestJob) -> IngestJobSnapshot:
+        progress = (
+            IngestProgressSnapshot.from_record(row.progress)
+            if row.progress
+            else cls._create_queued_progress(
+                job_id=row.id,
+                repo_path=row.repo_path,
+                started_at=row.started_at,
+            )
+        )
+        return IngestJobSnapshot(
+            job_id=row.id,
+            repo_path=row.repo_path,
+            status=row.status,
+            result_repo_path=row.result_repo_path,
+            error=row.error,
+            progress=progress,
+            started_at=row.started_at,
+            updated_at=row.updated_at,
+            completed_at=row.completed_at,
+            checkpoint=row.checkpoint,
+        )
+
+    @classmethod
+    def _load_persisted_job(cls, job_id: str) -> IngestJobSnapshot | None:
+        session_factory = db.SessionLocal
+        if session_factory is None:
+            return None
+
+        try:
+            with session_factory() as session:
+                row = session.get(SQLIngestJob, job_id)
+                return cls._job_snapshot_from_row(row) if row is not None else None
+        except Exception:
+            logger.exception("Failed to load persisted ingest job %s", job_id)
+            return None
+
+    @classmethod
+    def _persist_job(
+        cls,
+        job: IngestJobSnapshot,
+        *,
+        request: IngestRequest | None = None,
+        user_id: str | int | None = None,
+    ) -> None:
+        session_factory = db.SessionLocal
+        if session_factory is None:
+            return
+
+        try:
+            with session_factory() as session:
+                row = session.get(SQLIngestJob, job.job_id)
+                if row is None:
+                    if request is None or user_id is None:
+                        return
+                    row = SQLIngestJob(
+                        id=job.job_id,
+                        repo_path=job.repo_path,
+                        user_id=int(user_id),
+                        request_payload=request.model_dump(),
+                        started_at=job.started_at,
+                    )
+                    session.add(row)
+                row.status = job.status
+                row.result_repo_path = job.result_repo_path
+                row.error = job.error
+                row.progress = job.progress.as_record()
+                row.checkpoint = job.checkpoint
+                row.updated_at = job.updated_at
+                row.completed_at = job.completed_at
+                session.commit()
+        except Exception:
+            logger.exception("Failed to persist ingest job %s", job.job_id)
 
     @classmethod
     def reset_runtime_state(cls) -> None:
         with cls._jobs_lock:
             cls._jobs_by_id.clear()
             cls._active_job_ids_by_repo.clear()
+            cls._job_controls_by_id.clear()
+            cls._job_requests_by_id.clear()
+        cls._job_events.clear()
         with cls._progress_lock:
             cls._progress_by_id.clear()
 
@@ -260,6 +473,7 @@ class IngestService:
         error: str | None = None,
         progress: IngestProgressSnapshot | None = None,
         completed_at: datetime | None = None,
+        checkpoint: dict[str, object] | None = None,
     ) -> IngestJobSnapshot | None:
         with cls._jobs_lock:
             job = cls._jobs_by_id.get(job_id)
@@ -268,29 +482,35 @@ class IngestService:
 
             now = datetime.utcnow()
             next_status = status or job.status
-            if status == "completed":
-                cls._active_job_ids_by_repo.pop(job.repo_path, None)
-            elif status in {"failed", "cancelled"}:
+            if (
+                status in STOPPED_JOB_STATUSES
+                and cls._active_job_ids_by_repo.get(job.repo_path) == job_id
+            ):
                 cls._active_job_ids_by_repo.pop(job.repo_path, None)
 
-            updated_job = IngestJobSnapshot(
-                job_id=job.job_id,
-                repo_path=job.repo_path,
+            updated_job = replace(
+                job,
                 status=next_status,
                 result_repo_path=(
                     result_repo_path if result_repo_path is not None else job.result_repo_path
                 ),
                 error=error if error is not None else job.error,
                 progress=progress or job.progress,
-                started_at=job.started_at,
                 updated_at=now,
                 completed_at=completed_at if completed_at is not None else job.completed_at,
+                checkpoint=checkpoint if checkpoint is not None else job.checkpoint,
             )
             cls._jobs_by_id[job_id] = updated_job
-            return updated_job
 
+        cls._job_events.publish(job_id, updated_job)
+        # Progress ticks stay in memory; only transitions and checkpoints are
+        # durable so a restart can tell which jobs to resume.
+        if status is not None or checkpoint is not None:
+            cls._persist_job(updated_job)
+        return updated_job
+
+    @staticmethod
     def _create_queued_progress(
-        self,
         *,
         job_id: str,
         repo_path: str,
@@ -321,30 +541,40 @@ class IngestService:
 
         with self._jobs_lock:
             existing_job_id = self._active_job_ids_by_repo.get(normalized_repo_path)
-            if existing_job_id is not None:
-                existing_job = self._jobs_by_id.get(existing_job_id)
-                if existing_job is not None and existing_job.status not in TERMINAL_JOB_STATUSES:
-                    return existing_job
-
-            job_id = str(uuid4())
-            now = datetime.utcnow()
-            queued_progress = self._create_queued_progress(
-                job_id=job_id,
-                repo_path=normalized_repo_path,
-                started_at=now,
-            )
-            self._jobs_by_id[job_id] = IngestJobSnapshot(
-                job_id=job_id,
-                repo_path=normalized_repo_path,
-                status="queued",
-                result_repo_path=None,
-                error=None,
-                progress=queued_progress,
-                started_at=now,
-                updated_at=now,
-                completed_at=None,
+            existing_job = (
+                self._jobs_by_id.get(existing_job_id)
+                if existing_job_id is not None
+                else None
             )
-            self._active_job_ids_by_repo[normalized_repo_path] = job_id
+            if existing_job is not None and existing_job.status in STOPPED_JOB_STATUSES:
+                existing_job = None
+            if existing_job is None:
+                job_id = str(uuid4())
+                now = datetime.utcnow()
+                queued_progress = self._create_queued_progress(
+                    job_id=job_id,
+                    repo_path=normalized_repo_path,
+                    started_at=now,
+                )
+                queued_job = IngestJobSnapshot(
+                    job_id=job_id,
+                    repo_path=normalized_repo_path,
+                    status="queued",
+                    result_repo_path=None,
+                    error=None,
+                    progress=queued_progress,
+                    started_at=now,
+                    updated_at=now,
+                    completed_at=None,
+                )
+                self._jobs_by_id[job_id] = queued_job
+                self._active_job_ids_by_repo[normalized_repo_path] = job_id
+
+        if existing_job is not None:
+            if request.priority == "interactive":
+                # Outside _jobs_lock: promoting may preempt a job, which takes it.
+                self._get_scheduler().promote(existing_job.job_id)
+            return existing_job
 
         with self._progress_lock:
             self._progress_by_id[job_id] = queued_progress
@@ -355,6 +585,8 @@ class IngestService:
                 "progress_id": job_id,
             }
         )
+        self._register_job_worker(job_id, worker_request, user_id)
+        self._persist_job(queued_job, request=worker_request, user_id=user_id)
         try:
             self._spawn_job_worker(job_id, worker_request, user_id)
         except Exception as error:
@@ -370,25 +602,242 @@ class IngestService:
             raise RuntimeError("Failed to create ingest job")
         return job
 
+    def resume_interrupted_jobs(self) -> list[IngestJobSnapshot]:
+        rows = (
+            self.session.query(SQLIngestJob)
+            .filter(SQLIngestJob.status.in_(RESUMABLE_JOB_STATUSES))
+            .order_by(SQLIngestJob.started_at.asc())
+            .all()
+        )
+
+        resumed_jobs: list[IngestJobSnapshot] = []
+        for row in rows:
+            job = self._requeue_job(
+                self._job_snapshot_from_row(row),
+                IngestRequest.model_validate(row.request_payload),
+                row.user_id,
+            )
+            if job.job_id != row.id:
+                row.status = "cancelled"
+                row.error = "Superseded by another ingest job for this repository"
+                row.completed_at = datetime.utcnow()
+                self.session.commit()
+                continue
+            if job.status == "queued":
+                logger.info(
+                    "Resuming interrupted ingest job %s for %s",
+                    job.job_id,
+                    job.repo_path,
+                )
+                resumed_jobs.append(job)
+        return resumed_jobs
+
+    def convert_configured_vector_storage(self) -> None:
+        """Move stored embeddings into the configured vector storage.
+
+        Runs at startup, before jobs resume. Each repo is rewritten in its own
+        transaction that also bumps its sync generation, and its cached index
+        and segments are dropped. The profile records the new storage only
+        once every repo is converted, so an interrupted run resumes.
+        """
+        if self.embedder is None or not self.embedder.profile_fingerprint:
+            return
+        storage = self.embedder.vector_storage
+        profile = (
+            self.session.query(SQLEmbeddingProfile)
+            .filter(
+                SQLEmbeddingProfile.fingerprint == self.embedder.profile_fingerprint
+            )
+            .first()
+        )
+        if profile is None or profile.vector_storage == storage:
+            return
+
+        logger.info(
+            "Converting embedding profile %s from %s to %s storage",
+            profile.id,
+            profile.vector_storage,
+            storage,
+        )
+        repo_paths = [
+            repo.path
+            for repo in self.session.query(SQLRepo)
+            .filter(SQLRepo.embedding_profile_id == profile.id)
+            .all()
+        ]
+        for repo_path in repo_paths:
+            convert_vector_storage(
+                self.session, profile.id, storage, repo_path=repo_path
+            )
+            self.session.execute(
+                update(SQLRepo)
+                .where(SQLRepo.path == repo_path)
+                .values(sync_generation=REPO_SYNC_GENERATION.next_value())
+            )
+            self.session.commit()
+            DEFAULT_VECTOR_INDEXES.drop(repo_path)
+
+        profile.vector_storage = storage
+        profile.updated_at = datetime.utcnow()
+        self.session.commit()
+
+    def cancel_job(self, job_id: str) -> IngestJobSnapshot:
+        return self._stop_job(job_id, "cancelled")
+
+    def pause_job(self, job_id: str) -> IngestJobSnapshot:
+        return self._stop_job(job_id, "paused")
+
+    def resume_job(self, job_id: str) -> IngestJobSnapshot:
+        job = self.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Ingest job {job_id} not found")
+        if job.status != "paused":
+            return job
+
+        stored_request = self._job_requests_by_id.get(job_id)
+        if stored_request is None:
+            row = self.session.get(SQLIngestJob, job_id)
+            if row is None:
+                raise ValueError(f"Ingest job {job_id} cannot be resumed")
+            stored_request = (
+                IngestRequest.model_validate(row.request_payload),
+                row.user_id,
+            )
+        request, user_id = stored_request
+
+        with self._jobs_lock:
+            control = self._job_controls_by_id.get(job_id)
+            deferred = control is not None and control.worker_active
+            if deferred:
+                active_job_id = self._active_job_ids_by_repo.get(job.repo_path)
+                active_job = (
+                    self._jobs_by_id.get(active_job_id)
+                    if active_job_id not in (None, job_id)
+                    else None
+                )
+                if active_job is not None and active_job.status not in STOPPED_JOB_STATUSES:
+                    return active_job
+                control.resume_requested = True
+                self._active_job_ids_by_repo[job.repo_path] = job_id
+        if deferred:
+            # The paused worker has not reached its next checkpoint yet;
+            # it requeues the job itself once it exits.
+            return (
+                self._update_job(
+                    job_id,
+                    status="queued",
+                    progress=replace(job.progress, label="Resuming repository sync"),
+                )
+                or job
+            )
+        return self._requeue_job(job, request, user_id)
+
+    def _stop_job(self, job_id: str, status: IngestJobStatus) -> IngestJobSnapshot:
+        job = self.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Ingest job {job_id} not found")
+        if job.status in TERMINAL_JOB_STATUSES or job.status == status:
+            return job
+
+        with self._jobs_lock:
+            control = self._job_controls_by_id.get(job_id)
+            if control is not None:
+                control.resume_requested = False
+        if control is not None:
+            control.request_stop(status)
+
+        # The worker notices the token at its next window, batch or flush
+        # boundary; the repo slot is released now so a retry can start.
+        completed_at = datetime.utcnow() if status == "cancelled" else None
+        updated_job = self._update_job(job_id, status=status, completed_at=completed_at)
+        if updated_job is None:
+            updated_job = replace(
+                job,
+                status=status,
+                updated_at=datetime.utcnow(),
+                completed_at=completed_at,
+            )
+            self._persist_job(updated_job)
+        return updated_job
+
+    def _requeue_job(
+        self,
+        snapshot: IngestJobSnapshot,
+        request: IngestRequest,
+        user_id: str | int,
+    ) -> IngestJobSnapshot:
+        job = replace(
+            snapshot,
+            status="queued",
+            error=None,
+            completed_at=None,
+            updated_at=datetime.utcnow(),
+            progress=replace(snapshot.progress, label="Resuming repository sync"),
+        )
+        with self._jobs_lock:
+            active_job_id = self._active_job_ids_by_repo.get(job.repo_path)
+            if active_job_id is not None and active_job_id != job.job_id:
+                active_job = self._jobs_by_id.get(active_job_id)
+                if active_job is not None and active_job.status not in STOPPED_JOB_STATUSES:
+                    return active_job
+            self._jobs_by_id[job.job_id] = job
+            self._active_job_ids_by_repo[job.repo_path] = job.job_id
+
+        with self._progress_lock:
+            self._progress_by_id[job.job_id] = job.progress
+
+        self._register_job_worker(job.job_id, request, user_id)
+        self._persist_job(job)
+        try:
+            self._spawn_job_worker(job.job_id, request, user_id)
+        except Exception as error:
+            logger.exception("Failed to resume ingest job %s", job.job_id)
+            failed_job = self._update_job(
+                job.job_id,
+                status="failed",
+                error=str(error),
+                completed_at=datetime.utcnow(),
+            )
+            return failed_job or job
+        return self.get_job(job.job_id) or job
+
+    @classmethod
+    def _register_job_worker(
+        cls,
+        job_id: str,
+        request: IngestRequest,
+        user_id: str | int,
+    ) -> None:
+        with cls._jobs_lock:
+            cls._job_controls_by_id[job_id] = IngestJobControl()
+            cls._job_requests_by_id[job_id] = (request, user_id)
+
+    def _check_interrupt(self) -> None:
+        if self._job_control is not None:
+            self._job_control.raise_if_stopped()
+
     def _spawn_job_worker(
         self,
         job_id: str,
         request: IngestRequest,
         user_id: str | int,
     ) -> None:
-        thread = Thread(
-            target=self._run_job_worker,
-            args=(job_id, request, user_id),
-            name=f"git-odyssey-ingest-{job_id}",
-            daemon=True,
+        # The submission keeps the control it was spawned with, so a stale
+        # queue entry for a stopped run cannot pick up a resumed run's control.
+        with self._jobs_lock:
+            control = self._job_controls_by_id.get(job_id)
+        self._get_scheduler().submit(
+            job_id,
+            lambda: self._run_job_worker(job_id, request, user_id, control),
+            priority=request.priority,
         )
-        thread.start()
 
     def _run_job_worker(
         self,
         job_id: str,
         request: IngestRequest,
         user_id: str | int,
+        control: IngestJobControl | None = None,
     ) -> None:
         session_factory = db.SessionLocal
         if session_factory is None:
@@ -396,15 +845,27 @@ class IngestService:
             self._update_job(job_id, status="failed", error=error_message, completed_at=datetime.utcnow())
             raise RuntimeError(error_message)
 
+        with self._jobs_lock:
+            if control is None:
+                control = self._job_controls_by_id.get(job_id)
+            if control is not None:
+                if control.is_stop_requested():
+                    return
+                control.worker_active = True
+
         self._update_job(job_id, status="running")
 
+        paused = False
         try:
             with session_factory() as session:
                 worker_service = IngestService(
                     session=session,
                     embedder=self.embedder,
                     flush_size=self.flush_size,
+                    checkpoint_window_size=self.checkpoint_window_size,
+                    skip_policy=self.skip_policy,
                 )
+                worker_service._job_control = control
                 result_repo_path = worker_service._ingest_repo_sync(request, user_id)
             self._update_job(
                 job_id,
@@ -413,6 +874,13 @@ class IngestService:
                 error=None,
                 completed_at=datetime.utcnow(),
             )
+        except IngestJobInterrupted as interrupted:
+            logger.info("Background ingest job %s %s", job_id, interrupted.status)
+            paused = interrupted.status == "paused"
+            if interrupted.status == "queued":
+                self._register_job_worker(job_id, request, user_id)
+                self._update_job(job_id, status="queued")
+                self._spawn_job_worker(job_id, request, user_id)
         except Exception as error:
             logger.exception("Background ingest job %s failed", job_id)
             self._update_job(
@@ -421,20 +889,40 @@ class IngestService:
                 error=str(error),
                 completed_at=datetime.utcnow(),
             )
+        finally:
+            resume_requested = control is not None and self._release_job_worker(control)
+            if paused and resume_requested:
+                self._register_job_worker(job_id, request, user_id)
+                self._spawn_job_worker(job_id, request, user_id)
+
+    @classmethod
+    def _release_job_worker(cls, control: IngestJobControl) -> bool:
+        """Mark the worker as exited; True when a resume was deferred to it."""
+        with cls._jobs_lock:
+            control.worker_active = False
+            resume_requested = control.resume_requested
+            control.resume_requested = False
+        return resume_requested
 
     async def wait_for_job(
         self,
         job_id: str,
         *,
-        poll_interval_seconds: float = 0.05,
+        recheck_interval_seconds: float = 5.0,
     ) -> IngestJobSnapshot:
-        while True:
-            job = self.get_job(job_id)
-            if job is None:
-                raise ValueError(f"Ingest job {job_id} not found")
-            if job.status in TERMINAL_JOB_STATUSES:
-                return job
-            await asyncio.sleep(poll_interval_seconds)
+        with self.subscribe_job(job_id) as subscription:
+            while True:
+                job = self.get_job(job_id)
+                if job is None:
+                    raise ValueError(f"Ingest job {job_id} not found")
+                if job.status in STOPPED_JOB_STATUSES:
+                    return job
+                # Updates are pushed by _update_job; the timeout only covers
+                # jobs owned by another process that never publish here.
+                try:
+                    await subscription.next(timeout=recheck_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
 
     def _set_progress(
         self,
@@ -462,6 +950,18 @@ class IngestService:
 
         now = datetime.utcnow()
         bounded_stage_percent = min(max(stage_percent, 0.0), 1.0)
+        window_index, window_count = self._progress_window
+        if percent_override is None and window_count > 1 and phase in WINDOWED_PHASES:
+            # Checkpointed windows repeat the AST/embedding/write stages, so
+            # each window gets an equal slice of the combined stage range.
+            window_percent = (
+                stage_start_percent
+                + (stage_weight * bounded_stage_percent)
+                - WINDOWED_STAGE_START
+            )
+            percent_override = WINDOWED_STAGE_START + (
+                (window_index * WINDOWED_STAGE_WEIGHT) + window_percent
+            ) / window_count
         percent = (
             min(max(percent_override, 0.0), 100.0)
             if percent_override is not None
@@ -473,25 +973,26 @@ class IngestService:
 
         with self._progress_lock:
             existing = self._progress_by_id.get(progress_id)
-            snapshot = IngestProgressSnapshot(
-                job_id=progress_id,
-                progress_id=progress_id,
-                repo_path=repo_path,
-                phase=phase,
-                label=label,
-                percent=percent,
-                stage_percent=bounded_stage_percent,
-                completed_units=completed_units,
-                total_units=total_units,
-                commit_count=commit_count,
-                file_change_count=file_change_count,
-                hunk_count=hunk_count,
-                embedding_batches=embedding_batches,
-                inserted_commits=inserted_commits,
-                error=error,
-                started_at=existing.started_at if existing is not None else (started_at or now),
-                updated_at=now,
-            )
+        snapshot = IngestProgressSnapshot(
+            job_id=progress_id,
+            progress_id=progress_id,
+            repo_path=repo_path,
+            phase=phase,
+            label=label,
+            percent=percent,
+            stage_percent=bounded_stage_percent,
+            completed_units=completed_units,
+            total_units=total_units,
+            commit_count=commit_count,
+            file_change_count=file_change_count,
+            hunk_count=hunk_count,
+            embedding_batches=embedding_batches,
+            inserted_commits=inserted_commits,
+            error=error,
+            started_at=existing.started_at if existing is not None else (started_at or now),
+            updated_at=now,
+        )
+        with self._progress_lock:
             self._progress_by_id[progress_id] = snapshot
         self._update_job(progress_id, progress=snapshot)
 
@@ -507,18 +1008,40 @@ class IngestService:
     ) -> bool:
         normalized_repo_path = self.resolve_repo_path(repo_path)
         repo = self._get_repo_row(normalized_repo_path)
+        request = IngestRequest(
+            repo_path=normalized_repo_path,
+            max_commits=max_commits,
+            context_lines=context_lines,
+            force=False,
+        )
+        if self._branch_heads_match_index(repo, request, normalized_repo_path):
+            return False
+
         plan = self.plan_repo_sync(
-            IngestRequest(
-                repo_path=normalized_repo_path,
-                max_commits=max_commits,
-                context_lines=context_lines,
-                force=False,
-            ),
+            request,
             normalized_repo_path=normalized_repo_path,
             repo=repo,
         )
         return plan.mode != "noop"
 
+    def _branch_heads_match_index(
+        self,
+        repo: SQLRepo | None,
+        request: IngestRequest,
+        normalized_repo_path: str,
+    ) -> bool:
+        if repo is None or not repo.branch_heads_fingerprint:
+            return False
+        if self._get_full_rebuild_reason(repo, request) is not None:
+            return False
+        if repo.indexed_max_commits != request.max_commits:
+            return False
+
+        # Branch commit windows are a pure function of the branch heads and
+        # max_commits, so an unchanged fingerprint means planning would noop.
+        current_fingerprint = Repo.get_branch_heads_fingerprint(normalized_repo_path)
+        return current_fingerprint == repo.branch_heads_fingerprint
+
     def plan_repo_sync(
         self,
         request: IngestRequest,
@@ -773,6 +1296,7 @@ class IngestService:
                 base_url=self.embedder.base_url,
                 model_id=self.embedder.model,
                 observed_dimension=self.embedder.observed_dimension,
+                vector_storage=self.embedder.vector_storage,
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow(),
             )
@@ -828,8 +1352,35 @@ class IngestService:
 
         self._delete_repo_rows(normalized_repo_path)
         self.session.commit()
+        DEFAULT_VECTOR_INDEXES.drop(normalized_repo_path)
         return normalized_repo_path
 
+    def _refresh_vector_index(
+        self,
+        normalized_repo_path: str,
+        *,
+        mode: SyncMode,
+        commit_shas: Iterable[str],
+    ) -> None:
+        if mode == "full_rebuild" and not self._vector_published_shas:
+            # The old rows are gone; the append below backfills from scratch.
+            DEFAULT_VECTOR_INDEXES.drop(normalized_repo_path)
+        commit_shas = set(commit_shas) - self._vector_published_shas
+        self._vector_published_shas |= commit_shas
+        try:
+            DEFAULT_VECTOR_INDEXES.append_commits(
+                self.session,
+                normalized_repo_path,
+                commit_shas,
+                file_filter=build_file_exclusion_filter(),
+            )
+        except Exception:
+            logger.exception(
+                "Failed to append vector segments for %s; backfilling on next ingest",
+                normalized_repo_path,
+            )
+            DEFAULT_VECTOR_INDEXES.drop(normalized_repo_path)
+
     def _delete_branch_links(
         self,
         *,
@@ -904,7 +1455,6 @@ class IngestService:
     ) -> None:
         ast_started_at = perf_counter()
         total_file_changes = sum(len(commit.file_changes) for commit in commits.values())
-        processed_file_changes = 0
         self._set_progress(
             progress_id=progress_id,
             repo_path=repo_path,
@@ -916,31 +1466,58 @@ class IngestService:
             completed_units=0,
             total_units=total_file_changes,
         )
+
+        def publish_ast_progress(processed_file_changes: int) -> None:
+            self._set_progress(
+                progress_id=progress_id,
+                repo_path=repo_path,
+                phase="extracting_ast",
+                label="Extracting AST summaries",
+                stage_percent=(
+                    processed_file_changes / total_file_changes
+                    if total_file_changes
+                    else 1.0
+                ),
+                stage_start_percent=PLANNING_WEIGHT + COMMIT_LOAD_WEIGHT,
+                stage_weight=AST_WEIGHT,
+                completed_units=processed_file_changes,
+                total_units=total_file_changes,
+                commit_count=metrics.commit_count,
+                file_change_count=metrics.file_change_count,
+                hunk_count=metrics.hunk_count,
+            )
+
+        ast_progress = ThrottledProgressReporter(
+            publish_ast_progress,
+            total_units=total_file_changes,
+        )
+        file_changes = []
         for commit in commits.values():
             metrics.commit_count += 1
             metrics.file_change_count += len(commit.file_changes)
             for file_change in commit.file_changes:
+                if file_change.skip_reason is not None:
+                    metrics.skipped_file_changes += 1
+                    metrics.skipped_by_reason[file_change.skip_reason] = (
+                        metrics.skipped_by_reason.get(file_change.skip_reason, 0) + 1
+                    )
+                    continue
                 metrics.hunk_count += len(file_change.hunks)
-                self.ast_extractor.populate_file_change(file_change)
-                processed_file_changes += 1
-                self._set_progress(
-                    progress_id=progress_id,
-                    repo_path=repo_path,
-                    phase="extracting_ast",
-                    label="Extracting AST summaries",
-                    stage_percent=(
-                        processed_file_changes / total_file_changes
-                        if total_file_changes
-                        else 1.0
-                    ),
-                    stage_start_percent=PLANNING_WEIGHT + COMMIT_LOAD_WEIGHT,
-                    stage_weight=AST_WEIGHT,
-                    completed_units=processed_file_changes,
-                    total_units=total_file_changes,
-                    commit_count=metrics.commit_count,
-                    file_change_count=metrics.file_change_count,
-                    hunk_count=metrics.hunk_count,
-                )
+                file_changes.append(file_change)
+
+        def handle_file_change_extracted(_file_change) -> None:
+            self._check_interrupt()
+            ast_progress.advance()
+
+        self._check_interrupt()
+        try:
+            self.ast_extractor.populate_file_changes(
+                file_changes,
+                on_file_change=handle_file_change_extracted,
+            )
+        finally:
+            self.ast_extractor.release_parse_state()
+        ast_progress.flush()
         metrics.ast_extraction_seconds += perf_counter() - ast_started_at
 
         if self.embedder is None or not commits:
@@ -955,6 +1532,7 @@ class IngestService:
             total_batches: int,
             current_stats: EmbeddingExecutionStats,
         ) -> None:
+            self._check_interrupt()
             self._set_progress(
                 progress_id=progress_id,
                 repo_path=repo_path,
@@ -1150,6 +1728,15 @@ class IngestService:
             sql_file_changes.append(sql_file_change)
 
         sql_commit.file_changes = sql_file_changes
+        if self.embedder is not None:
+            apply_vector_storage(
+                [
+                    sql_commit,
+                    *sql_file_changes,
+                    *(hunk for fc in sql_file_changes for hunk in fc.hunks),
+                ],
+                self.embedder.vector_storage,
+            )
         return sql_commit, snapshot_lookup
 
     def _apply_sync_metadata(
@@ -1159,6 +1746,7 @@ class IngestService:
         request: IngestRequest,
         result: RepoSyncResult,
         metrics: IngestMetrics,
+        branch_states: dict[str, BranchState],
     ) -> None:
         repo.embedding_profile = self._ensure_active_embedding_profile()
         repo.reindex_required = False
@@ -1166,6 +1754,13 @@ class IngestService:
         repo.indexed_context_lines = request.context_lines
         repo.last_synced_at = datetime.utcnow()
         repo.last_sync_status = result.mode
+        repo.sync_generation = REPO_SYNC_GENERATION.next_value()
+        repo.branch_heads_fingerprint = compute_branch_heads_fingerprint(
+            {
+                branch_name: branch_state.head_commit_sha
+                for branch_name, branch_state in branch_states.items()
+            }
+        )
         repo.last_sync_summary = {
             **result.as_payload(),
             "metrics": metrics.as_payload(),
@@ -1185,6 +1780,7 @@ class IngestService:
         inserted_snapshots: dict[str, dict[str, SQLFileSnapshot]] = {}
         cached_snapshots: dict[str, dict[str, SQLFileSnapshot]] = {}
         missing_commit_models: dict[str, Commit] = {}
+        self._vector_published_shas = set()
 
         load_started_at = perf_counter()
         if plan.missing_commit_shas:
@@ -1200,31 +1796,43 @@ class IngestService:
                 completed_units=0,
                 total_units=total_missing_commits,
             )
-            _, missing_commit_models = Repo.load_commits(
-                normalized_repo_path,
-                sorted(plan.missing_commit_shas),
-                context_lines=request.context_lines,
-                progress_callback=lambda loaded_count, total_count: self._set_progress(
+
+            def publish_load_progress(loaded_count: int) -> None:
+                self._set_progress(
                     progress_id=request.progress_id,
                     repo_path=normalized_repo_path,
                     phase="loading_commits",
                     label="Loading commits from Git",
-                    stage_percent=(loaded_count / total_count) if total_count else 1.0,
+                    stage_percent=(
+                        loaded_count / total_missing_commits
+                        if total_missing_commits
+                        else 1.0
+                    ),
                     stage_start_percent=PLANNING_WEIGHT,
                     stage_weight=COMMIT_LOAD_WEIGHT,
                     completed_units=loaded_count,
-                    total_units=total_count,
-                ),
+                    total_units=total_missing_commits,
+                )
+
+            load_progress = ThrottledProgressReporter(
+                publish_load_progress,
+                total_units=total_missing_commits,
+            )
+
+            def handle_commit_loaded(loaded_count: int, total_count: int) -> None:
+                self._check_interrupt()
+                load_progress.update(loaded_count)
+
+            _, missing_commit_models = Repo.load_commits(
+                normalized_repo_path,
+                sorted(plan.missing_commit_shas),
+                context_lines=request.context_lines,
+                progress_callback=handle_commit_loaded,
+                skip_policy=self.skip_policy,
             )
         metrics.commit_load_seconds += perf_counter() - load_started_at
 
         if missing_commit_models:
-            self._populate_commit_features(
-                missing_commit_models,
-                metrics,
-                progress_id=request.progress_id,
-                repo_path=normalized_repo_path,
-            )
             parent_shas = {
                 commit.parents[0]
                 for commit in missing_commit_models.values()
@@ -1235,85 +1843,51 @@ class IngestService:
                 inserted_snapshots=inserted_snapshots,
                 cached_snapshots=cached_snapshots,
             )
+            self._mark_sync_in_progress(repo_row, request=request)
 
-            db_started_at = perf_counter()
-            pending_since_flush = 0
-            persisted_commits = 0
-            total_commits_to_insert = len(missing_commit_models)
-            self._set_progress(
-                progress_id=request.progress_id,
-                repo_path=normalized_repo_path,
-                phase="writing_db",
-                label="Writing repository data",
-                stage_percent=0.0 if total_commits_to_insert else 1.0,
-                stage_start_percent=PLANNING_WEIGHT
-                + COMMIT_LOAD_WEIGHT
-                + AST_WEIGHT
-                + EMBEDDING_WEIGHT,
-                stage_weight=DB_WRITE_WEIGHT,
-                completed_units=0,
-                total_units=total_commits_to_insert,
-                inserted_commits=0,
-            )
-            for commit_sha in self._order_missing_commits(missing_commit_models):
-                commit = missing_commit_models[commit_sha]
-                first_parent = commit.parents[0] if commit.parents else None
-                parent_snapshot_lookup = self._resolve_parent_snapshot_lookup(
-                    first_parent,
-                    inserted_snapshots=inserted_snapshots,
-                    cached_snapshots=cached_snapshots,
+            ordered_commit_shas = self._order_missing_commits(missing_commit_models)
+            windows = [
+                ordered_commit_shas[offset : offset + self.checkpoint_window_size]
+                for offset in range(
+                    0, len(ordered_commit_shas), self.checkpoint_window_size
                 )
-                sql_commit, snapshot_lookup = self._build_sql_commit(
-                    commit,
-                    parent_snapshot_lookup=parent_snapshot_lookup,
-                    repo_path=normalized_repo_path,
-                )
-                inserted_snapshots[commit.sha] = snapshot_lookup
-                self.session.add(sql_commit)
-                pending_since_flush += 1
-                if pending_since_flush >= self.flush_size:
-                    self.session.flush()
-                    persisted_commits += pending_since_flush
-                    self._set_progress(
+            ]
+            persisted_commits = 0
+            try:
+                for window_index, window_commit_shas in enumerate(windows):
+                    self._progress_window = (window_index, len(windows))
+                    window_commit_models = {
+                        commit_sha: missing_commit_models[commit_sha]
+                        for commit_sha in window_commit_shas
+                    }
+                    self._populate_commit_features(
+                        window_commit_models,
+                        metrics,
                         progress_id=request.progress_id,
                         repo_path=normalized_repo_path,
-                        phase="writing_db",
-                        label="Writing repository data",
-                        stage_percent=(
-                            persisted_commits / total_commits_to_insert
-                            if total_commits_to_insert
-                            else 1.0
-                        ),
-                        stage_start_percent=PLANNING_WEIGHT
-                        + COMMIT_LOAD_WEIGHT
-                        + AST_WEIGHT
-                        + EMBEDDING_WEIGHT,
-                        stage_weight=DB_WRITE_WEIGHT,
-                        completed_units=persisted_commits,
-                        total_units=total_commits_to_insert,
-                        inserted_commits=persisted_commits,
                     )
-                    pending_since_flush = 0
-
-            self.session.flush()
-            if pending_since_flush:
-                persisted_commits += pending_since_flush
-            self._set_progress(
-                progress_id=request.progress_id,
-                repo_path=normalized_repo_path,
-                phase="writing_db",
-                label="Writing repository data",
-                stage_percent=1.0,
-                stage_start_percent=PLANNING_WEIGHT
-                + COMMIT_LOAD_WEIGHT
-                + AST_WEIGHT
-                + EMBEDDING_WEIGHT,
-                stage_weight=DB_WRITE_WEIGHT,
-                completed_units=persisted_commits,
-                total_units=total_commits_to_insert,
-                inserted_commits=persisted_commits,
-            )
-            metrics.db_insert_seconds += perf_counter() - db_started_at
+                    persisted_commits = self._write_commit_window(
+                        window_commit_shas,
+                        window_commit_models,
+                        request=request,
+                        normalized_repo_path=normalized_repo_path,
+                        inserted_snapshots=inserted_snapshots,
+                        cached_snapshots=cached_snapshots,
+                        persisted_commits=persisted_commits,
+                        metrics=metrics,
+                    )
+                    self._checkpoint_window(
+                        request=request,
+                        window_index=window_index,
+                        window_count=len(windows),
+                        persisted_commits=persisted_commits,
+                        total_commits=len(ordered_commit_shas),
+                        metrics=metrics,
+                        plan=plan,
+                        window_commit_shas=window_commit_shas,
+                    )
+            finally:
+                self._progress_window = (0, 1)
 
         commit_row_map: dict[str, SQLCommit] = {}
         if plan.target_commit_shas:
@@ -1387,9 +1961,170 @@ class IngestService:
             removed_commits=len(plan.removed_commit_shas),
             reason=reason,
         )
-        self._apply_sync_metadata(repo_row, request=request, result=result, metrics=metrics)
+        self._apply_sync_metadata(
+            repo_row,
+            request=request,
+            result=result,
+            metrics=metrics,
+            branch_states=plan.current_branch_states,
+        )
         return result
 
+    def _mark_sync_in_progress(self, repo_row: SQLRepo, *, request: IngestRequest) -> None:
+        # Checkpointed windows are committed before branches are linked, so the
+        # repo row must already describe this sync for a resumed job to plan an
+        # incremental pass over the remaining commits instead of a rebuild.
+        repo_row.embedding_profile = self._ensure_active_embedding_profile()
+        repo_row.reindex_required = False
+        repo_row.indexed_max_commits = request.max_commits
+        repo_row.indexed_context_lines = request.context_lines
+        repo_row.branch_heads_fingerprint = None
+
+    def _write_commit_window(
+        self,
+        window_commit_shas: list[str],
+        window_commit_models: dict[str, Commit],
+        *,
+        request: IngestRequest,
+        normalized_repo_path: str,
+        inserted_snapshots: dict[str, dict[str, SQLFileSnapshot]],
+        cached_snapshots: dict[str, dict[str, SQLFileSnapshot]],
+        persisted_commits: int,
+        metrics: IngestMetrics,
+    ) -> int:
+        db_started_at = perf_counter()
+        pending_since_flush = 0
+        window_persisted = 0
+        total_window_commits = len(window_commit_shas)
+        self._set_progress(
+            progress_id=request.progress_id,
+            repo_path=normalized_repo_path,
+            phase="writing_db",
+            label="Writing repository data",
+            stage_percent=0.0 if total_window_commits else 1.0,
+            stage_start_percent=PLANNING_WEIGHT
+            + COMMIT_LOAD_WEIGHT
+            + AST_WEIGHT
+            + EMBEDDING_WEIGHT,
+            stage_weight=DB_WRITE_WEIGHT,
+            completed_units=0,
+            total_units=total_window_commits,
+            inserted_commits=persisted_commits,
+        )
+        for commit_sha in window_commit_shas:
+            commit = window_commit_models[commit_sha]
+            first_parent = commit.parents[0] if commit.parents else None
+            parent_snapshot_lookup = self._resolve_parent_snapshot_lookup(
+                first_parent,
+                inserted_snapshots=inserted_snapshots,
+                cached_snapshots=cached_snapshots,
+            )
+            sql_commit, snapshot_lookup = self._build_sql_commit(
+                commit,
+                parent_snapshot_lookup=parent_snapshot_lookup,
+                repo_path=normalized_repo_path,
+            )
+            inserted_snapshots[commit.sha] = snapshot_lookup
+            self.session.add(sql_commit)
+            pending_since_flush += 1
+            if pending_since_flush >= self.flush_size:
+                self._check_interrupt()
+                self.session.flush()
+                window_persisted += pending_since_flush
+                pending_since_flush = 0
+                self._set_progress(
+                    progress_id=request.progress_id,
+                    repo_path=normalized_repo_path,
+                    phase="writing_db",
+                    label="Writing repository data",
+                    stage_percent=(
+                        window_persisted / total_window_commits
+                        if total_window_commits
+                        else 1.0
+                    ),
+                    stage_start_percent=PLANNING_WEIGHT
+                    + COMMIT_LOAD_WEIGHT
+                    + AST_WEIGHT
+                    + EMBEDDING_WEIGHT,
+                    stage_weight=DB_WRITE_WEIGHT,
+                    completed_units=window_persisted,
+                    total_units=total_window_commits,
+                    inserted_commits=persisted_commits + window_persisted,
+                )
+
+        self.session.flush()
+        window_persisted += pending_since_flush
+        self._set_progress(
+            progress_id=request.progress_id,
+            repo_path=normalized_repo_path,
+            phase="writing_db",
+            label="Writing repository data",
+            stage_percent=1.0,
+            stage_start_percent=PLANNING_WEIGHT
+            + COMMIT_LOAD_WEIGHT
+            + AST_WEIGHT
+            + EMBEDDING_WEIGHT,
+            stage_weight=DB_WRITE_WEIGHT,
+            completed_units=window_persisted,
+            total_units=total_window_commits,
+            inserted_commits=persisted_commits + window_persisted,
+        )
+        metrics.db_insert_seconds += perf_counter() - db_started_at
+        return persisted_commits + window_persisted
+
+    def _checkpoint_window(
+        self,
+        *,
+        request: IngestRequest,
+        window_index: int,
+        window_count: int,
+        persisted_commits: int,
+        total_commits: int,
+        metrics: IngestMetrics,
+        plan: RepoSyncPlan | None = None,
+        window_commit_shas: Sequence[str] = (),
+    ) -> None:
+        if window_index + 1 >= window_count:
+            # The final window commits together with branch links and metadata.
+            self._check_interrupt()
+            return
+
+        db_started_at = perf_counter()
+        if plan is not None:
+            # Committed windows are visible to searches, so cached results
+            # keyed on the previous generation must not outlive them.
+            self.session.execute(
+                update(SQLRepo)
+                .where(SQLRepo.path == plan.normalized_repo_path)
+                .values(sync_generation=REPO_SYNC_GENERATION.next_value())
+            )
+        self.session.commit()
+        metrics.db_insert_seconds += perf_counter() - db_started_at
+        if plan is not None:
+            # Committed windows survive a pause or failure, and a resumed run
+            # replans without them, so their vectors are published now.
+            self._refresh_vector_index(
+                plan.normalized_repo_path,
+                mode=plan.mode,
+                commit_shas=window_commit_shas,
+            )
+        if request.progress_id:
+            self._update_job(
+                request.progress_id,
+                checkpoint={
+                    "windows_completed": window_index + 1,
+                    "window_count": window_count,
+                    "commits_written": persisted_commits,
+                    "commits_total": total_commits,
+                    "embeddings_stored": (
+                        metrics.semantic_work_items + metrics.ast_work_items
+                    ),
+                    "updated_at": datetime.utcnow().isoformat(),
+                },
+            )
+        # A stop that arrives at the boundary keeps the window just computed.
+        self._check_interrupt()
+
     def _sync_incremental(
         self,
         *,
@@ -1424,6 +2159,7 @@ class IngestService:
             normalized_repo_path,
             plan.reason or "unknown_reason",
         )
+        removed_commits = len(plan.repo.commits) if plan.repo is not None else 0
         db_started_at = perf_counter()
         if plan.repo is not None:
             self._delete_repo_rows(normalized_repo_path)
@@ -1456,7 +2192,7 @@ class IngestService:
             changed_branches=result.changed_branches,
             inserted_commits=result.inserted_commits,
             reused_commits=0,
-            removed_commits=len(plan.repo.commits) if plan.repo is not None else 0,
+            removed_commits=removed_commits,
             reason=plan.reason,
         )
 
@@ -1467,6 +2203,8 @@ class IngestService:
             raise RuntimeError(completed_job.error or "Repository sync failed")
         if completed_job.status == "cancelled":
             raise RuntimeError("Repository sync was cancelled")
+        if completed_job.status == "paused":
+            raise RuntimeError("Repository sync was paused")
         return completed_job.result_repo_path or completed_job.repo_path
 
     def _ingest_repo_sync(self, request: IngestRequest, user_id: str | int) -> str:
@@ -1487,6 +2225,7 @@ class IngestService:
         metrics.repo_scan_seconds += perf_counter() - plan_started_at
 
         try:
+            self._check_interrupt()
             if plan.mode == "noop":
                 if repo is not None:
                     result = RepoSyncResult(
@@ -1498,7 +2237,11 @@ class IngestService:
                     )
                     metrics.total_seconds = perf_counter() - total_started_at
                     self._apply_sync_metadata(
-                        repo, request=request, result=result, metrics=metrics
+                        repo,
+                        request=request,
+                        result=result,
+                        metrics=metrics,
+                        branch_states=plan.current_branch_states,
                     )
                     self._set_progress(
                         progress_id=request.progress_id,
@@ -1541,7 +2284,9 @@ class IngestService:
                     request=request,
                     result=result,
                     metrics=metrics,
+                    branch_states=plan.current_branch_states,
                 )
+            self._check_interrupt()
             self._set_progress(
                 progress_id=request.progress_id,
                 repo_path=normalized_repo_path,
@@ -1563,6 +2308,11 @@ class IngestService:
                 inserted_commits=result.inserted_commits,
             )
             self.session.commit()
+            self._refresh_vector_index(
+                normalized_repo_path,
+                mode=result.mode,
+                commit_shas=plan.missing_commit_shas,
+            )
             logger.info(
                 "Indexed repo at %s using %s sync (%s inserted, %s removed) metrics=%s",
                 normalized_repo_path,
@@ -1571,6 +2321,29 @@ class IngestService:
                 result.removed_commits,
                 metrics.as_payload(),
             )
+        except IngestJobInterrupted as interrupted:
+            self.session.rollback()
+            existing_progress = (
+                self.get_progress(request.progress_id) if request.progress_id else None
+            )
+            interrupted_labels = {
+                "paused": "Repository sync paused",
+                "cancelled": "Repository sync cancelled",
+                "queued": "Waiting for an ingest worker",
+            }
+            self._set_progress(
+                progress_id=request.progress_id,
+                repo_path=normalized_repo_path,
+                phase=(
+                    "planning" if interrupted.status == "queued" else interrupted.status
+                ),
+                label=interrupted_labels.get(interrupted.status, "Repository sync stopped"),
+                stage_percent=existing_progress.stage_percent if existing_progress else 0.0,
+                stage_start_percent=0.0,
+                stage_weight=0.0,
+                percent_override=existing_progress.percent if existing_progress else 0.0,
+            )
+            raise
         except Exception as error:
             existing_progress = (
                 self.get_progress(request.progress_id) if request.progress_id else None
@@ -1588,5 +2361,8 @@ class IngestService:
             )
             self.session.rollback()
             raise
+        finally:
+            # Workers keep per-path trees across windows; free them per ingest.
+            self.ast_extractor.release_worker_parse_state()
 
         return normalized_repo_path
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from threading import Event, Thread
+from time import monotonic
+from typing import Callable
+
+import pygit2
+from sqlalchemy.orm import Session
+
+from api.api_model import IngestRequest
+from core.embedder import EmbeddingEngine
+from data.schema import SQLRepo
+from services.ingest_service import IngestService
+import infrastructure.db as db
+from utils.logger import logger
+
+RefsSignature = tuple[tuple[str, int, int, int], ...]
+
+
+@dataclass(frozen=True)
+class WatchedRepo:
+    repo_path: str
+    user_id: int
+    max_commits: int
+    context_lines: int
+
+
+@dataclass
+class _WatchState:
+    git_dir: str
+    signature: RefsSignature
+    changed_at: float | None = None
+
+
+def _stat_entry(path: str) -> tuple[str, int, int, int] | None:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return path, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _common_git_dir(git_dir: str) -> str | None:
+    """Shared git dir of a linked worktree, read from its ``commondir`` file."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as handle:
+            common_dir = handle.read().strip()
+    except OSError:
+        return None
+    return os.path.normpath(os.path.join(git_dir, common_dir)) if common_dir else None
+
+
+def read_refs_signature(git_dir: str) -> RefsSignature:
+    # A linked worktree keeps its branch refs in the common git dir.
+    ref_dirs = [git_dir]
+    common_dir = _common_git_dir(git_dir)
+    if common_dir is not None and common_dir != os.path.normpath(git_dir):
+        ref_dirs.append(common_dir)
+
+    entries: list[tuple[str, int, int, int]] = []
+    entry = _stat_entry(os.path.join(git_dir, "HEAD"))
+    if entry is not None:
+        entries.append(entry)
+    for ref_dir in ref_dirs:
+        entry = _stat_entry(os.path.join(ref_dir, "packed-refs"))
+        if entry is not None:
+            entries.append(entry)
+
+        heads_dir = os.path.join(ref_dir, "refs", "heads")
+        for dirpath, _, filenames in os.walk(heads_dir):
+            for filename in filenames:
+                entry = _stat_entry(os.path.join(dirpath, filename))
+                if entry is not None:
+                    entries.append(entry)
+
+    return tuple(sorted(entries))
+
+
+class RepoRefsWatcher:
+    """Polls the refs of indexed repos and pre-syncs them once they settle."""
+
+    def __init__(
+        self,
+        *,
+        embedder_factory: Callable[[], EmbeddingEngine | None],
+        flush_size: int = 100,
+        checkpoint_window_size: int = 250,
+        poll_interval_seconds: float = 2.0,
+        debounce_seconds: float = 1.5,
+        repo_refresh_seconds: float = 30.0,
+        session_factory: Callable[[], Session] | None = None,
+    ):
+        self.embedder_factory = embedder_factory
+        self.flush_size = flush_size
+        self.checkpoint_window_size = checkpoint_window_size
+        self.poll_interval_seconds = max(0.1, poll_interval_seconds)
+        self.debounce_seconds = max(0.0, debounce_seconds)
+        self.repo_refresh_seconds = max(self.poll_interval_seconds, repo_refresh_seconds)
+        self.session_factory = session_factory
+        self._states: dict[str, _WatchState] = {}
+        self._watched_repos: dict[str, WatchedRepo] = {}
+        self._repos_loaded_at: float | None = None
+        self._stop_event = Event()
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = Thread(
+            target=self._run,
+            name="git-odyssey-repo-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_seconds)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Repository refs watcher poll failed")
+            self._stop_event.wait(self.poll_interval_seconds)
+
+    def _open_session(self) -> Session:
+        session_factory = self.session_factory or db.SessionLocal
+        if session_factory is None:
+            raise RuntimeError("Database session factory is not initialized")
+        return session_factory()
+
+    def _load_watched_repos(self) -> dict[str, WatchedRepo]:
+        with self._open_session() as session:
+            rows = (
+                session.query(
+                    SQLRepo.path,
+                    SQLRepo.user_id,
+                    SQLRepo.indexed_max_commits,
+                    SQLRepo.indexed_context_lines,
+                )
+                .filter(
+                    SQLRepo.indexed_max_commits.isnot(None),
+                    SQLRepo.indexed_context_lines.isnot(None),
+                )
+                .all()
+            )
+        return {
+            repo_path: WatchedRepo(
+                repo_path=repo_path,
+                user_id=user_id,
+                max_commits=max_commits,
+                context_lines=context_lines,
+            )
+            for repo_path, user_id, max_commits, context_lines in rows
+        }
+
+    def _refresh_watched_repos(self, now: float) -> None:
+        if (
+            self._repos_loaded_at is not None
+            and now - self._repos_loaded_at < self.repo_refresh_seconds
+        ):
+            return
+
+        self._watched_repos = self._load_watched_repos()
+        self._repos_loaded_at = now
+        for repo_path in set(self._states) - set(self._watched_repos):
+            self._states.pop(repo_path, None)
+
+    def poll_once(self, now: float | None = None) -> list[str]:
+        now = monotonic() if now is None else now
+        self._refresh_watched_repos(now)
+
+        settled_repos: list[WatchedRepo] = []
+        for repo_path, watched_repo in self._watched_repos.items():
+            state = self._states.get(repo_path)
+            if state is None:
+                git_dir = pygit2.discover_repository(repo_path)
+                if not git_dir:
+                    continue
+                self._states[repo_path] = _WatchState(
+                    git_dir=git_dir,
+                    signature=read_refs_signature(git_dir),
+                )
+                continue
+
+            signature = read_refs_signature(state.git_dir)
+            if signature != state.signature:
+                state.signature = signature
+                state.changed_at = now
+                continue
+
+            if state.changed_at is not None and now - state.changed_at >= self.debounce_seconds:
+                state.changed_at = None
+                settled_repos.append(watched_repo)
+
+        return [
+            watched_repo.repo_path
+            for watched_repo in settled_repos
+            if self._enqueue_sync(watched_repo)
+        ]
+
+    def _enqueue_sync(self, watched_repo: WatchedRepo) -> bool:
+        try:
+            with self._open_session() as session:
+                ingest_service = IngestService(
+                    session=session,
+                    embedder=self.embedder_factory(),
+                    flush_size=self.flush_size,
+                    checkpoint_window_size=self.checkpoint_window_size,
+                )
+                if not ingest_service.should_reindex(
+                    watched_repo.repo_path,
+                    max_commits=watched_repo.max_commits,
+                    context_lines=watched_repo.context_lines,
+                ):
+                    return False
+                job = ingest_service.start_ingest_job(
+                    IngestRequest(
+                        repo_path=watched_repo.repo_path,
+                        max_commits=watched_repo.max_commits,
+                        context_lines=watched_repo.context_lines,
+                        priority="background",
+                    ),
+                    watched_repo.user_id,
+                )
+        except Exception:
+            logger.exception(
+                "Failed to enqueue background sync for %s", watched_repo.repo_path
+            )
+            return False
+
+        logger.info(
+            "Queued background sync job %s for %s after refs changed",
+            job.job_id,
+            watched_repo.repo_path,
+        )
+        return True
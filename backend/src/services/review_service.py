@@ -16,18 +16,25 @@ from api.api_model import (
     ReviewStats,
 )
 from core.ai import AIEngine
+from core.context_packer import ContextPacker, TokenCounter
+from core.diff_engine import (
+    DEFAULT_DIFF_ENGINE,
+    EMPTY_TREE_SHA,
+    FIND_RENAMES_AND_COPIES,
+    DiffEntry,
+    build_file_change,
+)
 from core.repo import DETACHED_HEAD_BRANCH_NAME, Repo
-from data.data_model import DiffHunk, FileChange, FileSnapshot
-from data.schema import FileChangeStatus
+from data.data_model import FileChange
 from infrastructure.errors import AIRequestError
 from utils.prompts import build_review_report_prompt
 
 MAX_REVIEW_FILES = 20
 MAX_REVIEW_HUNKS_PER_FILE = 12
-MAX_REVIEW_HUNK_CHARS = 2400
-MAX_REVIEW_SNAPSHOT_CHARS = 4000
+REVIEW_CONTEXT_TOKEN_BUDGET = 24_000
+REVIEW_MAX_ITEM_SHARE = 8
+OMITTED_CONTEXT_TEXT = "(omitted to fit the review token budget)"
 RAW_SHA_PATTERN = re.compile(r"^[0-9a-fA-F]{7,40}$")
-EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
 EMPTY_TREE_LABEL = "(empty tree)"
 
 
@@ -75,6 +82,8 @@ class ResolvedReviewTarget:
 
 
 class ReviewCompareService:
+    diff_engine = DEFAULT_DIFF_ENGINE
+
     def resolve_repo_path(self, repo_path: str) -> str:
         _repo, resolved_repo_path = self._open_repo(repo_path)
         return resolved_repo_path
@@ -100,32 +109,29 @@ class ReviewCompareService:
         resolved_target: ResolvedReviewTarget,
         context_lines: int,
     ) -> ReviewCompareResponse:
-        diff = resolved_target.base_tree.diff_to_tree(
-            resolved_target.head_commit.tree, context_lines=context_lines
+        entries = self.diff_engine.diff_trees(
+            resolved_target.repo,
+            resolved_target.base_tree,
+            resolved_target.head_commit.tree,
+            context_lines=context_lines,
+            find_similar_flags=FIND_RENAMES_AND_COPIES,
         )
-        try:
-            diff.find_similar(
-                pygit2.GIT_DIFF_FIND_RENAMES | pygit2.GIT_DIFF_FIND_COPIES
-            )
-        except Exception:
-            # Rename detection is helpful but not required for a usable compare payload.
-            pass
 
         file_changes: list[FileChange] = []
         additions = 0
         deletions = 0
 
-        for patch in diff:
-            file_change, file_additions, file_deletions = self._build_file_change(
-                repo=resolved_target.repo,
-                base_tree=resolved_target.base_tree,
-                base_commit_sha=resolved_target.base_head_sha,
-                head_commit=resolved_target.head_commit,
-                patch=patch,
+        for entry in entries:
+            file_changes.append(
+                self._build_file_change(
+                    repo=resolved_target.repo,
+                    base_commit_sha=resolved_target.base_head_sha,
+                    head_commit=resolved_target.head_commit,
+                    entry=entry,
+                )
             )
-            file_changes.append(file_change)
-            additions += file_additions
-            deletions += file_deletions
+            additions += entry.additions
+            deletions += entry.deletions
 
         if not file_changes:
             no_changes_message = (
@@ -353,153 +359,23 @@ class ReviewCompareService:
         self,
         *,
         repo: pygit2.Repository,
-        base_tree: pygit2.Tree,
         base_commit_sha: str,
         head_commit: pygit2.Commit,
-        patch,
-    ) -> tuple[FileChange, int, int]:
-        delta = patch.delta
-        status = self._map_file_change_status(delta.status)
-        old_path = delta.old_file.path or ""
-        new_path = delta.new_file.path or ""
-        hunks: list[DiffHunk] = []
-        additions = 0
-        deletions = 0
-
-        for hunk in patch.hunks:
-            hunk_lines: list[str] = []
-            for line in hunk.lines:
-                content = (
-                    line.content.decode("utf-8", "replace")
-                    if isinstance(line.content, (bytes, bytearray))
-                    else line.content
-                )
-                origin = line.origin
-                hunk_lines.append(f"{origin}{content}")
-                if origin == "+":
-                    additions += 1
-                elif origin == "-":
-                    deletions += 1
-
-            hunks.append(
-                DiffHunk(
-                    old_start=hunk.old_start,
-                    old_lines=hunk.old_lines,
-                    new_start=hunk.new_start,
-                    new_lines=hunk.new_lines,
-                    content="".join(hunk_lines),
-                    commit_sha=str(head_commit.id),
-                )
-            )
-
-        snapshot = self._build_snapshot(
-            repo=repo,
-            base_tree=base_tree,
-            base_commit_sha=base_commit_sha,
-            head_commit=head_commit,
-            old_path=old_path,
-            new_path=new_path,
-            status=status,
-        )
-
-        return (
-            FileChange(
-                old_path=old_path,
-                new_path=new_path,
-                status=status,
-                hunks=hunks,
-                snapshot=snapshot,
+        entry: DiffEntry,
+    ) -> FileChange:
+        try:
+            return build_file_change(
+                repo,
+                entry,
                 commit_sha=str(head_commit.id),
-            ),
-            additions,
-            deletions,
-        )
-
-    def _build_snapshot(
-        self,
-        *,
-        repo: pygit2.Repository,
-        base_tree: pygit2.Tree,
-        base_commit_sha: str,
-        head_commit: pygit2.Commit,
-        old_path: str,
-        new_path: str,
-        status: FileChangeStatus,
-    ) -> FileSnapshot:
-        commit_sha = str(head_commit.id)
-
-        if status == FileChangeStatus.DELETED:
-            deleted_content = self._get_snapshot(repo, base_tree, old_path)
-            return FileSnapshot(
-                path=old_path or new_path,
-                content=deleted_content or "",
-                commit_sha=commit_sha,
+                base_commit_sha=base_commit_sha,
+                include_previous_snapshot=True,
             )
-
-        current_path = new_path or old_path
-        current_content = self._get_snapshot(repo, head_commit.tree, current_path)
-        previous_snapshot = None
-
-        if status in {
-            FileChangeStatus.MODIFIED,
-            FileChangeStatus.RENAMED,
-            FileChangeStatus.COPIED,
-        }:
-            previous_content = self._get_snapshot(repo, base_tree, old_path)
-            previous_snapshot = FileSnapshot(
-                path=old_path,
-                content=previous_content or "",
-                commit_sha=base_commit_sha,
-            )
-
-        return FileSnapshot(
-            path=current_path,
-            content=current_content or "",
-            commit_sha=commit_sha,
-            previous_snapshot=previous_snapshot,
-        )
-
-    def _get_snapshot(
-        self, repo: pygit2.Repository, tree: pygit2.Tree, path: str
-    ) -> str | None:
-        if not path:
-            return None
-
-        try:
-            parts = [part for part in path.split("/") if part]
-            current = tree
-
-            for index, part in enumerate(parts):
-                entry = current[part]
-                obj = repo[entry.id]
-
-                if index < len(parts) - 1:
-                    if isinstance(obj, pygit2.Tree):
-                        current = obj
-                        continue
-                    return None
-
-                if hasattr(obj, "data"):
-                    return obj.data.decode("utf-8", "replace").replace("\x00", "")
-                return None
-        except Exception:
-            return None
-
-    def _map_file_change_status(self, status_code: int) -> FileChangeStatus:
-        if status_code == 1:
-            return FileChangeStatus.ADDED
-        if status_code == 2:
-            return FileChangeStatus.DELETED
-        if status_code == 3:
-            return FileChangeStatus.MODIFIED
-        if status_code == 4:
-            return FileChangeStatus.RENAMED
-        if status_code == 5:
-            return FileChangeStatus.COPIED
-        raise ReviewServiceError(
-            f"Unsupported diff selection encountered a change with status code {status_code}.",
-            status_code=400,
-        )
+        except ValueError as error:
+            raise ReviewServiceError(
+                f"Unsupported diff selection encountered a change with status code {entry.status_code}.",
+                status_code=400,
+            ) from error
 
 
 class _RawReviewFinding(BaseModel):
@@ -521,9 +397,14 @@ class ReviewGenerationService:
         self,
         compare_service: ReviewCompareService,
         ai_engine: AIEngine,
+        *,
+        context_token_budget: int | None = None,
+        token_counter: TokenCounter | None = None,
     ):
         self.compare_service = compare_service
         self.ai_engine = ai_engine
+        self.context_token_budget = context_token_budget or REVIEW_CONTEXT_TOKEN_BUDGET
+        self.token_counter = token_counter or TokenCounter()
 
     def generate(self, request: GenerateReviewRequest) -> ReviewReport:
         compare = self.compare_service.compare(
@@ -582,24 +463,52 @@ class ReviewGenerationService:
     def _prepare_review_context(
         self, compare: ReviewCompareResponse
     ) -> tuple[str, bool]:
-        partial = False
-        file_blocks: list[str] = []
+        partial = len(compare.file_changes) > MAX_REVIEW_FILES
+        file_changes = compare.file_changes[:MAX_REVIEW_FILES]
+
+        # Hunks are packed before current snapshots, and those before previous
+        # snapshots, so a tight budget drops surrounding context first.
+        texts: list[str] = []
+        hunk_positions: list[list[int]] = []
+        for file_change in file_changes:
+            hunks = file_change.hunks or []
+            partial = partial or len(hunks) > MAX_REVIEW_HUNKS_PER_FILE
+            positions: list[int] = []
+            for hunk in hunks[:MAX_REVIEW_HUNKS_PER_FILE]:
+                positions.append(len(texts))
+                texts.append(hunk.content or "")
+            hunk_positions.append(positions)
+
+        current_positions: list[int] = []
+        for file_change in file_changes:
+            current_positions.append(len(texts))
+            texts.append(file_change.snapshot.content if file_change.snapshot else "")
+        previous_positions: list[int] = []
+        for file_change in file_changes:
+            previous_positions.append(len(texts))
+            texts.append(
+                file_change.snapshot.previous_snapshot.content
+                if file_change.snapshot and file_change.snapshot.previous_snapshot
+                else ""
+            )
 
-        for file_index, file_change in enumerate(compare.file_changes, start=1):
-            if file_index > MAX_REVIEW_FILES:
-                partial = True
-                break
+        packed = ContextPacker(self.context_token_budget, self.token_counter).pack(
+            texts,
+            max_item_tokens=max(1, self.context_token_budget // REVIEW_MAX_ITEM_SHARE),
+        )
+        packed_texts = {item.index: item.text for item in packed.items}
+        partial = partial or packed.partial
 
-            hunk_blocks: list[str] = []
+        file_blocks: list[str] = []
+        for file_index, file_change in enumerate(file_changes, start=1):
             hunks = file_change.hunks or []
-            if len(hunks) > MAX_REVIEW_HUNKS_PER_FILE:
-                partial = True
-
-            for hunk_index, hunk in enumerate(hunks[:MAX_REVIEW_HUNKS_PER_FILE], start=1):
-                truncated_hunk, hunk_truncated = self._truncate_text(
-                    hunk.content or "", MAX_REVIEW_HUNK_CHARS
-                )
-                partial = partial or hunk_truncated
+            hunk_blocks: list[str] = []
+            for hunk_index, (hunk, position) in enumerate(
+                zip(hunks, hunk_positions[file_index - 1]), start=1
+            ):
+                if position not in packed_texts:
+                    hunk_blocks.append(f"    Hunk {hunk_index}: {OMITTED_CONTEXT_TEXT}")
+                    continue
                 hunk_blocks.append(
                     "\n".join(
                         [
@@ -611,27 +520,12 @@ class ReviewGenerationService:
                             ),
                             "      Diff:",
                             "```diff",
-                            truncated_hunk,
+                            packed_texts[position],
                             "```",
                         ]
                     )
                 )
 
-            previous_snapshot_text = (
-                file_change.snapshot.previous_snapshot.content
-                if file_change.snapshot and file_change.snapshot.previous_snapshot
-                else ""
-            )
-            current_snapshot_text = (
-                file_change.snapshot.content if file_change.snapshot else ""
-            )
-            previous_snapshot, prev_truncated = self._truncate_text(
-                previous_snapshot_text, MAX_REVIEW_SNAPSHOT_CHARS
-            )
-            current_snapshot, current_truncated = self._truncate_text(
-                current_snapshot_text, MAX_REVIEW_SNAPSHOT_CHARS
-            )
-            partial = partial or prev_truncated or current_truncated
             hunk_section = hunk_blocks if hunk_blocks else ["    (No textual hunks)"]
 
             file_blocks.append(
@@ -644,11 +538,15 @@ class ReviewGenerationService:
                         f"  Status: {file_change.status.value}",
                         "  Previous Snapshot:",
                         "```",
-                        previous_snapshot,
+                        packed_texts.get(
+                            previous_positions[file_index - 1], OMITTED_CONTEXT_TEXT
+                        ),
                         "```",
                         "  Current Snapshot:",
                         "```",
-                        current_snapshot,
+                        packed_texts.get(
+                            current_positions[file_index - 1], OMITTED_CONTEXT_TEXT
+                        ),
                         "```",
                         "  Hunks:",
                         *hunk_section,
@@ -698,8 +596,3 @@ class ReviewGenerationService:
                 f"AI review output used an unsupported severity '{severity}'."
             )
         return normalized
-
-    def _truncate_text(self, value: str, limit: int) -> tuple[str, bool]:
-        if len(value) <= limit:
-            return value, False
-        return value[: limit - 15] + "\n...[truncated]", True
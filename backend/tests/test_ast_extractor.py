@@ -1,7 +1,16 @@
+import ast
 import unittest
 from types import SimpleNamespace
-
-from core.ast_extractor import ASTSummaryExtractor, normalize_ast_summary_text
+from unittest.mock import patch
+
+from core.ast_extractor import (
+    ASTSummaryExtractor,
+    _get_process_pool,
+    compute_blob_hash,
+    configure_ast_process_pool,
+    normalize_ast_summary_text,
+    shutdown_ast_process_pool,
+)
 from data.schema import FileChangeStatus
 
 
@@ -216,6 +225,229 @@ class ASTExtractorTests(unittest.TestCase):
 
         self.assertEqual(first_result.hunk_summaries[0], second_result.hunk_summaries[0])
 
+    def test_blob_hash_matches_git_blob_oid(self) -> None:
+        self.assertEqual(
+            compute_blob_hash("hello\n"),
+            "ce013625030ba8dba906f756967f9e9ca394464a",
+        )
+
+    def test_unchanged_blob_is_parsed_once_across_file_changes(self) -> None:
+        snapshot_text = (
+            "def greet(name: str) -> str:\n"
+            "    return format_name(name)\n"
+            "\n"
+            "def leave(name: str) -> str:\n"
+            "    return format_name(name)\n"
+        )
+        first = build_file_change(
+            path="backend/src/a.py",
+            snapshot_text=snapshot_text,
+            hunk_content="+    return format_name(name)\n",
+            old_start=2,
+            new_start=2,
+        )
+        second = build_file_change(
+            path="backend/src/a.py",
+            snapshot_text=snapshot_text,
+            hunk_content="+    return format_name(name)\n",
+            old_start=5,
+            new_start=5,
+        )
+
+        with patch("core.ast_extractor.ast.parse", wraps=ast.parse) as parse:
+            self.extractor.populate_file_changes([first, second])
+
+        parse.assert_called_once()
+        self.assertIn("Symbol: greet", first.hunks[0].ast_summary)
+        self.assertIn("Symbol: leave", second.hunks[0].ast_summary)
+
+    def test_symbol_features_are_extracted_once_per_symbol(self) -> None:
+        file_change = build_file_change(
+            path="backend/src/widget.py",
+            snapshot_text=(
+                "class Widget:\n"
+                "    size: int\n"
+                "    label: str\n"
+                "    color: str\n"
+            ),
+            hunk_content="+    size: int\n",
+            old_start=2,
+            new_start=2,
+        )
+        file_change.hunks.extend(
+            SimpleNamespace(
+                content=f"+    {name}: str\n",
+                old_start=line,
+                old_lines=1,
+                new_start=line,
+                new_lines=1,
+                ast_summary=None,
+            )
+            for line, name in ((3, "label"), (4, "color"))
+        )
+
+        with patch.object(
+            self.extractor,
+            "_extract_python_type_names",
+            wraps=self.extractor._extract_python_type_names,
+        ) as extract_type_names:
+            result = self.extractor.extract_file_change(file_change)
+
+        extract_type_names.assert_called_once()
+        self.assertEqual(len(result.hunk_summaries), 3)
+        self.assertIn("Types: int, str", result.hunk_summaries[2])
+
+    def test_incremental_typescript_parse_matches_full_parse(self) -> None:
+        snapshots = [
+            "export function load(): number {\n  return 1;\n}\n",
+            "export function load(): number {\n  return fetchCount(1);\n}\n",
+            "const limit = 2;\n"
+            "export function load(): number {\n  return fetchCount(limit);\n}\n",
+            "const limit = 2;\n"
+            "export class Loader {\n  load(): number {\n    return limit;\n  }\n}\n",
+        ]
+        full_extractor = ASTSummaryExtractor(incremental_parse=False)
+
+        for snapshot_text in snapshots:
+            line_count = snapshot_text.count("\n")
+            incremental = build_file_change(
+                path="frontend/src/loader.ts",
+                snapshot_text=snapshot_text,
+                hunk_content="+  return limit;\n",
+                new_start=line_count - 1,
+                old_start=line_count - 1,
+            )
+            full = build_file_change(
+                path="frontend/src/loader.ts",
+                snapshot_text=snapshot_text,
+                hunk_content="+  return limit;\n",
+                new_start=line_count - 1,
+                old_start=line_count - 1,
+            )
+
+            self.extractor.populate_file_change(incremental)
+            full_extractor.populate_file_change(full)
+
+            self.assertEqual(incremental.hunks[0].ast_summary, full.hunks[0].ast_summary)
+
+        self.assertIn(
+            ("typescript", "frontend/src/loader.ts"), self.extractor._ts_trees_by_path
+        )
+        self.extractor.release_parse_state()
+        self.assertEqual(len(self.extractor._ts_trees_by_path), 0)
+
+    def test_process_pool_populates_same_summaries_as_serial_extraction(self) -> None:
+        def build_changes():
+            return [
+                build_file_change(
+                    path="backend/src/example.py",
+                    snapshot_text=(
+                        "def greet(name: str, title: str) -> str:\n"
+                        "    return format_name(name, title)\n"
+                    ),
+                    hunk_content="+def greet(name: str, title: str) -> str:\n",
+                ),
+                build_file_change(
+                    path="frontend/src/state.ts",
+                    snapshot_text="export function load(): number {\n  return 1;\n}\n",
+                    hunk_content="+  return 1;\n",
+                    old_start=2,
+                    new_start=2,
+                ),
+                build_file_change(
+                    path="README.md",
+                    snapshot_text="hello\n",
+                    hunk_content="+hello\n",
+                ),
+            ]
+
+        serial_changes = build_changes()
+        self.extractor.populate_file_changes(serial_changes)
+
+        parallel_changes = build_changes()
+        visited = []
+        configure_ast_process_pool(2)
+        try:
+            ASTSummaryExtractor().populate_file_changes(
+                parallel_changes, on_file_change=visited.append
+            )
+        finally:
+            shutdown_ast_process_pool()
+
+        self.assertEqual(len(visited), 3)
+        for serial, parallel in zip(serial_changes, parallel_changes):
+            self.assertEqual(parallel.ast_summary, serial.ast_summary)
+            self.assertEqual(parallel.hunks[0].ast_summary, serial.hunks[0].ast_summary)
+        self.assertIsNotNone(parallel_changes[0].ast_summary)
+        self.assertIsNone(parallel_changes[2].ast_summary)
+
+    def test_worker_symbols_are_cached_in_the_parent_and_idle_workers_recycled(
+        self,
+    ) -> None:
+        snapshot_text = (
+            "def greet(name: str) -> str:\n"
+            "    return format_name(name)\n"
+            "\n"
+            "def leave(name: str) -> str:\n"
+            "    return format_name(name)\n"
+        )
+        first = build_file_change(
+            path="backend/src/a.py",
+            snapshot_text=snapshot_text,
+            hunk_content="+    return format_name(name)\n",
+            old_start=2,
+            new_start=2,
+        )
+        second = build_file_change(
+            path="backend/src/a.py",
+            snapshot_text=snapshot_text,
+            hunk_content="+    return format_name(name)\n",
+            old_start=5,
+            new_start=5,
+        )
+        serial = build_file_change(
+            path="backend/src/a.py",
+            snapshot_text=snapshot_text,
+            hunk_content="+    return format_name(name)\n",
+            old_start=5,
+            new_start=5,
+        )
+        self.extractor.populate_file_change(serial)
+        extractor = ASTSummaryExtractor()
+        other_job = ASTSummaryExtractor()
+
+        configure_ast_process_pool(2)
+        try:
+            extractor.populate_file_changes([first])
+            other_job.populate_file_changes(
+                [
+                    build_file_change(
+                        path="backend/src/b.py",
+                        snapshot_text="x = 1\n",
+                        hunk_content="+x = 1\n",
+                    )
+                ]
+            )
+            with patch(
+                "core.ast_extractor._map_on_process_pool",
+                side_effect=AssertionError("dispatched"),
+            ):
+                extractor.populate_file_changes([second])
+            pool = _get_process_pool()
+            extractor.release_worker_parse_state()
+            shared_pool = _get_process_pool()
+            other_job.release_worker_parse_state()
+            recycled_pool = _get_process_pool()
+        finally:
+            shutdown_ast_process_pool()
+
+        self.assertIn("Symbol: greet", first.hunks[0].ast_summary)
+        # ``leave`` was shipped without features, so the parent reparsed it.
+        self.assertEqual(second.hunks[0].ast_summary, serial.hunks[0].ast_summary)
+        self.assertIs(shared_pool, pool)
+        self.assertIsNotNone(recycled_pool)
+        self.assertIsNot(recycled_pool, pool)
+
 
 if __name__ == "__main__":
     unittest.main()
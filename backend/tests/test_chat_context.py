@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import Mock
+
+from core.context_packer import TokenCounter
+from core.retriever import Retriever
+from core.vector_index import VectorHit
+
+
+class RowsResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def build_retriever(results: list[list[dict]]) -> tuple[Retriever, list[str]]:
+    retriever = Retriever.__new__(Retriever)
+    retriever.vector_indexes = None
+    retriever._get_query_embedding = Mock(return_value=[1.0, 0.0])
+    retriever.session = Mock()
+    captured_sql: list[str] = []
+    pending = list(results)
+
+    def execute(statement):
+        captured_sql.append(str(statement))
+        return RowsResult(pending.pop(0) if pending else [])
+
+    retriever.session.execute.side_effect = execute
+    return retriever, captured_sql
+
+
+class ChatContextTests(unittest.TestCase):
+    def test_unpinned_search_pushes_top_k_into_each_query(self) -> None:
+        retriever, captured_sql = build_retriever(
+            [
+                [{"key": "c1", "text_similarity": 0.2}],
+                [],
+                [{"key": 9, "text_similarity": 0.05, "ast_similarity": None}],
+                [
+                    {
+                        "sha": "c1",
+                        "message": "Add token",
+                        "author": "dev",
+                        "time": 1,
+                        "summary": None,
+                    }
+                ],
+                [
+                    {
+                        "id": 9,
+                        "commit_sha": "c2",
+                        "old_lines": 1,
+                        "new_lines": 1,
+                        "content": "+token",
+                        "summary": None,
+                        "old_path": None,
+                        "new_path": "src/app.py",
+                        "commit_message": "Use token",
+                        "commit_author": "dev",
+                        "commit_time": 2,
+                    }
+                ],
+            ]
+        )
+        retriever.chat_context_top_k = 3
+
+        context, cited = retriever.get_context_with_citations("token", "/repo", [])
+
+        search_sql = [sql.lower() for sql in captured_sql[:3]]
+        self.assertEqual(len(captured_sql), 5)
+        self.assertTrue(all("order by" in sql and "limit" in sql for sql in search_sql))
+        self.assertTrue(all("content" not in sql for sql in search_sql))
+        self.assertIn("src/app.py", context.split("### 1.")[1])
+        self.assertEqual([commit["sha"] for commit in cited], ["c2", "c1"])
+
+    def test_vector_index_serves_unpinned_search(self) -> None:
+        retriever, captured_sql = build_retriever([])
+        retriever.vector_indexes = Mock()
+        search = retriever.vector_indexes.get.return_value.search
+        search.return_value = {
+            "commit": [VectorHit(key="c1", text_distance=0.1, ast_distance=None)],
+            "file_change": [],
+            "hunk": [],
+        }
+        retriever.chat_context_top_k = 4
+
+        hits = retriever._search_chat_context("/repo", None, [1.0, 0.0])
+
+        self.assertEqual(hits, [("commit", "c1", 0.1)])
+        self.assertEqual(captured_sql, [])
+        self.assertIsNone(search.call_args.kwargs["commit_shas"])
+        self.assertEqual(search.call_args.kwargs["limit"], 8)
+
+    def test_packing_truncates_large_items_and_fills_the_rest_of_the_budget(self) -> None:
+        retriever = Retriever.__new__(Retriever)
+        retriever.chat_context_token_budget = 200
+        counter = TokenCounter()
+        counter._encoding = None
+        items = [
+            {"sha": "c1", "content": "word " * 400},
+            {"sha": "c2", "content": "word " * 90},
+            {"sha": "c3", "content": "word " * 40},
+            {"sha": "c4", "content": "word " * 5},
+        ]
+
+        packed = retriever._pack_chat_context(items, token_counter=counter)
+
+        self.assertEqual([item["sha"] for item in packed], ["c1", "c2", "c4"])
+        self.assertTrue(packed[0]["content"].endswith("...[truncated]"))
+        self.assertLessEqual(counter.count(packed[0]["content"]), 100)
+        self.assertEqual(packed[2]["content"], items[3]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+from core.context_packer import (
+    ContextPacker,
+    TokenCounter,
+    _load_encoding,
+    preload_encoding,
+)
+
+
+def approximate_counter() -> TokenCounter:
+    counter = TokenCounter()
+    counter._encoding = None
+    return counter
+
+
+class ContextPackerTests(unittest.TestCase):
+    def test_approximate_count_splits_long_words_and_punctuation(self) -> None:
+        counter = approximate_counter()
+
+        self.assertEqual(counter.count(""), 0)
+        self.assertEqual(counter.count("a = b;"), 4)
+        self.assertEqual(counter.count("identifier\n"), 4)
+
+    def test_truncate_respects_the_token_limit(self) -> None:
+        counter = approximate_counter()
+
+        truncated, was_truncated = counter.truncate("word " * 100, 40)
+        unchanged, not_truncated = counter.truncate("short text", 40)
+
+        self.assertTrue(was_truncated)
+        self.assertLessEqual(counter.count(truncated), 40)
+        self.assertEqual((unchanged, not_truncated), ("short text", False))
+
+    def test_pack_keeps_priority_order_and_drops_what_does_not_fit(self) -> None:
+        packer = ContextPacker(100, approximate_counter())
+
+        packed = packer.pack(["word " * 60, "word " * 60, "word " * 20])
+
+        self.assertEqual([item.index for item in packed.items], [0, 1])
+        self.assertFalse(packed.items[0].truncated)
+        self.assertTrue(packed.items[1].truncated)
+        self.assertLessEqual(packed.used_tokens, 100)
+        self.assertEqual(packed.dropped, 1)
+        self.assertTrue(packed.partial)
+
+    def test_unavailable_encoding_falls_back_to_approximate_counts(self) -> None:
+        _load_encoding.cache_clear()
+        self.addCleanup(_load_encoding.cache_clear)
+        with patch(
+            "core.context_packer.tiktoken.get_encoding", side_effect=OSError("offline")
+        ):
+            loaded = preload_encoding("unknown-model")
+            counter = TokenCounter("unknown-model")
+
+        self.assertFalse(loaded)
+        self.assertFalse(counter.exact)
+        self.assertEqual(counter.count("a = b;"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pygit2
+
+from core.diff_engine import (
+    DiffEngine,
+    IngestSkipPolicy,
+    build_file_change,
+    estimate_entries_bytes,
+)
+from core.patch_text import patch_line_counts
+from data.schema import FileChangeStatus
+
+
+def run_git(cwd: str, *args: str) -> str:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "GitOdyssey",
+        "GIT_AUTHOR_EMAIL": "gitodyssey@example.com",
+        "GIT_COMMITTER_NAME": "GitOdyssey",
+        "GIT_COMMITTER_EMAIL": "gitodyssey@example.com",
+    }
+    completed = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return completed.stdout.strip()
+
+
+def create_commit(repo_dir: str, file_name: str, content: str, message: str) -> None:
+    with open(os.path.join(repo_dir, file_name), "w", encoding="utf-8") as handle:
+        handle.write(content)
+    run_git(repo_dir, "add", file_name)
+    run_git(repo_dir, "commit", "-m", message)
+
+
+class DiffEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.repo_dir = os.path.realpath(self.tempdir.name)
+        run_git(self.repo_dir, "init")
+        run_git(self.repo_dir, "checkout", "-b", "main")
+        create_commit(self.repo_dir, "app.py", "a = 1\n", "Initial commit")
+        create_commit(self.repo_dir, "app.py", "a = 2\n", "Update app")
+        self.repo = pygit2.Repository(self.repo_dir)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_root_commit_diffs_against_empty_tree_as_added(self) -> None:
+        root = self.repo.revparse_single("HEAD~1")
+        engine = DiffEngine()
+
+        entries = engine.diff_commit(self.repo, root, context_lines=3)
+
+        self.assertEqual(len(entries), 1)
+        file_change = build_file_change(
+            self.repo,
+            entries[0],
+            commit_sha=str(root.id),
+        )
+        self.assertEqual(file_change.status, FileChangeStatus.ADDED)
+        self.assertEqual(file_change.snapshot.content, "a = 1\n")
+        self.assertEqual(file_change.hunks[0].commit_sha, str(root.id))
+        self.assertIn("+a = 1", file_change.hunks[0].content)
+
+    def test_snapshots_are_read_from_delta_blob_ids(self) -> None:
+        nested_dir = os.path.join(self.repo_dir, "src", "pkg", "deep")
+        os.makedirs(nested_dir)
+        create_commit(self.repo_dir, "src/pkg/deep/mod.py", "x = 1\n", "Add mod")
+        create_commit(self.repo_dir, "src/pkg/deep/mod.py", "x = 2\n", "Edit mod")
+        run_git(self.repo_dir, "rm", "-q", "src/pkg/deep/mod.py")
+        run_git(self.repo_dir, "commit", "-m", "Remove mod")
+        engine = DiffEngine()
+
+        edit = self.repo.revparse_single("HEAD~1")
+        (edit_entry,) = engine.diff_commit(self.repo, edit, context_lines=3)
+        edited = build_file_change(
+            self.repo,
+            edit_entry,
+            commit_sha=str(edit.id),
+            base_commit_sha=str(edit.parents[0].id),
+            include_previous_snapshot=True,
+        )
+        removal = self.repo.revparse_single("HEAD")
+        (removal_entry,) = engine.diff_commit(self.repo, removal, context_lines=3)
+        removed = build_file_change(
+            self.repo, removal_entry, commit_sha=str(removal.id)
+        )
+
+        self.assertEqual(edited.snapshot.content, "x = 2\n")
+        self.assertEqual(edited.snapshot.previous_snapshot.content, "x = 1\n")
+        self.assertEqual(removed.status, FileChangeStatus.DELETED)
+        self.assertEqual(removed.snapshot.path, "src/pkg/deep/mod.py")
+        self.assertEqual(removed.snapshot.content, "x = 2\n")
+
+    def test_repeated_tree_pair_is_served_from_cache(self) -> None:
+        head = self.repo.revparse_single("HEAD")
+        engine = DiffEngine()
+
+        first = engine.diff_commit(self.repo, head, context_lines=3)
+        with patch.object(
+            engine, "_build_entries", side_effect=AssertionError("re-diffed")
+        ):
+            second = engine.diff_commit(self.repo, head, context_lines=3)
+
+        self.assertIs(first, second)
+        self.assertEqual((engine.hits, engine.misses), (1, 1))
+        self.assertEqual((first[0].additions, first[0].deletions), (1, 1))
+
+    def test_cache_key_includes_diff_options_and_evicts_by_size(self) -> None:
+        head = self.repo.revparse_single("HEAD")
+        entry_bytes = estimate_entries_bytes(
+            DiffEngine().diff_commit(self.repo, head, context_lines=3)
+        )
+        engine = DiffEngine(max_bytes=entry_bytes * 2 + entry_bytes // 2)
+
+        engine.diff_commit(self.repo, head, context_lines=3)
+        engine.diff_commit(self.repo, head, context_lines=0)
+        engine.diff_commit(self.repo, head, context_lines=10)
+        engine.diff_commit(self.repo, head, context_lines=3)
+
+        self.assertEqual((engine.hits, engine.misses), (0, 4))
+        self.assertLessEqual(engine.cached_bytes, engine.max_bytes)
+
+    def test_uncached_diffs_bypass_the_cache(self) -> None:
+        head = self.repo.revparse_single("HEAD")
+        engine = DiffEngine()
+        engine.diff_commit(self.repo, head, context_lines=3)
+
+        engine.diff_commit(self.repo, head, context_lines=3, use_cache=False)
+        engine.diff_commit(self.repo, head.parents[0], context_lines=3, use_cache=False)
+
+        self.assertEqual((engine.hits, engine.misses), (0, 1))
+        self.assertEqual(len(engine._cache), 1)
+
+
+    def test_skip_policy_decides_excluded_and_large_blobs_before_patching(self) -> None:
+        create_commit(self.repo_dir, "package-lock.json", "{}\n", "Add lock")
+        with open(os.path.join(self.repo_dir, "big.txt"), "w", encoding="utf-8") as handle:
+            handle.write("x" * 64 + "\n")
+        with open(os.path.join(self.repo_dir, "app.py"), "w", encoding="utf-8") as handle:
+            handle.write("a = 3\n")
+        with open(os.path.join(self.repo_dir, "package-lock.json"), "w", encoding="utf-8") as handle:
+            handle.write('{"a": 1}\n')
+        run_git(self.repo_dir, "add", "-A")
+        run_git(self.repo_dir, "commit", "-m", "Mixed change")
+        head = self.repo.revparse_single("HEAD")
+        policy = IngestSkipPolicy(max_blob_bytes=32)
+
+        with patch(
+            "core.diff_engine.patch_line_counts", wraps=patch_line_counts
+        ) as line_counts:
+            entries = DiffEngine().diff_commit(
+                self.repo, head, context_lines=3, skip_policy=policy
+            )
+
+        reasons = {entry.new_path: entry.skip_reason for entry in entries}
+        self.assertEqual(
+            reasons,
+            {"app.py": None, "big.txt": "blob_too_large", "package-lock.json": "excluded"},
+        )
+        line_counts.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
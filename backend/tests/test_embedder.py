@@ -1,9 +1,10 @@
+import time
 import unittest
-from threading import Event, Lock, Timer
+from threading import Event, Lock, Thread, Timer
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
-from core.embedder import EmbeddingEngine
+from core.embedder import EmbeddingEngine, FairBatchSlots
 from infrastructure.ai_clients import EmbeddingResult
 from infrastructure.errors import AIRateLimitError, AIRequestError
 
@@ -454,6 +455,31 @@ class EmbeddingEngineTests(unittest.TestCase):
         )
         self.assertFalse(any("ignored" in text for text in flattened_batches))
 
+    def test_skipped_file_changes_are_not_embedded(self) -> None:
+        embedder = RecordingEmbeddingEngine(token_limit=1000)
+        placeholder = SimpleNamespace(
+            hunks=[],
+            old_path="package-lock.json",
+            new_path="package-lock.json",
+            status=SimpleNamespace(value="modified"),
+            semantic_embedding=None,
+            skip_reason="excluded",
+        )
+        commit = SimpleNamespace(
+            message="Bump dependencies",
+            semantic_embedding=None,
+            file_changes=[placeholder],
+        )
+
+        work_items, stats = embedder._build_repo_work_items(
+            SimpleNamespace(commits={"abc123": commit})
+        )
+
+        self.assertEqual(len(work_items), 1)
+        self.assertEqual(stats.semantic_work_items, 1)
+        self.assertIn("Commit Message: Bump dependencies", work_items[0].text)
+        self.assertIsNone(placeholder.semantic_embedding)
+
     def test_engine_captures_observed_dimension(self) -> None:
         client = Mock()
         client.embed.return_value = build_embedding_result([1.0, 2.0, 3.0])
@@ -544,6 +570,86 @@ class EmbeddingEngineTests(unittest.TestCase):
         self.assertTrue(client.reached_target.is_set())
         self.assertLessEqual(client.max_active, 4)
 
+    def test_concurrent_ingest_batches_share_one_concurrency_budget(self) -> None:
+        client = TrackingEmbeddingClient()
+        embedder = EmbeddingEngine(
+            client=client,
+            token_limit=1,
+            max_input_tokens=10,
+        )
+        embedder.token_chars = 10
+        releaser = Timer(0.05, client.release.set)
+        releaser.start()
+        targets = [SimpleNamespace(semantic_embedding=None) for _ in range(8)]
+
+        def embed_job(job_targets) -> None:
+            embedder.embed_batch(
+                [
+                    (target, f"payload {index}", "semantic_embedding")
+                    for index, target in enumerate(job_targets)
+                ]
+            )
+
+        jobs = [
+            Thread(target=embed_job, args=(targets[:4],)),
+            Thread(target=embed_job, args=(targets[4:],)),
+        ]
+        for job in jobs:
+            job.start()
+        for job in jobs:
+            job.join(timeout=5.0)
+
+        self.assertTrue(all(target.semantic_embedding for target in targets))
+        self.assertLessEqual(client.max_active, embedder.max_concurrency)
+
+    def test_batch_slots_alternate_between_concurrent_jobs(self) -> None:
+        gate = Event()
+        calls: list[str] = []
+
+        def embed(*, model: str, inputs: list[str]) -> EmbeddingResult:
+            calls.append(inputs[0][0])
+            if len(calls) == 1:
+                gate.wait(timeout=5.0)
+            return build_embedding_result(*([[1.0, 0.0]] * len(inputs)))
+
+        embedder = EmbeddingEngine(
+            client=Mock(embed=embed),
+            token_limit=1,
+            max_input_tokens=10,
+        )
+        embedder.token_chars = 10
+        embedder._batch_slots = FairBatchSlots(1)
+        queues = embedder._batch_slots._queues
+
+        def wait_until(predicate) -> None:
+            deadline = time.monotonic() + 5.0
+            while not predicate() and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+        def embed_job(prefix: str) -> None:
+            embedder.embed_batch(
+                [
+                    (
+                        SimpleNamespace(semantic_embedding=None),
+                        f"{prefix}{index}",
+                        "semantic_embedding",
+                    )
+                    for index in range(4)
+                ]
+            )
+
+        first_job = Thread(target=embed_job, args=("a",))
+        first_job.start()
+        wait_until(lambda: sum(len(queue) for queue in queues.values()) == 3)
+        second_job = Thread(target=embed_job, args=("b",))
+        second_job.start()
+        wait_until(lambda: sum(len(queue) for queue in queues.values()) == 7)
+        gate.set()
+        first_job.join(timeout=5.0)
+        second_job.join(timeout=5.0)
+
+        self.assertEqual(calls, ["a", "a", "b", "a", "b", "a", "b", "b"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from pgvector import HalfVector
+from sqlalchemy.dialects import postgresql
+
+from data.embedding_storage import (
+    apply_vector_storage,
+    convert_vector_storage,
+    embedding_distance,
+    embedding_present,
+    read_embedding,
+    write_embedding,
+)
+from data.schema import SQLCommit, SQLDiffHunk
+
+
+class EmbeddingStorageTests(unittest.TestCase):
+    def test_distance_reads_whichever_column_is_populated(self) -> None:
+        distance = str(
+            embedding_distance(SQLDiffHunk, "ast_embedding", [1.0, 0.0]).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        present = str(embedding_present(SQLCommit, "semantic_embedding"))
+
+        self.assertIn("coalesce(diff_hunks.ast_embedding <=>", distance)
+        self.assertIn("diff_hunks.ast_embedding_half <=>", distance)
+        self.assertIn("commits.semantic_embedding_half IS NOT NULL", present)
+
+    def test_apply_halfvec_storage_moves_embeddings_to_half_columns(self) -> None:
+        commit = SQLCommit(sha="c1", semantic_embedding=[1.0, 0.0])
+        hunk = SQLDiffHunk(semantic_embedding=[0.5, 0.5], ast_embedding=None)
+
+        apply_vector_storage([commit, hunk], "halfvec")
+
+        self.assertIsNone(commit.semantic_embedding)
+        self.assertEqual(commit.semantic_embedding_half, [1.0, 0.0])
+        self.assertEqual(hunk.semantic_embedding_half, [0.5, 0.5])
+        self.assertIsNone(hunk.ast_embedding_half)
+
+    def test_read_and_write_round_trip_half_values(self) -> None:
+        row = SimpleNamespace(semantic_embedding=None, semantic_embedding_half=None)
+        write_embedding(row, "semantic_embedding", [0.25, 0.5], "halfvec")
+        row.semantic_embedding_half = HalfVector(row.semantic_embedding_half)
+
+        self.assertEqual(read_embedding(row, "semantic_embedding"), [0.25, 0.5])
+
+        write_embedding(row, "semantic_embedding", [1.0], "vector")
+        self.assertEqual(read_embedding(row, "semantic_embedding"), [1.0])
+        self.assertIsNone(row.semantic_embedding_half)
+
+    def test_convert_rewrites_one_repo_of_the_profile(self) -> None:
+        connection = Mock()
+
+        convert_vector_storage(connection, 3, "halfvec", repo_path="/repo")
+
+        statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+        self.assertEqual(len(statements), 3)
+        self.assertIn(
+            "ast_embedding_half = COALESCE(diff_hunks.ast_embedding_half, "
+            "diff_hunks.ast_embedding::halfvec)",
+            statements[2],
+        )
+        self.assertIn("ast_embedding = NULL", statements[2])
+        self.assertIn("repos.path = :repo_path", statements[2])
+        self.assertEqual(
+            connection.execute.call_args_list[2].args[1],
+            {"embedding_profile_id": 3, "repo_path": "/repo"},
+        )
+        with self.assertRaises(ValueError):
+            convert_vector_storage(connection, 3, "int8", repo_path="/repo")
+
+
+if __name__ == "__main__":
+    unittest.main()
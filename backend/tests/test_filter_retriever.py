@@ -20,6 +20,9 @@ class EmptyMappingsResult:
 class FilterRetrieverHelperTests(unittest.TestCase):
     def setUp(self) -> None:
         self.retriever = Retriever.__new__(Retriever)
+        self.retriever.vector_indexes = None
+        self.retriever.session = Mock()
+        self.retriever.session.execute.return_value = EmptyMappingsResult()
 
     def test_preview_excerpt_centers_exact_query(self) -> None:
         preview = _build_preview_excerpt(
@@ -207,6 +210,171 @@ class FilterRetrieverHelperTests(unittest.TestCase):
         self.assertEqual(results, [])
         self.assertEqual(len(captured_sql), 3)
         self.assertTrue(all("summary" not in sql.lower() for sql in captured_sql))
+        self.assertTrue(all("preview_source" not in sql for sql in captured_sql))
+
+    def test_fetch_exact_candidates_matches_statuses_without_casting_column(self) -> None:
+        self.retriever.session = Mock()
+        captured: list = []
+
+        def execute(statement):
+            captured.append(statement)
+            return EmptyMappingsResult()
+
+        self.retriever.session.execute.side_effect = execute
+
+        self.retriever._fetch_exact_candidates(["abc123"], "RENAME")
+        self.retriever._fetch_exact_candidates(["abc123"], "src/app")
+
+        renamed_sql = str(captured[1]).lower()
+        path_sql = str(captured[4]).lower()
+        self.assertNotIn("cast(", renamed_sql)
+        self.assertIn("file_changes.status in", renamed_sql)
+        self.assertNotIn("file_changes.status in", path_sql)
+
+    def test_fetch_candidates_bound_each_source_when_limited(self) -> None:
+        self.retriever.session = Mock()
+        captured_sql: list[str] = []
+
+        def execute(statement):
+            captured_sql.append(str(statement).lower())
+            return EmptyMappingsResult()
+
+        self.retriever.session.execute.side_effect = execute
+
+        self.retriever._fetch_exact_candidates(["abc123"], "token")
+        self.retriever._fetch_exact_candidates(["abc123"], "token", limit=25)
+        self.retriever._fetch_semantic_candidates(["abc123"], [0.1, 0.2], limit=25)
+
+        self.assertTrue(all("limit" not in sql for sql in captured_sql[:3]))
+        self.assertTrue(all("order by" in sql and "limit" in sql for sql in captured_sql[3:]))
+        self.assertIn("least(", captured_sql[-1])
+
+    def test_previews_are_materialized_for_the_returned_page_only(self) -> None:
+        candidates = [
+            FilterCandidate(
+                sha="c1",
+                match_type="hunk",
+                similarity=None,
+                commit_time=300,
+                preview_kind="diff",
+                file_path="src/a.ts",
+                hunk_id=11,
+                preview_old_start=1,
+                preview_old_lines=1,
+                preview_new_start=1,
+                preview_new_lines=1,
+                exact_match=True,
+            ),
+            FilterCandidate(
+                sha="c2",
+                match_type="file_change",
+                similarity=None,
+                commit_time=200,
+                file_change_id=7,
+                file_path="src/b.ts",
+                exact_match=True,
+            ),
+            FilterCandidate(
+                sha="c3",
+                match_type="commit",
+                similarity=None,
+                commit_time=100,
+                exact_match=True,
+            ),
+        ]
+        captured_sql: list[str] = []
+
+        def execute(statement):
+            captured_sql.append(str(statement))
+            result = Mock()
+            result.all.return_value = [
+                Mock(
+                    id=11,
+                    file_change_id=5,
+                    content="-const token = false;\n+const token = true;\n",
+                ),
+                Mock(
+                    id=21,
+                    file_change_id=7,
+                    content="-old\n+new\n",
+                    old_start=4,
+                    old_lines=1,
+                    new_start=4,
+                    new_lines=1,
+                ),
+            ]
+            return result
+
+        self.retriever.session.execute.side_effect = execute
+
+        ranked_results = self.retriever._rank_candidates(candidates)
+        response = self.retriever._build_ranked_response(
+            ranked_results, "token", 2, filter_relevant=False
+        )
+
+        self.assertEqual([result["sha"] for result in response.results], ["c1", "c2"])
+        self.assertEqual(len(captured_sql), 1)
+        self.assertNotIn("commits.message", captured_sql[0])
+        self.assertIn(
+            "+const token = true;", response.results[0]["display_match"]["preview"]
+        )
+        self.assertEqual(response.results[1]["display_match"]["preview_kind"], "diff")
+        self.assertIn("+new", response.results[1]["display_match"]["preview"])
+        self.assertIsNone(ranked_results[0].display_candidate.preview_source)
+
+    def test_fused_results_reward_commits_found_by_several_sources(self) -> None:
+        candidates = [
+            FilterCandidate(
+                sha="semantic-only",
+                match_type="hunk",
+                similarity=0.01,
+                commit_time=300,
+                preview_kind="diff",
+                hunk_id=1,
+            ),
+            FilterCandidate(
+                sha="both",
+                match_type="hunk",
+                similarity=0.2,
+                commit_time=100,
+                preview_kind="diff",
+                hunk_id=2,
+            ),
+            FilterCandidate(
+                sha="both",
+                match_type="commit",
+                similarity=None,
+                commit_time=100,
+                preview_source="token in message",
+                exact_match=True,
+            ),
+            FilterCandidate(
+                sha="exact-only",
+                match_type="commit",
+                similarity=None,
+                commit_time=50,
+                preview_source="older token",
+                exact_match=True,
+            ),
+        ]
+
+        ranked_results = self.retriever._fuse_candidates(candidates)
+        response = self.retriever._build_ranked_response(
+            ranked_results, "token", 2, filter_relevant=False
+        )
+
+        self.assertEqual(
+            [item.display_candidate.sha for item in ranked_results],
+            ["both", "semantic-only", "exact-only"],
+        )
+        self.assertAlmostEqual(
+            ranked_results[0].final_score,
+            1 / (Retriever.RRF_K + 1) + 1 / (Retriever.RRF_K + 2),
+        )
+        self.assertEqual(ranked_results[0].display_candidate.match_type, "commit")
+        self.assertEqual(ranked_results[0].similarity, 0.2)
+        self.assertEqual([result["sha"] for result in response.results], ["both", "semantic-only"])
+        self.assertTrue(response.has_more_relevant)
 
     def test_build_filter_result_uses_diff_preview_for_file_change_when_diff_kind_is_set(self) -> None:
         candidate = FilterCandidate(
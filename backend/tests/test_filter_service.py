@@ -0,0 +1,105 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from api.api_model import FilterRequest
+from core.retriever import FilterExecutionResult
+from services.filter_service import FilterResultCache, FilterService
+
+
+def build_service(repo_state) -> FilterService:
+    retriever = Mock()
+    retriever.embedder = None
+    retriever.session.execute.return_value.first.return_value = repo_state
+    retriever.filter.return_value = FilterExecutionResult(
+        results=[{"sha": "c1", "similarity": 0.9, "display_match": None}],
+        total_ranked_results=1,
+        total_relevant_results=1,
+        has_more_relevant=False,
+        max_results=20,
+    )
+    service = FilterService(retriever)
+    service.result_cache = FilterResultCache()
+    return service
+
+
+class FilterServiceCacheTests(unittest.TestCase):
+    def test_repeated_query_is_served_from_cache_until_generation_changes(self) -> None:
+        service = build_service(
+            SimpleNamespace(sync_generation=4, embedding_profile_id=1)
+        )
+        request = FilterRequest(query=" token ", repo_path="/repo")
+
+        first = service.filter(request)
+        second = service.filter(FilterRequest(query="token", repo_path="/repo"))
+        service.retriever.session.execute.return_value.first.return_value = (
+            SimpleNamespace(sync_generation=5, embedding_profile_id=1)
+        )
+        service.filter(request)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second.commit_shas, ["c1"])
+        self.assertEqual(service.retriever.filter.call_count, 2)
+        self.assertEqual(service.result_cache.hits, 1)
+
+    def test_filters_and_mode_are_part_of_the_key(self) -> None:
+        service = build_service(
+            SimpleNamespace(sync_generation=1, embedding_profile_id=None)
+        )
+
+        service.filter(FilterRequest(query="token", repo_path="/repo"))
+        service.filter(
+            FilterRequest(query="token", repo_path="/repo", filters={"author": "a"})
+        )
+        service.filter(
+            FilterRequest(query="token", repo_path="/repo", search_mode="hybrid")
+        )
+
+        self.assertEqual(service.retriever.filter.call_count, 3)
+
+    def test_unknown_or_cross_repo_searches_are_not_cached(self) -> None:
+        service = build_service(None)
+
+        service.filter(FilterRequest(query="token", repo_path="/missing"))
+        service.filter(FilterRequest(query="token", repo_path="/missing"))
+        service.filter(FilterRequest(query="token"))
+
+        self.assertEqual(service.retriever.filter.call_count, 3)
+        service.retriever.session.execute.assert_called()
+        self.assertEqual(service.retriever.session.execute.call_count, 2)
+
+    def test_cursor_requests_page_through_the_retriever_without_caching(self) -> None:
+        service = build_service(
+            SimpleNamespace(sync_generation=1, embedding_profile_id=None)
+        )
+        service.retriever.filter_page.return_value = FilterExecutionResult(
+            results=[{"sha": "c2", "similarity": 0.8, "display_match": None}],
+            total_ranked_results=2,
+            total_relevant_results=2,
+            has_more_relevant=False,
+            max_results=20,
+        )
+
+        response = service.filter(
+            FilterRequest(query="token", repo_path="/repo", cursor="abc.20")
+        )
+
+        self.assertEqual(response.commit_shas, ["c2"])
+        self.assertIsNone(response.next_cursor)
+        service.retriever.filter.assert_not_called()
+        service.retriever.session.execute.assert_not_called()
+
+    def test_cache_evicts_least_recently_used_entries(self) -> None:
+        cache = FilterResultCache(cache_size=2)
+        result = Mock()
+        cache.put(("a",), result)
+        cache.put(("b",), result)
+        cache.get(("a",))
+        cache.put(("c",), result)
+
+        self.assertIsNone(cache.get(("b",)))
+        self.assertIs(cache.get(("a",)), result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from threading import Thread
+
+from services.ingest_events import IngestEventBroker
+
+
+class IngestEventBrokerTests(unittest.TestCase):
+    def test_publish_from_worker_thread_wakes_subscriber(self) -> None:
+        broker = IngestEventBroker()
+
+        async def receive():
+            with broker.subscribe("job-1") as subscription:
+                publisher = Thread(target=broker.publish, args=("job-1", "running"))
+                publisher.start()
+                publisher.join()
+                return await subscription.next(timeout=1.0)
+
+        self.assertEqual(asyncio.run(receive()), "running")
+
+    def test_slow_subscriber_receives_latest_value_only(self) -> None:
+        broker = IngestEventBroker()
+
+        async def receive():
+            with broker.subscribe("job-1") as subscription:
+                for value in ("queued", "running", "completed"):
+                    broker.publish("job-1", value)
+                await asyncio.sleep(0)
+                first = await subscription.next(timeout=1.0)
+                with self.assertRaises(asyncio.TimeoutError):
+                    await subscription.next(timeout=0.01)
+                return first
+
+        self.assertEqual(asyncio.run(receive()), "completed")
+
+    def test_closed_subscription_is_removed(self) -> None:
+        broker = IngestEventBroker()
+
+        async def subscribe_and_close():
+            with broker.subscribe("job-1"):
+                self.assertIn("job-1", broker._subscriptions)
+
+        asyncio.run(subscribe_and_close())
+
+        self.assertEqual(broker._subscriptions, {})
+        broker.publish("job-1", "running")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,15 @@
 import asyncio
 import unittest
-from unittest.mock import Mock
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
 from api.api_model import IngestRequest
-from services.ingest_service import IngestService
+from services.ingest_service import (
+    IngestJobInterrupted,
+    IngestMetrics,
+    IngestService,
+)
 
 
 class IngestJobTests(unittest.TestCase):
@@ -45,6 +51,28 @@ class IngestJobTests(unittest.TestCase):
         self.assertEqual(second_job.job_id, first_job.job_id)
         self.service._spawn_job_worker.assert_called_once()
 
+    def test_interactive_start_promotes_active_job_outside_the_jobs_lock(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project", priority="background"),
+            user_id=1,
+        )
+        scheduler = Mock()
+        # Promoting may preempt a running job, which takes the jobs lock.
+        scheduler.promote.side_effect = IngestService._preempt_job
+
+        with patch.object(IngestService, "_get_scheduler", return_value=scheduler):
+            reused_job = self.service.start_ingest_job(
+                IngestRequest(repo_path="/tmp/example-project", priority="interactive"),
+                user_id=1,
+            )
+
+        self.assertEqual(reused_job.job_id, job.job_id)
+        scheduler.promote.assert_called_once_with(job.job_id)
+        self.assertEqual(
+            IngestService._job_controls_by_id[job.job_id].stop_status, "queued"
+        )
+
     def test_wait_for_job_returns_terminal_status(self) -> None:
         self.service._spawn_job_worker = Mock()
         job = self.service.start_ingest_job(
@@ -63,9 +91,7 @@ class IngestJobTests(unittest.TestCase):
 
             marker = asyncio.create_task(mark_completed())
             try:
-                return await self.service.wait_for_job(
-                    job.job_id, poll_interval_seconds=0.001
-                )
+                return await self.service.wait_for_job(job.job_id)
             finally:
                 await marker
 
@@ -73,3 +99,387 @@ class IngestJobTests(unittest.TestCase):
 
         self.assertEqual(completed_job.status, "completed")
         self.assertEqual(completed_job.result_repo_path, "/tmp/example-project")
+
+    def test_status_transitions_are_persisted_and_reloaded(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        stored_rows = {}
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.get.side_effect = lambda model, job_id: stored_rows.get(job_id)
+        session.add.side_effect = lambda row: stored_rows.__setitem__(row.id, row)
+
+        with patch("infrastructure.db.SessionLocal", Mock(return_value=session)):
+            job = self.service.start_ingest_job(
+                IngestRequest(repo_path="/tmp/example-project"),
+                user_id=1,
+            )
+            IngestService._update_job(
+                job.job_id,
+                status="completed",
+                result_repo_path=job.repo_path,
+                completed_at=datetime.utcnow(),
+            )
+            IngestService.reset_runtime_state()
+            reloaded_job = IngestService.get_job(job.job_id)
+
+        row = stored_rows[job.job_id]
+        self.assertEqual(row.request_payload["progress_id"], job.job_id)
+        self.assertEqual(reloaded_job.status, "completed")
+        self.assertEqual(reloaded_job.result_repo_path, "/tmp/example-project")
+        self.assertEqual(reloaded_job.progress.label, "Queued repository sync")
+
+    def test_resume_interrupted_jobs_respawns_running_jobs(self) -> None:
+        now = datetime.utcnow()
+        row = SimpleNamespace(
+            id="job-1",
+            repo_path="/tmp/example-project",
+            user_id=1,
+            status="running",
+            request_payload=IngestRequest(
+                repo_path="/tmp/example-project",
+                progress_id="job-1",
+            ).model_dump(),
+            result_repo_path=None,
+            error=None,
+            progress=None,
+            checkpoint={"windows_completed": 2, "window_count": 4},
+            started_at=now,
+            updated_at=now,
+            completed_at=None,
+        )
+        self.service.session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            row
+        ]
+        self.service._spawn_job_worker = Mock()
+
+        resumed_jobs = self.service.resume_interrupted_jobs()
+
+        self.assertEqual([job.job_id for job in resumed_jobs], ["job-1"])
+        job_id, request, user_id = self.service._spawn_job_worker.call_args.args
+        self.assertEqual(job_id, "job-1")
+        self.assertEqual(request.progress_id, "job-1")
+        self.assertEqual(user_id, 1)
+        job = IngestService.get_job("job-1")
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.checkpoint["windows_completed"], 2)
+        self.assertEqual(job.progress.label, "Resuming repository sync")
+
+    def test_checkpoint_window_commits_and_records_progress(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"),
+            user_id=1,
+        )
+        request = IngestRequest(repo_path=job.repo_path, progress_id=job.job_id)
+        metrics = IngestMetrics(semantic_work_items=7, ast_work_items=3)
+
+        self.service._checkpoint_window(
+            request=request,
+            window_index=0,
+            window_count=2,
+            persisted_commits=250,
+            total_commits=400,
+            metrics=metrics,
+        )
+        self.service._checkpoint_window(
+            request=request,
+            window_index=1,
+            window_count=2,
+            persisted_commits=400,
+            total_commits=400,
+            metrics=metrics,
+        )
+
+        self.service.session.commit.assert_called_once()
+        checkpoint = IngestService.get_job(job.job_id).checkpoint
+        self.assertEqual(checkpoint["windows_completed"], 1)
+        self.assertEqual(checkpoint["commits_written"], 250)
+        self.assertEqual(checkpoint["embeddings_stored"], 10)
+
+    def test_windowed_progress_is_monotonic_across_windows(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"),
+            user_id=1,
+        )
+        stages = [(15.0, 15.0), (30.0, 55.0), (85.0, 15.0)]
+        percents = []
+        for window_index in range(3):
+            self.service._progress_window = (window_index, 3)
+            for stage_start, stage_weight in stages:
+                for stage_percent in (0.0, 1.0):
+                    self.service._set_progress(
+                        progress_id=job.job_id,
+                        repo_path=job.repo_path,
+                        phase="embedding",
+                        label="Generating embeddings",
+                        stage_percent=stage_percent,
+                        stage_start_percent=stage_start,
+                        stage_weight=stage_weight,
+                    )
+                    percents.append(IngestService.get_progress(job.job_id).percent)
+
+        self.assertEqual(percents, sorted(percents))
+        self.assertAlmostEqual(percents[0], 15.0)
+        self.assertAlmostEqual(percents[-1], 100.0)
+
+    def test_cancel_job_stops_worker_and_frees_repo_slot(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"),
+            user_id=1,
+        )
+        control = IngestService._job_controls_by_id[job.job_id]
+
+        cancelled_job = self.service.cancel_job(job.job_id)
+        next_job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project", max_commits=10),
+            user_id=1,
+        )
+
+        self.assertEqual(cancelled_job.status, "cancelled")
+        self.assertIsNotNone(cancelled_job.completed_at)
+        self.assertTrue(control.is_stop_requested())
+        self.assertNotEqual(next_job.job_id, job.job_id)
+        self.assertEqual(self.service._spawn_job_worker.call_count, 2)
+
+    def test_cancel_job_raises_for_unknown_job(self) -> None:
+        with self.assertRaises(ValueError):
+            self.service.cancel_job("missing-job")
+
+    def test_interrupted_window_is_committed_before_stopping(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"),
+            user_id=1,
+        )
+        self.service._job_control = IngestService._job_controls_by_id[job.job_id]
+        self.service.pause_job(job.job_id)
+
+        with self.assertRaises(IngestJobInterrupted) as raised:
+            self.service._checkpoint_window(
+                request=IngestRequest(repo_path=job.repo_path, progress_id=job.job_id),
+                window_index=0,
+                window_count=3,
+                persisted_commits=250,
+                total_commits=600,
+                metrics=IngestMetrics(),
+            )
+
+        self.assertEqual(raised.exception.status, "paused")
+        self.service.session.commit.assert_called_once()
+        self.assertEqual(
+            IngestService.get_job(job.job_id).checkpoint["windows_completed"], 1
+        )
+
+    def test_interrupted_window_vectors_are_published_once(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"),
+            user_id=1,
+        )
+        self.service._job_control = IngestService._job_controls_by_id[job.job_id]
+        self.service.pause_job(job.job_id)
+        plan = SimpleNamespace(
+            mode="incremental",
+            normalized_repo_path=job.repo_path,
+            missing_commit_shas={"c1", "c2", "c3"},
+        )
+
+        with patch("services.ingest_service.DEFAULT_VECTOR_INDEXES") as indexes:
+            with self.assertRaises(IngestJobInterrupted):
+                self.service._checkpoint_window(
+                    request=IngestRequest(repo_path=job.repo_path, progress_id=job.job_id),
+                    window_index=0,
+                    window_count=2,
+                    persisted_commits=2,
+                    total_commits=3,
+                    metrics=IngestMetrics(),
+                    plan=plan,
+                    window_commit_shas=["c1", "c2"],
+                )
+            self.service._refresh_vector_index(
+                job.repo_path, mode="incremental", commit_shas=plan.missing_commit_shas
+            )
+
+        appended = [call.args[2] for call in indexes.append_commits.call_args_list]
+        self.assertEqual(appended, [{"c1", "c2"}, {"c3"}])
+        indexes.drop.assert_not_called()
+
+    def test_checkpoint_commit_bumps_repo_sync_generation(self) -> None:
+        plan = SimpleNamespace(
+            mode="full_rebuild",
+            normalized_repo_path="/tmp/example-project",
+            missing_commit_shas={"c1", "c2"},
+        )
+
+        with patch("services.ingest_service.DEFAULT_VECTOR_INDEXES"):
+            self.service._checkpoint_window(
+                request=IngestRequest(repo_path=plan.normalized_repo_path),
+                window_index=0,
+                window_count=2,
+                persisted_commits=1,
+                total_commits=2,
+                metrics=IngestMetrics(),
+                plan=plan,
+                window_commit_shas=["c1"],
+            )
+
+        statement = str(self.service.session.execute.call_args.args[0])
+        self.assertIn("UPDATE repos SET sync_generation=", statement)
+        self.service.session.commit.assert_called_once()
+
+    def test_vector_storage_conversion_runs_per_repo_outside_ingest(self) -> None:
+        profile = SimpleNamespace(id=3, vector_storage="vector", updated_at=None)
+        repos = [SimpleNamespace(path="/repo-a"), SimpleNamespace(path="/repo-b")]
+        session = Mock()
+        session.query.side_effect = lambda model: Mock(
+            filter=Mock(
+                return_value=Mock(
+                    first=Mock(return_value=profile), all=Mock(return_value=repos)
+                )
+            )
+        )
+        service = IngestService(
+            session=session,
+            embedder=Mock(profile_fingerprint="fp", vector_storage="halfvec"),
+        )
+
+        with (
+            patch("services.ingest_service.convert_vector_storage") as convert,
+            patch("services.ingest_service.DEFAULT_VECTOR_INDEXES") as indexes,
+        ):
+            service.convert_configured_vector_storage()
+
+        self.assertEqual(
+            [call.kwargs["repo_path"] for call in convert.call_args_list],
+            ["/repo-a", "/repo-b"],
+        )
+        self.assertEqual(
+            [call.args[0] for call in indexes.drop.call_args_list],
+            ["/repo-a", "/repo-b"],
+        )
+        bumps = [str(call.args[0]) for call in session.execute.call_args_list]
+        self.assertEqual(len(bumps), 2)
+        self.assertIn("UPDATE repos SET sync_generation=", bumps[0])
+        self.assertEqual(session.commit.call_count, 3)
+        self.assertEqual(profile.vector_storage, "halfvec")
+
+    def test_interrupted_final_window_rolls_back_instead_of_committing(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"),
+            user_id=1,
+        )
+        self.service._job_control = IngestService._job_controls_by_id[job.job_id]
+        self.service.cancel_job(job.job_id)
+
+        with self.assertRaises(IngestJobInterrupted):
+            self.service._checkpoint_window(
+                request=IngestRequest(repo_path=job.repo_path, progress_id=job.job_id),
+                window_index=2,
+                window_count=3,
+                persisted_commits=600,
+                total_commits=600,
+                metrics=IngestMetrics(),
+            )
+
+        self.service.session.commit.assert_not_called()
+
+    def test_paused_job_resumes_with_same_job_id(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project", max_commits=20),
+            user_id=1,
+        )
+
+        paused_job = self.service.pause_job(job.job_id)
+        resumed_job = self.service.resume_job(job.job_id)
+
+        self.assertEqual(paused_job.status, "paused")
+        self.assertIsNone(paused_job.completed_at)
+        self.assertEqual(resumed_job.job_id, job.job_id)
+        self.assertEqual(resumed_job.status, "queued")
+        job_id, request, user_id = self.service._spawn_job_worker.call_args.args
+        self.assertEqual(job_id, job.job_id)
+        self.assertEqual(request.max_commits, 20)
+        self.assertFalse(
+            IngestService._job_controls_by_id[job.job_id].is_stop_requested()
+        )
+
+    def test_resume_during_pause_waits_for_the_running_worker_to_exit(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"), user_id=1
+        )
+        worker_request = self.service._spawn_job_worker.call_args.args[1]
+        original_control = IngestService._job_controls_by_id[job.job_id]
+        statuses_while_running = []
+
+        def paused_sync(worker_service, request, user_id):
+            self.service.pause_job(job.job_id)
+            resumed_job = self.service.resume_job(job.job_id)
+            statuses_while_running.append(resumed_job.status)
+            self.assertEqual(self.service._spawn_job_worker.call_count, 1)
+            self.assertIs(IngestService._job_controls_by_id[job.job_id], original_control)
+            worker_service._check_interrupt()
+
+        with patch("infrastructure.db.SessionLocal", MagicMock()), patch.object(
+            IngestService,
+            "_ingest_repo_sync",
+            autospec=True,
+            side_effect=paused_sync,
+        ):
+            self.service._run_job_worker(job.job_id, worker_request, 1)
+
+        self.assertEqual(statuses_while_running, ["queued"])
+        self.assertEqual(self.service._spawn_job_worker.call_count, 2)
+        self.assertEqual(IngestService.get_job(job.job_id).status, "queued")
+        self.assertFalse(
+            IngestService._job_controls_by_id[job.job_id].is_stop_requested()
+        )
+
+    def test_stale_queue_entry_does_not_run_a_resumed_job(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        job = self.service.start_ingest_job(
+            IngestRequest(repo_path="/tmp/example-project"), user_id=1
+        )
+        worker_request = self.service._spawn_job_worker.call_args.args[1]
+        stale_control = IngestService._job_controls_by_id[job.job_id]
+        self.service.pause_job(job.job_id)
+        self.service.resume_job(job.job_id)
+
+        with patch.object(IngestService, "_ingest_repo_sync") as sync, patch(
+            "infrastructure.db.SessionLocal", MagicMock()
+        ):
+            self.service._run_job_worker(job.job_id, worker_request, 1, stale_control)
+
+        sync.assert_not_called()
+        self.assertEqual(IngestService.get_job(job.job_id).status, "queued")
+
+    def test_preempted_job_is_requeued_with_a_fresh_control(self) -> None:
+        self.service._spawn_job_worker = Mock()
+        request = IngestRequest(repo_path="/tmp/example-project", priority="background")
+        job = self.service.start_ingest_job(request, user_id=1)
+        worker_request = self.service._spawn_job_worker.call_args.args[1]
+        original_control = IngestService._job_controls_by_id[job.job_id]
+
+        def preempted_sync(worker_service, request, user_id):
+            self.assertTrue(IngestService._preempt_job(job.job_id))
+            worker_service._check_interrupt()
+
+        with patch("infrastructure.db.SessionLocal", MagicMock()), patch.object(
+            IngestService,
+            "_ingest_repo_sync",
+            autospec=True,
+            side_effect=preempted_sync,
+        ):
+            self.service._run_job_worker(job.job_id, worker_request, 1)
+
+        self.assertEqual(original_control.stop_status, "queued")
+        self.assertEqual(IngestService.get_job(job.job_id).status, "queued")
+        self.assertEqual(self.service._spawn_job_worker.call_count, 2)
+        self.assertIsNot(IngestService._job_controls_by_id[job.job_id], original_control)
+        self.assertEqual(
+            self.service._spawn_job_worker.call_args.args[1].priority, "background"
+        )
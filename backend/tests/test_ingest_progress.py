@@ -0,0 +1,66 @@
+import unittest
+
+from services.ingest_progress import ThrottledProgressReporter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ThrottledProgressReporterTests(unittest.TestCase):
+    def test_publishes_every_unit_step_and_final_unit(self) -> None:
+        published: list[int] = []
+        reporter = ThrottledProgressReporter(
+            published.append,
+            total_units=1000,
+            min_interval_seconds=60.0,
+            publish_steps=10,
+            clock=FakeClock(),
+        )
+
+        for _ in range(1000):
+            reporter.advance()
+
+        self.assertEqual(published, list(range(100, 1001, 100)))
+
+    def test_publishes_when_interval_elapses(self) -> None:
+        published: list[int] = []
+        clock = FakeClock()
+        reporter = ThrottledProgressReporter(
+            published.append,
+            total_units=1000,
+            min_interval_seconds=0.1,
+            publish_steps=1,
+            clock=clock,
+        )
+
+        reporter.advance()
+        clock.now = 0.05
+        reporter.advance()
+        clock.now = 0.2
+        reporter.advance()
+
+        self.assertEqual(published, [3])
+
+    def test_flush_publishes_pending_units_once(self) -> None:
+        published: list[int] = []
+        reporter = ThrottledProgressReporter(
+            published.append,
+            total_units=1000,
+            min_interval_seconds=60.0,
+            clock=FakeClock(),
+        )
+
+        reporter.update(3)
+        reporter.flush()
+        reporter.flush()
+
+        self.assertEqual(published, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from threading import Event, Lock
+
+from services.ingest_scheduler import IngestJobScheduler
+
+
+class IngestJobSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.order: list[str] = []
+        self.order_lock = Lock()
+        self.release_blocker = Event()
+        self.blocker_started = Event()
+
+    def tearDown(self) -> None:
+        self.release_blocker.set()
+
+    def record(self, name: str, done: Event | None = None):
+        def run() -> None:
+            with self.order_lock:
+                self.order.append(name)
+            if done is not None:
+                done.set()
+
+        return run
+
+    def blocking_job(self) -> None:
+        self.blocker_started.set()
+        self.release_blocker.wait(timeout=5.0)
+
+    def test_worker_limit_queues_jobs_until_a_worker_is_free(self) -> None:
+        scheduler = IngestJobScheduler(max_workers=1)
+        finished = Event()
+
+        scheduler.submit("blocker", self.blocking_job)
+        self.assertTrue(self.blocker_started.wait(timeout=1.0))
+        scheduler.submit("queued", self.record("queued", finished))
+
+        self.assertEqual(scheduler.running_job_ids(), ["blocker"])
+        self.assertEqual(scheduler.queued_job_ids(), ["queued"])
+        self.release_blocker.set()
+        self.assertTrue(finished.wait(timeout=1.0))
+        self.assertEqual(self.order, ["queued"])
+
+    def test_interactive_jobs_run_before_earlier_background_jobs(self) -> None:
+        scheduler = IngestJobScheduler(max_workers=1)
+        finished = Event()
+
+        scheduler.submit("blocker", self.blocking_job)
+        self.assertTrue(self.blocker_started.wait(timeout=1.0))
+        scheduler.submit("background", self.record("background", finished), priority="background")
+        scheduler.submit("interactive", self.record("interactive"))
+        self.release_blocker.set()
+
+        self.assertTrue(finished.wait(timeout=1.0))
+        self.assertEqual(self.order, ["interactive", "background"])
+
+    def test_interactive_job_preempts_running_background_job(self) -> None:
+        preempted: list[str] = []
+        scheduler = IngestJobScheduler(
+            max_workers=1,
+            preempt=lambda job_id: preempted.append(job_id) or True,
+        )
+
+        scheduler.submit("background", self.blocking_job, priority="background")
+        self.assertTrue(self.blocker_started.wait(timeout=1.0))
+        scheduler.submit("interactive", self.record("interactive"))
+        scheduler.submit("interactive-2", self.record("interactive-2"))
+
+        self.assertEqual(preempted, ["background"])
+
+    def test_promote_moves_queued_background_job_ahead(self) -> None:
+        scheduler = IngestJobScheduler(max_workers=1)
+        scheduler.submit("blocker", self.blocking_job)
+        self.assertTrue(self.blocker_started.wait(timeout=1.0))
+        scheduler.submit("first", self.record("first"), priority="background")
+        scheduler.submit("second", self.record("second"), priority="background")
+
+        scheduler.promote("second")
+
+        self.assertEqual(scheduler.queued_job_ids(), ["second", "first"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,13 @@ import unittest
 from types import SimpleNamespace
 from unittest.mock import Mock
 
-from core.repo import BranchState, DETACHED_HEAD_BRANCH_NAME, Repo
+from core.repo import (
+    BranchState,
+    DETACHED_HEAD_BRANCH_NAME,
+    IngestSkipPolicy,
+    Repo,
+    compute_branch_heads_fingerprint,
+)
 from services.ingest_service import IngestService
 
 
@@ -73,6 +79,7 @@ class LocalRepoIngestTests(unittest.TestCase):
                 reindex_required=False,
                 indexed_context_lines=3,
                 indexed_max_commits=50,
+                branch_heads_fingerprint=None,
             )
         )
         service._get_stored_branch_states = Mock(
@@ -111,6 +118,7 @@ class LocalRepoIngestTests(unittest.TestCase):
                 reindex_required=False,
                 indexed_context_lines=3,
                 indexed_max_commits=50,
+                branch_heads_fingerprint=None,
             )
         )
         service._get_stored_branch_states = Mock(
@@ -161,6 +169,7 @@ class LocalRepoIngestTests(unittest.TestCase):
                 reindex_required=False,
                 indexed_context_lines=3,
                 indexed_max_commits=1,
+                branch_heads_fingerprint=None,
             )
         )
         service._get_stored_branch_states = Mock(
@@ -193,6 +202,103 @@ class LocalRepoIngestTests(unittest.TestCase):
 
         self.assertTrue(should_reindex)
 
+    def test_should_reindex_skips_planning_when_branch_heads_fingerprint_matches(
+        self,
+    ) -> None:
+        service = self.build_service()
+        _, branch_heads = Repo.get_branch_heads(self.repo_dir)
+        service._get_repo_row = Mock(
+            return_value=SimpleNamespace(
+                embedding_profile=None,
+                reindex_required=False,
+                indexed_context_lines=3,
+                indexed_max_commits=50,
+                branch_heads_fingerprint=compute_branch_heads_fingerprint(
+                    branch_heads
+                ),
+            )
+        )
+        service.plan_repo_sync = Mock()
+
+        should_reindex = service.should_reindex(
+            self.repo_dir,
+            max_commits=50,
+            context_lines=3,
+        )
+
+        self.assertFalse(should_reindex)
+        service.plan_repo_sync.assert_not_called()
+
+    def test_should_reindex_plans_sync_when_branch_heads_fingerprint_is_stale(
+        self,
+    ) -> None:
+        service = self.build_service()
+        _, branch_heads = Repo.get_branch_heads(self.repo_dir)
+        create_commit(self.repo_dir, "README.md", "hello again\n", "Update readme")
+        service._get_repo_row = Mock(
+            return_value=SimpleNamespace(
+                embedding_profile=None,
+                reindex_required=False,
+                indexed_context_lines=3,
+                indexed_max_commits=50,
+                branch_heads_fingerprint=compute_branch_heads_fingerprint(
+                    branch_heads
+                ),
+            )
+        )
+        service.plan_repo_sync = Mock(return_value=SimpleNamespace(mode="incremental"))
+
+        should_reindex = service.should_reindex(
+            self.repo_dir,
+            max_commits=50,
+            context_lines=3,
+        )
+
+        self.assertTrue(should_reindex)
+        service.plan_repo_sync.assert_called_once()
+
+    def test_load_commits_stores_placeholders_for_skipped_files(self) -> None:
+        write_file(os.path.join(self.repo_dir, "package-lock.json"), "{}\n")
+        write_file(os.path.join(self.repo_dir, "fixture.txt"), "row\n" * 200)
+        write_file(os.path.join(self.repo_dir, "app.py"), "print('hi')\n")
+        with open(os.path.join(self.repo_dir, "logo.dat"), "wb") as handle:
+            handle.write(b"\x89PNG\x00\x01")
+        run_git(self.repo_dir, "add", ".")
+        run_git(self.repo_dir, "commit", "-m", "Add assets")
+        head_sha = run_git(self.repo_dir, "rev-parse", "HEAD")
+
+        _, commits = Repo.load_commits(
+            self.repo_dir,
+            [head_sha],
+            skip_policy=IngestSkipPolicy(max_hunk_bytes=256),
+        )
+
+        changes = {
+            file_change.new_path: file_change
+            for file_change in commits[head_sha].file_changes
+        }
+        self.assertEqual(changes["package-lock.json"].skip_reason, "excluded")
+        self.assertEqual(changes["logo.dat"].skip_reason, "binary")
+        self.assertEqual(changes["fixture.txt"].skip_reason, "hunk_too_large")
+        for path in ("package-lock.json", "logo.dat", "fixture.txt"):
+            self.assertEqual(changes[path].hunks, [])
+            self.assertEqual(changes[path].snapshot.content, "")
+        self.assertIsNone(changes["app.py"].skip_reason)
+        self.assertEqual(changes["app.py"].snapshot.content, "print('hi')\n")
+
+    def test_skip_policy_matches_vendored_paths_and_blob_size(self) -> None:
+        policy = IngestSkipPolicy(max_blob_bytes=10)
+
+        self.assertTrue(policy.is_excluded("node_modules/react/index.js"))
+        self.assertTrue(policy.is_excluded("web/static/app.min.js"))
+        self.assertFalse(policy.is_excluded("src/vendored.py"))
+        delta = SimpleNamespace(
+            new_file=SimpleNamespace(path="data.csv", size=11),
+            old_file=SimpleNamespace(path="data.csv", size=0),
+            is_binary=False,
+        )
+        self.assertEqual(policy.skip_reason(delta), "blob_too_large")
+
     def test_detached_head_uses_synthetic_branch_view(self) -> None:
         head_sha = run_git(self.repo_dir, "rev-parse", "HEAD")
         run_git(self.repo_dir, "checkout", head_sha)
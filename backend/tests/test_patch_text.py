@@ -0,0 +1,97 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+import pygit2
+
+from core.patch_text import (
+    _hunk_text_from_lines,
+    build_patch_hunks,
+    patch_line_counts,
+    split_patch_hunk_bodies,
+)
+
+
+def run_git(cwd: str, *args: str) -> str:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "GitOdyssey",
+        "GIT_AUTHOR_EMAIL": "gitodyssey@example.com",
+        "GIT_COMMITTER_NAME": "GitOdyssey",
+        "GIT_COMMITTER_EMAIL": "gitodyssey@example.com",
+    }
+    completed = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return completed.stdout.strip()
+
+
+class PatchTextTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.repo_dir = os.path.realpath(self.tempdir.name)
+        run_git(self.repo_dir, "init")
+        self.write("module.py", "".join(f"line {index}\n" for index in range(40)))
+        run_git(self.repo_dir, "add", ".")
+        run_git(self.repo_dir, "commit", "-m", "Initial commit")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def write(self, name: str, content: str) -> None:
+        with open(os.path.join(self.repo_dir, name), "w", encoding="utf-8") as handle:
+            handle.write(content)
+
+    def head_patch(self) -> pygit2.Patch:
+        repo = pygit2.Repository(self.repo_dir)
+        commit = repo.revparse_single("HEAD")
+        return next(iter(repo.diff(commit.parents[0], commit, context_lines=2)))
+
+    def test_patch_hunks_match_per_line_assembly(self) -> None:
+        lines = [f"line {index}\n" for index in range(40)]
+        lines[3] = "changed 3 – ünïcode\n"
+        lines[30] = "changed 30\n"
+        lines.insert(31, "@@ not a header\n")
+        self.write("module.py", "".join(lines))
+        run_git(self.repo_dir, "commit", "-am", "Edit two regions")
+        patch = self.head_patch()
+
+        hunks = build_patch_hunks(patch, "abc")
+
+        self.assertEqual(len(hunks), 2)
+        self.assertEqual(
+            [hunk.content for hunk in hunks],
+            [_hunk_text_from_lines(hunk) for hunk in patch.hunks],
+        )
+        self.assertEqual((hunks[1].old_start, hunks[1].new_start), (29, 29))
+        self.assertEqual(patch_line_counts(patch), (3, 2))
+
+    def test_oversized_hunk_returns_none(self) -> None:
+        self.write("module.py", "x" * 500 + "\n")
+        run_git(self.repo_dir, "commit", "-am", "Replace file")
+
+        self.assertIsNone(
+            build_patch_hunks(self.head_patch(), "abc", max_hunk_bytes=100)
+        )
+
+    def test_split_ignores_file_headers(self) -> None:
+        patch_data = (
+            b"diff --git a/f b/f\n--- a/f\n+++ b/f\n"
+            b"@@ -1 +1 @@\n-a\n+b\n"
+            b"@@ -9 +9 @@ def f():\n-c\n\\ No newline at end of file\n+d\n"
+        )
+
+        self.assertEqual(
+            split_patch_hunk_bodies(patch_data),
+            [b"-a\n+b\n", b"-c\n\\ No newline at end of file\n+d\n"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import Mock
+
+from core.ranked_results import RankedResultHandles, decode_cursor, encode_cursor
+from core.retriever import FilterCandidate, FilterExecutionResult, Retriever
+
+
+def exact_candidate(index: int) -> FilterCandidate:
+    return FilterCandidate(
+        sha=f"c{index}",
+        match_type="hunk",
+        similarity=None,
+        commit_time=1_000 - index,
+        preview_source=f"+const token{index} = true;\n",
+        preview_kind="diff",
+        file_path=f"src/{index}.ts",
+        hunk_id=index,
+        new_start=1,
+        old_start=1,
+        preview_old_start=1,
+        preview_old_lines=0,
+        preview_new_start=1,
+        preview_new_lines=1,
+        exact_match=True,
+    )
+
+
+class RankedResultHandleTests(unittest.TestCase):
+    def test_handles_expire_and_are_bounded(self) -> None:
+        now = [0.0]
+        handles = RankedResultHandles(
+            ttl_seconds=10, max_handles=2, max_results_per_handle=3, clock=lambda: now[0]
+        )
+        first = handles.create(
+            ("a",), "q", [1, 2, 3, 4], total_ranked_results=4, total_relevant_results=4
+        )
+        second = handles.create(
+            ("b",), "q", [], total_ranked_results=0, total_relevant_results=0
+        )
+        third = handles.create(
+            ("c",), "q", [], total_ranked_results=0, total_relevant_results=0
+        )
+
+        self.assertIsNone(handles.get(first, ("a",)))
+        self.assertIsNone(handles.get(second, ("other",)))
+        self.assertIsNotNone(handles.get(second, ("b",)))
+        now[0] = 11.0
+        self.assertIsNone(handles.get(third, ("c",)))
+
+        capped = handles.create(
+            ("a",), "q", [1, 2, 3, 4], total_ranked_results=4, total_relevant_results=4
+        )
+        self.assertEqual(handles.get(capped, ("a",)).items, (1, 2, 3))
+
+    def test_cursor_round_trip_rejects_malformed_values(self) -> None:
+        self.assertEqual(decode_cursor(encode_cursor("abc", 20)), ("abc", 20))
+        self.assertIsNone(decode_cursor("abc"))
+        self.assertIsNone(decode_cursor("abc.-1"))
+
+
+class FilterPageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.retriever = Retriever.__new__(Retriever)
+        self.retriever.vector_indexes = None
+        self.retriever.ranked_result_handles = RankedResultHandles()
+        self.retriever.session = Mock()
+        self.retriever.session.execute.return_value.scalar.return_value = 3
+        self.ranked = self.retriever._rank_candidates(
+            [exact_candidate(index) for index in range(5)]
+        )
+        self.expected_shas = [item.display_candidate.sha for item in self.ranked]
+        self.first_page = self.retriever._build_ranked_response(
+            self.ranked,
+            "token",
+            2,
+            filter_relevant=False,
+            request_key=self.retriever._filter_request_key(
+                "token", {}, "/repo", "ranked"
+            ),
+        )
+
+    def test_pages_are_sliced_from_the_ranked_handle(self) -> None:
+        self.retriever._rank_candidates = Mock(side_effect=AssertionError("re-ranked"))
+
+        second_page = self.retriever.filter_page(
+            "token", {}, "/repo", 2, self.first_page.next_cursor
+        )
+        last_page = self.retriever.filter_page(
+            "token", {}, "/repo", 2, second_page.next_cursor
+        )
+
+        self.assertEqual(
+            [result["sha"] for result in self.first_page.results], self.expected_shas[:2]
+        )
+        self.assertEqual(
+            [result["sha"] for result in second_page.results], self.expected_shas[2:4]
+        )
+        self.assertTrue(second_page.has_more_relevant)
+        self.assertEqual(
+            [result["sha"] for result in last_page.results], self.expected_shas[4:]
+        )
+        self.assertFalse(last_page.has_more_relevant)
+        self.assertIsNone(last_page.next_cursor)
+        self.assertEqual(last_page.total_relevant_results, 5)
+
+    def test_unknown_cursor_recomputes_through_the_requested_page(self) -> None:
+        self.retriever.filter = Mock(
+            return_value=FilterExecutionResult(
+                results=[{"sha": sha} for sha in self.expected_shas[:4]],
+                total_ranked_results=5,
+                total_relevant_results=5,
+                has_more_relevant=True,
+                max_results=4,
+                next_cursor="fresh.4",
+            )
+        )
+
+        page = self.retriever.filter_page(
+            "token", {"author": "a"}, "/repo", 2, self.first_page.next_cursor
+        )
+
+        self.retriever.filter.assert_called_once_with(
+            "token", {"author": "a"}, "/repo", 4, search_mode="ranked"
+        )
+        self.assertEqual([result["sha"] for result in page.results], self.expected_shas[2:4])
+        self.assertEqual(page.next_cursor, "fresh.4")
+
+    def test_sync_after_the_first_page_recomputes_instead_of_slicing(self) -> None:
+        self.retriever.session.execute.return_value.scalar.return_value = 4
+        self.retriever.filter = Mock(
+            return_value=FilterExecutionResult(
+                results=[{"sha": sha} for sha in self.expected_shas[:4]],
+                total_ranked_results=5,
+                total_relevant_results=5,
+                has_more_relevant=True,
+                max_results=4,
+            )
+        )
+
+        self.retriever.filter_page("token", {}, "/repo", 2, self.first_page.next_cursor)
+
+        self.retriever.filter.assert_called_once()
+        statement = str(self.retriever.session.execute.call_args.args[0])
+        self.assertIn("max(repos.sync_generation)", statement)
+
+
+if __name__ == "__main__":
+    unittest.main()
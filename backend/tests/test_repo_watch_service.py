@@ -0,0 +1,129 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from services.repo_watch_service import RepoRefsWatcher, WatchedRepo
+
+
+def run_git(cwd: str, *args: str) -> str:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "GitOdyssey",
+        "GIT_AUTHOR_EMAIL": "gitodyssey@example.com",
+        "GIT_COMMITTER_NAME": "GitOdyssey",
+        "GIT_COMMITTER_EMAIL": "gitodyssey@example.com",
+    }
+    completed = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return completed.stdout.strip()
+
+
+def create_commit(repo_dir: str, content: str, message: str) -> None:
+    with open(os.path.join(repo_dir, "README.md"), "w", encoding="utf-8") as handle:
+        handle.write(content)
+    run_git(repo_dir, "add", "README.md")
+    run_git(repo_dir, "commit", "-m", message)
+
+
+class RepoRefsWatcherTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.repo_dir = os.path.realpath(self.tempdir.name)
+        run_git(self.repo_dir, "init")
+        run_git(self.repo_dir, "checkout", "-b", "main")
+        create_commit(self.repo_dir, "hello\n", "Initial commit")
+
+        self.watcher = RepoRefsWatcher(
+            embedder_factory=lambda: None,
+            debounce_seconds=1.0,
+        )
+        self.watcher._load_watched_repos = Mock(
+            return_value={
+                self.repo_dir: WatchedRepo(
+                    repo_path=self.repo_dir,
+                    user_id=1,
+                    max_commits=50,
+                    context_lines=10,
+                )
+            }
+        )
+        self.watcher._enqueue_sync = Mock(return_value=True)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_unchanged_refs_do_not_enqueue_sync(self) -> None:
+        self.watcher.poll_once(now=0.0)
+        queued = self.watcher.poll_once(now=5.0)
+
+        self.assertEqual(queued, [])
+        self.watcher._enqueue_sync.assert_not_called()
+
+    def test_ref_change_is_debounced_before_enqueueing_sync(self) -> None:
+        self.watcher.poll_once(now=0.0)
+        create_commit(self.repo_dir, "hello again\n", "Update readme")
+
+        self.assertEqual(self.watcher.poll_once(now=1.0), [])
+        self.assertEqual(self.watcher.poll_once(now=1.5), [])
+        queued = self.watcher.poll_once(now=2.0)
+
+        self.assertEqual(queued, [self.repo_dir])
+        self.watcher._enqueue_sync.assert_called_once()
+        self.assertEqual(self.watcher.poll_once(now=10.0), [])
+
+    def test_linked_worktree_watches_refs_in_the_common_git_dir(self) -> None:
+        worktree_dir = os.path.join(self.repo_dir, "worktree")
+        run_git(self.repo_dir, "worktree", "add", "-b", "feature", worktree_dir)
+        watcher = RepoRefsWatcher(
+            embedder_factory=lambda: None,
+            debounce_seconds=1.0,
+        )
+        watcher._load_watched_repos = Mock(
+            return_value={
+                worktree_dir: WatchedRepo(
+                    repo_path=worktree_dir,
+                    user_id=1,
+                    max_commits=50,
+                    context_lines=10,
+                )
+            }
+        )
+        watcher._enqueue_sync = Mock(return_value=True)
+
+        watcher.poll_once(now=0.0)
+        # Branch refs of a linked worktree live in the main repo's git dir.
+        create_commit(self.repo_dir, "hello from main\n", "Update main")
+
+        self.assertEqual(watcher.poll_once(now=1.0), [])
+        self.assertEqual(watcher.poll_once(now=2.0), [worktree_dir])
+
+    def test_enqueue_sync_skips_job_when_index_is_current(self) -> None:
+        watcher = RepoRefsWatcher(
+            embedder_factory=lambda: None,
+            session_factory=MagicMock(),
+        )
+        watched_repo = WatchedRepo(
+            repo_path=self.repo_dir,
+            user_id=1,
+            max_commits=50,
+            context_lines=10,
+        )
+
+        with patch("services.repo_watch_service.IngestService") as service_cls:
+            service_cls.return_value.should_reindex.return_value = False
+            queued = watcher._enqueue_sync(watched_repo)
+
+        self.assertFalse(queued)
+        service_cls.return_value.start_ingest_job.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
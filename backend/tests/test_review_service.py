@@ -12,6 +12,7 @@ from infrastructure.errors import AIRequestError
 from services.review_service import (
     EMPTY_TREE_SHA,
     MAX_REVIEW_FILES,
+    OMITTED_CONTEXT_TEXT,
     ReviewCompareService,
     ReviewGenerationService,
     ReviewServiceError,
@@ -355,6 +356,32 @@ class ReviewGenerationServiceTests(unittest.TestCase):
 
         self.assertTrue(report.partial)
 
+    def test_generate_packs_review_context_into_the_token_budget(self) -> None:
+        compare_service = Mock()
+        compare_service.compare.return_value = build_compare_response()
+        ai_engine = Mock()
+        ai_engine.generate_text.return_value = json.dumps(
+            {"summary": "Partial review.", "findings": []}
+        )
+        service = ReviewGenerationService(
+            compare_service=compare_service,
+            ai_engine=ai_engine,
+            context_token_budget=1,
+        )
+
+        report = service.generate(
+            GenerateReviewRequest(
+                repo_path="/tmp/example-repo",
+                base_ref="main",
+                head_ref="feature",
+                context_lines=3,
+            )
+        )
+
+        _, input_text = ai_engine.generate_text.call_args.args
+        self.assertTrue(report.partial)
+        self.assertIn(OMITTED_CONTEXT_TEXT, input_text)
+
     def test_generate_rejects_malformed_model_output(self) -> None:
         compare_service = Mock()
         compare_service.compare.return_value = build_compare_response()
@@ -0,0 +1,71 @@
+import random
+import unittest
+from dataclasses import dataclass
+
+from core.symbol_index import SymbolIntervalIndex
+
+
+@dataclass
+class Span:
+    path: str
+    start_line: int
+    end_line: int
+
+
+def brute_force_resolve(symbols, start_line, end_line):
+    overlapping = [
+        symbol
+        for symbol in symbols
+        if not (symbol.end_line < start_line or symbol.start_line > end_line)
+    ]
+    if not overlapping:
+        return None
+    return min(
+        overlapping,
+        key=lambda symbol: (symbol.end_line - symbol.start_line, symbol.path),
+    )
+
+
+class SymbolIntervalIndexTests(unittest.TestCase):
+    def test_resolves_innermost_enclosing_symbol(self) -> None:
+        index = SymbolIntervalIndex(
+            [
+                Span("Widget", 1, 40),
+                Span("Widget.render", 10, 20),
+                Span("Widget.update", 22, 30),
+                Span("helper", 45, 50),
+            ]
+        )
+
+        self.assertEqual(index.resolve(12, 14).path, "Widget.render")
+        self.assertEqual(index.resolve(21, 21).path, "Widget")
+        self.assertEqual(index.resolve(46, 60).path, "helper")
+        self.assertIsNone(index.resolve(41, 44))
+
+    def test_matches_linear_scan_on_random_spans(self) -> None:
+        rng = random.Random(7)
+        symbols = []
+        for offset in range(300):
+            start_line = rng.randint(1, 500)
+            symbols.append(
+                Span(f"symbol_{offset}", start_line, start_line + rng.randint(0, 60))
+            )
+        index = SymbolIntervalIndex(symbols)
+
+        for _ in range(500):
+            start_line = rng.randint(1, 560)
+            end_line = start_line + rng.randint(0, 10)
+            self.assertIs(
+                index.resolve(start_line, end_line),
+                brute_force_resolve(symbols, start_line, end_line),
+            )
+
+    def test_empty_index_resolves_nothing(self) -> None:
+        index = SymbolIntervalIndex([])
+
+        self.assertFalse(index)
+        self.assertIsNone(index.resolve(1, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from core.retriever import Retriever
+from core.vector_index import (
+    EmbeddingTable,
+    RepoVectorIndex,
+    VectorHit,
+    VectorIndexRegistry,
+    np,
+)
+
+
+def build_index() -> RepoVectorIndex:
+    return RepoVectorIndex(
+        "/repo",
+        1,
+        {
+            "commit": [
+                EmbeddingTable.from_vectors(
+                    ["c1", "c2"],
+                    ["c1", "c2"],
+                    [[1.0, 0.0], [0.0, 1.0]],
+                    None,
+                    2,
+                )
+            ],
+            "hunk": [
+                EmbeddingTable.from_vectors(
+                    [10, 11],
+                    ["c1", "c2"],
+                    [[1.0, 0.1], None],
+                    [None, [2.0, 0.0]],
+                    2,
+                ),
+                EmbeddingTable.from_vectors([12], ["c2"], [[0.6, 0.8]], [None], 2),
+            ],
+        },
+        2,
+    )
+
+
+class RowsResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self.rows
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class VectorIndexTests(unittest.TestCase):
+    def test_search_returns_nearest_rows_within_threshold(self) -> None:
+        hits = build_index().search(
+            [1.0, 0.0],
+            commit_shas=None,
+            max_distances={"commit": 0.5, "hunk": 0.6},
+        )
+
+        self.assertEqual([hit.key for hit in hits["commit"]], ["c1"])
+        self.assertAlmostEqual(hits["commit"][0].text_distance, 0.0, places=6)
+        self.assertEqual([hit.key for hit in hits["hunk"]], [11, 10, 12])
+        self.assertIsNone(hits["hunk"][0].text_distance)
+        self.assertAlmostEqual(hits["hunk"][0].ast_distance, 0.0, places=6)
+        self.assertIsNone(hits["hunk"][1].ast_distance)
+
+    def test_search_applies_commit_filter_and_limit(self) -> None:
+        hits = build_index().search(
+            [1.0, 0.0],
+            commit_shas=["c2"],
+            max_distances={"hunk": 0.6},
+            limit=1,
+        )
+
+        self.assertEqual([hit.key for hit in hits["hunk"]], [11])
+
+    def test_search_rejects_mismatched_query_dimension(self) -> None:
+        self.assertIsNone(
+            build_index().search(
+                [1.0, 0.0, 0.0], commit_shas=None, max_distances={"hunk": 0.6}
+            )
+        )
+
+    def test_registry_reuses_index_until_invalidated(self) -> None:
+        registry = VectorIndexRegistry()
+        session = Mock()
+        session.execute.return_value.scalar.return_value = 1
+
+        with patch.object(
+            RepoVectorIndex, "load", side_effect=lambda *args, **kwargs: build_index()
+        ) as load:
+            first = registry.get(session, "/repo")
+            second = registry.get(session, "/repo")
+            registry.invalidate("/repo")
+            third = registry.get(session, "/repo")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(load.call_count, 2)
+
+    def test_registry_appends_new_commits_to_the_cached_index(self) -> None:
+        registry = VectorIndexRegistry()
+        session = Mock()
+        session.execute.return_value.scalar.return_value = 1
+        new_rows = {
+            "commit": [("c3", "c3", [1.0, 0.0], None)],
+            "file_change": [],
+            "hunk": [(13, "c3", [1.0, 0.0], None)],
+        }
+
+        with (
+            patch.object(
+                RepoVectorIndex,
+                "load",
+                side_effect=lambda *args, **kwargs: build_index(),
+            ) as load,
+            patch(
+                "core.vector_index.fetch_embedding_rows", return_value=new_rows
+            ) as fetch,
+        ):
+            first = registry.get(session, "/repo")
+            registry.append_commits(session, "/repo", ["c3"])
+            second = registry.get(session, "/repo")
+
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(fetch.call_args.kwargs["commit_shas"], ["c3"])
+        self.assertIsNot(first, second)
+        self.assertEqual(len(second.tables["hunk"]), 3)
+        hits = second.search(
+            [1.0, 0.0], commit_shas=None, max_distances={"commit": 0.5, "hunk": 0.6}
+        )
+        self.assertEqual([hit.key for hit in hits["commit"]], ["c3", "c1"])
+        self.assertEqual([hit.key for hit in hits["hunk"]], [13, 11, 10, 12])
+
+    def test_registry_append_without_cached_index_only_invalidates(self) -> None:
+        registry = VectorIndexRegistry()
+        session = Mock()
+        session.execute.return_value.scalar.return_value = 1
+
+        with patch("core.vector_index.fetch_embedding_rows") as fetch:
+            registry.append_commits(session, "/repo", ["c3"])
+
+        fetch.assert_not_called()
+
+    def test_retriever_hydrates_index_hits_without_sql_distances(self) -> None:
+        retriever = Retriever.__new__(Retriever)
+        retriever.session = Mock()
+        retriever.vector_indexes = Mock()
+        retriever.vector_indexes.get.return_value.search.return_value = {
+            "commit": [],
+            "file_change": [],
+            "hunk": [VectorHit(key=10, text_distance=0.06, ast_distance=None)],
+        }
+        captured_sql: list[str] = []
+
+        def execute(statement):
+            captured_sql.append(str(statement))
+            return RowsResult(
+                [
+                    {
+                        "sha": "c1",
+                        "match_type": "hunk",
+                        "similarity": None,
+                        "text_similarity": None,
+                        "ast_similarity": None,
+                        "commit_time": 100,
+                        "preview_source": "+token\n",
+                        "preview_kind": "diff",
+                        "file_change_id": 3,
+                        "hunk_id": 10,
+                        "file_path": "src/app.py",
+                    }
+                ]
+            )
+
+        retriever.session.execute.side_effect = execute
+
+        candidates = retriever._fetch_semantic_candidates(
+            ["c1"], [1.0, 0.0], repo_path="/repo"
+        )
+
+        self.assertEqual(len(captured_sql), 1)
+        self.assertNotIn("<=>", captured_sql[0])
+        self.assertEqual([candidate.hunk_id for candidate in candidates], [10])
+        self.assertAlmostEqual(candidates[0].text_similarity, 0.06)
+        self.assertAlmostEqual(candidates[0].semantic_score_override, 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
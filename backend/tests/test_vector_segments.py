@@ -0,0 +1,120 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from core.vector_index import VectorIndexRegistry, np
+from core.vector_segments import VectorSegmentStore, open_segment
+
+C1 = "1" * 40
+C2 = "2" * 40
+
+
+def embedding_rows() -> dict[str, list[tuple]]:
+    return {
+        "commit": [(C1, C1, [1.0, 0.0], None), (C2, C2, [0.0, 1.0], None)],
+        "file_change": [],
+        "hunk": [
+            (10, C1, [1.0, 0.1], None),
+            (11, C2, None, [2.0, 0.0]),
+            (12, C2, [0.6, 0.8], None),
+        ],
+    }
+
+
+def streamed_rows(*args, batch_rows: int, **kwargs):
+    for match_type, rows in embedding_rows().items():
+        for start in range(0, len(rows), batch_rows):
+            yield match_type, rows[start : start + batch_rows]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class VectorSegmentStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.store = VectorSegmentStore(self.tmp_dir.name)
+        self.fetch = patch(
+            "core.vector_segments.fetch_embedding_rows",
+            side_effect=lambda *args, **kwargs: embedding_rows(),
+        )
+        self.fetch.start()
+        self.addCleanup(self.fetch.stop)
+        self.stream = patch(
+            "core.vector_segments.stream_embedding_rows", side_effect=streamed_rows
+        )
+        self.stream.start()
+        self.addCleanup(self.stream.stop)
+
+    def test_backfill_streams_bounded_float16_segments_and_searches(self) -> None:
+        self.assertIsNone(self.store.open_index("/repo", 1))
+
+        self.assertEqual(self.store.backfill(None, "/repo", 1, segment_rows=2), 5)
+        index = self.store.open_index("/repo", 1)
+
+        paths = self.store.segment_paths("/repo", 1)
+        self.assertEqual(len(paths), 3)
+        segment = open_segment(next(path for path in paths if "hunk" in path.name))
+        self.assertIsInstance(segment.arrays["text"], np.memmap)
+        self.assertEqual(segment.arrays["text"].dtype, np.float16)
+        self.assertLessEqual(max(len(open_segment(path)) for path in paths), 2)
+
+        hits = index.search(
+            [1.0, 0.0],
+            commit_shas=[C1, C2],
+            max_distances={"commit": 0.5, "hunk": 0.6},
+        )
+        self.assertEqual([hit.key for hit in hits["commit"]], [C1])
+        self.assertEqual([hit.key for hit in hits["hunk"]], [11, 10, 12])
+        self.assertAlmostEqual(hits["hunk"][0].ast_distance, 0.0, places=3)
+
+    def test_append_is_deduplicated_and_compaction_drops_dead_commits(self) -> None:
+        self.store.backfill(None, "/repo", 1)
+        self.store.append(None, "/repo", 1, [C1, C2])
+        self.assertEqual(len(self.store.segment_paths("/repo", 1)), 4)
+
+        index = self.store.open_index("/repo", 1)
+        hits = index.search([1.0, 0.0], commit_shas=None, max_distances={"hunk": 0.6})
+        self.assertEqual([hit.key for hit in hits["hunk"]], [11, 10, 12])
+
+        stale_profile = self.store.profile_dir("/repo", 0)
+        stale_profile.mkdir(parents=True)
+        counts = self.store.compact("/repo", 1, [C1])
+
+        self.assertEqual(counts, {"kept_rows": 2, "dropped_rows": 8, "merged_segments": 4})
+        self.assertFalse(stale_profile.exists())
+        index = self.store.open_index("/repo", 1)
+        hits = index.search(
+            [1.0, 0.0],
+            commit_shas=None,
+            max_distances={"commit": 1.0, "hunk": 1.0},
+        )
+        self.assertEqual([hit.key for hit in hits["commit"]], [C1])
+        self.assertEqual([hit.key for hit in hits["hunk"]], [10])
+
+    def test_drop_removes_segments_and_append_waits_for_backfill(self) -> None:
+        self.store.backfill(None, "/repo", 1)
+        self.store.drop("/repo")
+
+        self.assertFalse(Path(self.store.repo_dir("/repo")).exists())
+        self.assertEqual(self.store.append(None, "/repo", 1, [C1]), 0)
+        self.assertEqual(self.store.segment_paths("/repo", 1), [])
+
+    def test_registry_searches_sql_until_ingest_backfills(self) -> None:
+        registry = VectorIndexRegistry()
+        registry.configure_segments(self.store)
+        session = Mock()
+        session.execute.return_value.scalar.return_value = 1
+
+        self.assertIsNone(registry.get(session, "/repo"))
+        self.assertEqual(self.store.segment_paths("/repo", 1), [])
+
+        registry.append_commits(session, "/repo", [C1])
+        index = registry.get(session, "/repo")
+        self.assertIsNotNone(index)
+        hits = index.search([1.0, 0.0], commit_shas=None, max_distances={"hunk": 0.6})
+        self.assertEqual([hit.key for hit in hits["hunk"]], [11, 10, 12])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from core.writer import Writer
+from data.data_model import Commit
+from data.schema import SQLCommit
+
+
+class WriterTests(unittest.TestCase):
+    def test_new_summary_embeddings_bump_repo_sync_generation(self) -> None:
+        session = Mock()
+        row = SQLCommit(sha="c1")
+        session.query.return_value.filter.return_value.all.return_value = [row]
+        session.query.return_value.filter.return_value.scalar.return_value = "/repo"
+        embedder = Mock(profile_fingerprint="fp", vector_storage="vector")
+        embedder.get_batch_embeddings.return_value = [[1.0, 0.0]]
+        writer = Writer(session, embedder)
+        writer._should_write_semantic_embeddings = Mock(return_value=True)
+
+        with patch("core.writer.DEFAULT_VECTOR_INDEXES") as vector_indexes:
+            writer.update_summaries(
+                Commit(
+                    sha="c1",
+                    repo_path="/repo",
+                    time=1,
+                    message="Add token",
+                    summary="Adds a token",
+                )
+            )
+
+        statement = session.execute.call_args.args[0]
+        self.assertIn("UPDATE repos SET sync_generation=", str(statement))
+        self.assertEqual(row.summary, "Adds a token")
+        self.assertEqual(row.semantic_embedding, [1.0, 0.0])
+        session.commit.assert_called_once()
+        vector_indexes.append_commits.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
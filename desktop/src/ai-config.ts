@@ -131,6 +131,11 @@ function normalizeAiRuntimeConfig(rawConfig: any): AIRuntimeConfig {
           textBinding.reasoning_effort
             ? textBinding.reasoning_effort
             : null,
+        context_token_budget:
+          Number.isInteger(Number(textBinding.context_token_budget)) &&
+          Number(textBinding.context_token_budget) > 0
+            ? Number(textBinding.context_token_budget)
+            : null,
       },
       embeddings:
         embeddingsBinding === null
@@ -148,6 +153,8 @@ function normalizeAiRuntimeConfig(rawConfig: any): AIRuntimeConfig {
                   ? embeddingsBinding.model_id
                   : fallback.capabilities.embeddings?.model_id ??
                     DEFAULT_EMBEDDING_MODEL,
+              vector_storage:
+                embeddingsBinding?.vector_storage === "halfvec" ? "halfvec" : "vector",
             },
     },
   };
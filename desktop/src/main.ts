@@ -44,7 +44,13 @@ let backendManager: BackendManager | null = null;
 let reviewRuntimeManager: ReviewRuntimeManager | null = null;
 let repoSyncWatcher: RepoSyncWatcher | null = null;
 const latestRepoSyncProgress = new Map<string, RepoSyncProgressEvent>();
-type IngestJobStatus = "queued" | "running" | "completed" | "failed" | "cancelled";
+type IngestJobStatus =
+  | "queued"
+  | "running"
+  | "completed"
+  | "failed"
+  | "cancelled"
+  | "paused";
 type IngestJobPayload = {
   job_id: string;
   repo_path: string;
@@ -258,6 +264,10 @@ async function waitForIngestJob(jobId: string): Promise<IngestJobPayload> {
       throw new Error("Repository sync was cancelled");
     }
 
+    if (job.status === "paused") {
+      throw new Error("Repository sync was paused");
+    }
+
     await new Promise((resolve) => setTimeout(resolve, 250));
   }
 }
@@ -462,6 +472,7 @@ function registerIpcHandlers(): void {
         filters: input.filters,
         repo_path: input.repoPath,
         max_results: input.maxResults,
+        cursor: input.cursor ?? null,
       },
     });
   });
@@ -46,6 +46,7 @@ const bridge = {
       filters: unknown;
       repoPath: string;
       maxResults?: number;
+      cursor?: string | null;
     }) => invoke("git-odyssey:api:filter-commits", input),
     pickGitProject: () => invoke("git-odyssey:api:pick-git-project"),
     getRecentProjects: () => invoke("git-odyssey:api:get-recent-projects"),
@@ -30,7 +30,13 @@ type ConfigStoreLike = {
 };
 
 type LoggerLike = Pick<Console, "warn" | "error">;
-type IngestJobStatus = "queued" | "running" | "completed" | "failed" | "cancelled";
+type IngestJobStatus =
+  | "queued"
+  | "running"
+  | "completed"
+  | "failed"
+  | "cancelled"
+  | "paused";
 type IngestJobPayload = {
   job_id: string;
   repo_path: string;
@@ -229,6 +235,7 @@ class RepoSyncWatcher {
             max_commits: repoSettings.maxCommits,
             context_lines: repoSettings.contextLines,
             force: false,
+            priority: "background",
           },
         })) as IngestJobPayload;
 
@@ -255,6 +262,10 @@ class RepoSyncWatcher {
             throw new Error("Repository sync was cancelled");
           }
 
+          if (currentJob.status === "paused") {
+            throw new Error("Repository sync was paused");
+          }
+
           await new Promise((resolve) => setTimeout(resolve, 250));
         }
       } while (state.rerunRequested);
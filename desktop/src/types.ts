@@ -19,7 +19,9 @@ export type RepoSyncPhase =
   | "embedding"
   | "writing_db"
   | "completed"
-  | "failed";
+  | "failed"
+  | "cancelled"
+  | "paused";
 
 export type ReviewChatCodeContext = {
   id: string;
@@ -158,11 +160,15 @@ export interface TextGenerationBinding {
   model_id: string;
   temperature: number;
   reasoning_effort?: ReasoningEffort | null;
+  context_token_budget?: number | null;
 }
 
+export type VectorStorage = "vector" | "halfvec";
+
 export interface EmbeddingsBinding {
   provider_profile_id: string;
   model_id: string;
+  vector_storage?: VectorStorage;
 }
 
 export interface AIRuntimeConfig {
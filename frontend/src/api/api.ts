@@ -68,12 +68,14 @@ export const filterCommits = async (
   filters: FilterFormData,
   repoPath: string,
   maxResults?: number,
+  cursor?: string | null,
 ): Promise<FilterResponse> => {
   return getDesktopBridge().api.filterCommits({
     query,
     filters,
     repoPath,
     maxResults,
+    cursor,
   });
 };
 
@@ -268,6 +268,7 @@ export function useCommitGraph({
   );
   const [searchStateHydrated, setSearchStateHydrated] = useState<boolean>(false);
   const searchRequestIdRef = useRef(0);
+  const searchCursorRef = useRef<string | null>(null);
 
   const commitsWithLocalSummary = useMemo(
     () =>
@@ -563,6 +564,7 @@ export function useCommitGraph({
     setSearchTotalRelevantResults(0);
     setHasMoreRelevantSearchResults(false);
     setSearchResultCommitShas(null);
+    searchCursorRef.current = null;
     setNodes((current) => clearSelectedNodes(current));
 
     setTimeout(() => {
@@ -599,6 +601,7 @@ export function useCommitGraph({
       setSearchTotalRelevantResults(0);
       setHasMoreRelevantSearchResults(false);
       setSearchResultCommitShas(null);
+      searchCursorRef.current = null;
     },
     []
   );
@@ -608,10 +611,18 @@ export function useCommitGraph({
   }, []);
 
   const applySearchResponse = useCallback(
-    (response: FilterResponse, nextQuery: string) => {
-      setSearchResults(response.results);
-      setSearchResultCommitShas(response.results.map((result) => result.sha));
-      setSearchMaxResults(response.max_results);
+    (response: FilterResponse, nextQuery: string, append = false) => {
+      const resultShas = response.results.map((result) => result.sha);
+      if (append) {
+        setSearchResults((current) => [...current, ...response.results]);
+        setSearchResultCommitShas((current) => [...(current ?? []), ...resultShas]);
+        setSearchMaxResults((current) => current + response.max_results);
+      } else {
+        setSearchResults(response.results);
+        setSearchResultCommitShas(resultShas);
+        setSearchMaxResults(response.max_results);
+      }
+      searchCursorRef.current = response.next_cursor ?? null;
       setSearchTotalRankedResults(response.total_ranked_results);
       setSearchTotalRelevantResults(response.total_relevant_results);
       setHasMoreRelevantSearchResults(response.has_more_relevant);
@@ -623,7 +634,11 @@ export function useCommitGraph({
   );
 
   const executeSearch = useCallback(
-    async (query: string, maxResults = DEFAULT_SEARCH_MAX_RESULTS) => {
+    async (
+      query: string,
+      maxResults = DEFAULT_SEARCH_MAX_RESULTS,
+      cursor: string | null = null
+    ) => {
       if (!repoPath) {
         return;
       }
@@ -633,12 +648,18 @@ export function useCommitGraph({
       setIsSearchLoading(true);
 
       try {
-        const response = await searchRepoCommits(query, filters, repoPath, maxResults);
+        const response = await searchRepoCommits(
+          query,
+          filters,
+          repoPath,
+          maxResults,
+          cursor
+        );
         if (searchRequestIdRef.current !== requestId) {
           return;
         }
 
-        applySearchResponse(response, query);
+        applySearchResponse(response, query, cursor !== null);
       } finally {
         if (searchRequestIdRef.current === requestId) {
           setIsSearchLoading(false);
@@ -658,6 +679,13 @@ export function useCommitGraph({
       return;
     }
 
+    const cursor = searchCursorRef.current;
+    if (cursor) {
+      // The next page is sliced from the server's ranked list.
+      await executeSearch(lastSearchQuery, DEFAULT_SEARCH_MAX_RESULTS, cursor);
+      return;
+    }
+
     await executeSearch(lastSearchQuery, searchMaxResults + DEFAULT_SEARCH_MAX_RESULTS);
   }, [
     executeSearch,
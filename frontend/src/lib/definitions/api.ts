@@ -20,11 +20,15 @@ export interface RepoResponse {
   reindex_required: boolean;
 }
 
+export type FilterSearchMode = "ranked" | "hybrid";
+
 export interface FilterRequest {
   query: string;
   filters: FilterFormData;
   repo_path: string;
   max_results?: number;
+  search_mode?: FilterSearchMode;
+  cursor?: string | null;
 }
 
 export type FilterMatchType = "commit" | "file_change" | "hunk";
@@ -62,6 +66,7 @@ export interface FilterResponse {
   total_relevant_results: number;
   has_more_relevant: boolean;
   max_results: number;
+  next_cursor?: string | null;
 }
 
 export interface ChatRequest {
@@ -224,7 +224,9 @@ export type RepoSyncPhase =
   | "embedding"
   | "writing_db"
   | "completed"
-  | "failed";
+  | "failed"
+  | "cancelled"
+  | "paused";
 
 export interface RepoSyncProgressEvent {
   progressId: string;
@@ -261,6 +263,7 @@ export interface GitOdysseyDesktopApi {
     filters: FilterFormData;
     repoPath: string;
     maxResults?: number;
+    cursor?: string | null;
   }): Promise<FilterResponse>;
   pickGitProject(): Promise<GitProjectSummary | null>;
   getRecentProjects(): Promise<GitProjectSummary[]>;